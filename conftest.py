@@ -0,0 +1,42 @@
+from tests.client_connectivity.util.cloud_cache import log_cloud_cache_stats
+from tests.client_connectivity.util.durations import DurationPlugin, add_duration_options
+from tests.client_connectivity.util.kpi import export_kpi_results
+from tests.client_connectivity.util.ordering import StateOrdering, add_ordering_options
+from tests.client_connectivity.util.sanity import add_sanity_options, configure_sanity, log_sanity_stats
+from tests.client_connectivity.util.sharding import ShardScheduler, add_sharding_options
+from tests.client_connectivity.util.throughput import add_throughput_host, add_throughput_options, configure_throughput
+from tests.client_connectivity.util.tracing import TracingPlugin, add_tracing_options
+
+# Offline unit tests of the util modules, run explicitly: pytest tests/client_connectivity/unit_tests
+collect_ignore = ["unit_tests"]
+
+
+def pytest_addoption(parser):
+    add_sharding_options(parser)
+    add_ordering_options(parser)
+    add_sanity_options(parser)
+    add_throughput_options(parser)
+    add_tracing_options(parser)
+    add_duration_options(parser)
+
+
+def pytest_configure(config):
+    configure_sanity(config)
+    configure_throughput(config)
+    config.pluginmanager.register(DurationPlugin(config), "durations")
+    if config.getoption("shards") or config.getoption("shard_testbed"):
+        config.pluginmanager.register(ShardScheduler(config), "shard_scheduler")
+    if config.getoption("order_by_state"):
+        config.pluginmanager.register(StateOrdering(config), "state_ordering")
+    if config.getoption("trace_calls"):
+        config.pluginmanager.register(TracingPlugin(config), "tracing")
+
+
+def pytest_collection_modifyitems(session, config, items):
+    add_throughput_host(items)
+
+
+def pytest_sessionfinish(session):
+    log_cloud_cache_stats()
+    log_sanity_stats()
+    export_kpi_results(session.config)
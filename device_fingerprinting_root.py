@@ -4,6 +4,10 @@ import allure
 from lib_testbed.generic.util.logger import log
 from lib.util.base_case import BaseCase
 from lib.util.base_case import skip_if_pods_have_no_mgmt
+from tests.client_connectivity.util.wait import wait_until
+from tests.client_connectivity.util.cloud_cache import enable_cloud_cache
+from tests.client_connectivity.util.sanity import pods_sanity
+from tests.client_connectivity.util.batch import run_batch
 
 
 @pytest.mark.opensync_switch()
@@ -16,6 +20,7 @@ class DeviceFingerprintingRoot(BaseCase):
     @classmethod
     def setup_class(cls):
         with cls.SafeSetup(DeviceFingerprintingRoot, cls):
+            enable_cloud_cache(cls.cloud)
             cls.gw_name = cls.tb_config["Nodes"][0]["name"]
 
     @classmethod
@@ -43,34 +48,29 @@ class DeviceFingerprintingRoot(BaseCase):
     @allure.title("Check sanity after recreated location")
     def test_02_check_sanity(self):
         log.info("Checking sanity after recreated location")
-        assert not self.pods.all.poll_pods_sanity(), "Sanity is still failing"
+        failed = pods_sanity(self.pods.all, force=True)
+        assert not failed, f"Sanity is still failing on {failed}"
         log.info("Sanity succeeded on all pods.")
 
+    def check_internet_and_keep_pinging(self, client):
+        """Internet access check and a constant ping, so that cloud sees the client as connected, in one call."""
+        ip_address = self.tb_config["wifi_check"].get("ip_check") or "8.8.8.8"
+        checks = run_batch(
+            client,
+            {"internet": f"ping -c 3 -w 10 {ip_address}", "keepalive": f"ping {ip_address} > /dev/null 2>&1 &"},
+        )
+        assert checks["internet"].ok, f"Client has not internet access: {checks['internet'].stdout}"
+
     def check_client_in_noc(self, client_ip):
         log.info("Check the client name from cloud and verify with the client on NOC")
-        timeout = time.time() + 1 * 60
-        client_details = None
-        while time.time() < timeout:
-            client_details = self.cloud.user.get_clients_details(self.client_mac)
-            if (
-                client_details
-                and client_details["ip"]
-                and client_details.get("conn_state") == "connected"
-                and client_details.get("device_type", "") != "unknown"
-                and client_details.get("name") != self.client_mac
-            ):
-                break
-            elif client_details and (
-                not client_details["ip"]
-                or client_details.get("conn_state") == "disconnected"
-                or not client_details.get("device_type")
-                or not client_details.get("name")
-            ):
-                log.warning("Got client information, but without all details")
-                time.sleep(5)
-            else:
-                log.warning("Cannot get device details. Waiting")
-                time.sleep(5)
+        noc_wait = wait_until(
+            lambda: self.cloud.user.get_clients_details(self.client_mac),
+            self.client_details_complete,
+            timeout=1 * 60,
+            name="client details in NOC",
+        )
+        client_details = noc_wait.value
+        log.info(f"Waited {noc_wait.elapsed:.2f} sec for client details in NOC")
         assert client_details, f"Can not get client details from cloud for {self.client_mac};{self.client_hostname}"
         client_name = client_details.get("name")
         client_noc_ip = client_details.get("ip")
@@ -100,6 +100,21 @@ class DeviceFingerprintingRoot(BaseCase):
         assert client_type, "Client device-type not found on NOC"
         log.info(f"Client device-type {client_type} found on NOC")
 
+    def client_details_complete(self, client_details):
+        if (
+            client_details
+            and client_details["ip"]
+            and client_details.get("conn_state") == "connected"
+            and client_details.get("device_type", "") != "unknown"
+            and client_details.get("name") != self.client_mac
+        ):
+            return True
+        if client_details:
+            log.warning("Got client information, but without all details")
+        else:
+            log.warning("Cannot get device details. Waiting")
+        return False
+
     @staticmethod
     def wait_eth_connection_ready(dev_obj):
         if dev_obj.get_nickname():
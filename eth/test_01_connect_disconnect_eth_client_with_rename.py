@@ -7,6 +7,8 @@ from requests import RequestException
 from lib.util.base_case import BaseCase
 from lib_testbed.generic.util.logger import log
 from lib.util.testrail.plugin import pytestrail
+from tests.client_connectivity.util.sanity import pods_sanity
+from tests.client_connectivity.util.ifaddr import refresh_ip_address
 
 
 @pytest.mark.opensync_switch()
@@ -94,7 +96,8 @@ class ConnectDisconnectClientWithRenameRoot(BaseCase):
     @allure.title("Check sanity")
     def test_05_check_sanity(self):
         log.info("Checking sanity")
-        assert not self.pods.all.poll_pods_sanity(), "Sanity is still failing"
+        failed = pods_sanity(self.pods.all, force=True)
+        assert not failed, f"Sanity is still failing on {failed}"
         log.info("Sanity succeeded on all pods.")
 
     @classmethod
@@ -104,7 +107,7 @@ class ConnectDisconnectClientWithRenameRoot(BaseCase):
         log.info(f"Connect {cls.eth_name} client to {cls.gw_name} device")
         cls.switch.api.connect_eth_client(cls.gw_name, cls.eth_name)
         log.info("Refresh ip address on eth client")
-        cls.client.eth.refresh_ip_address(timeout=20)
+        refresh_ip_address(cls.client.eth, timeout=20)
 
 
 @pytest.mark.wan(port="primary")
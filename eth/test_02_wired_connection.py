@@ -4,6 +4,9 @@ import allure
 from lib.util.base_case import BaseCase
 from lib_testbed.generic.util.logger import log
 from lib.util.testrail.plugin import pytestrail
+from tests.client_connectivity.util.ifaddr import get_client_ip, refresh_ip_address
+from tests.client_connectivity.util.kpi import KpiScope, kpi_recorder, marker_kwarg
+from tests.client_connectivity.util.ping import ping, record_ping_kpi
 
 
 @pytest.mark.opensync_switch()
@@ -19,6 +22,10 @@ from lib.util.testrail.plugin import pytestrail
 @pytest.mark.tag_client_connectivity
 @pytest.mark.incremental
 class WiredConnectionRoot(BaseCase):
+    # Latency budgets of the ping between clients on the LAN, in ms
+    lan_rtt_budget = 50
+    lan_jitter_budget = 20
+
     @classmethod
     def setup_class(cls):
         with cls.SafeSetup(WiredConnectionRoot, cls):
@@ -47,7 +54,7 @@ class WiredConnectionRoot(BaseCase):
         self.switch.api.connect_eth_client(self.gw_name, self.eth1_name)
 
         log.info("Refresh ip address on eth client")
-        self.client.eth1.refresh_ip_address(timeout=20)
+        refresh_ip_address(self.client.eth1, timeout=20)
 
         log.info(f"Check client internet access on {self.eth1_name}")
         assert self.client.eth1.ping_check(), "Ethernet client has not internet access"
@@ -64,7 +71,7 @@ class WiredConnectionRoot(BaseCase):
         self.switch.api.connect_eth_client(self.leaf_name, self.eth1_name)
 
         log.info("Refresh ip address on eth client")
-        self.client.eth1.refresh_ip_address(timeout=20)
+        refresh_ip_address(self.client.eth1, timeout=20)
 
         log.info(f"Check client internet access on {self.eth1_name}")
         assert self.client.eth1.ping_check(), "Ethernet client has not internet access"
@@ -78,7 +85,7 @@ class WiredConnectionRoot(BaseCase):
         self.switch.api.connect_eth_client(self.leaf_name, self.eth2_name)
 
         log.info("Refresh ip address on eth client")
-        self.client.eth2.refresh_ip_address(timeout=20)
+        refresh_ip_address(self.client.eth2, timeout=20)
 
         log.info(f"Check client internet access on {self.eth2_name}")
         assert self.client.eth2.ping_check(), "Ethernet client has not internet access"
@@ -86,20 +93,22 @@ class WiredConnectionRoot(BaseCase):
 
     @allure.title("Check ping between clients")
     def test_04_check_ping_between_client(self):
-        eth1_ip = self.client.eth1.run(f'ip -4 add show dev {self.eth1_iface} | grep "inet "')
-        eth1_ip = eth1_ip[eth1_ip.rfind("inet") + 5 : eth1_ip.rfind("/")]
-        eth2_ip = self.client.eth2.run(f'ip -4 add show dev {self.eth2_iface} | grep "inet "')
-        eth2_ip = eth2_ip[eth1_ip.rfind("inet") + 5 : eth2_ip.rfind("/")]
-
-        log.info(f"Check ping from {eth1_ip} to {eth2_ip}")
-        ping_res = self.client.eth1.ping(eth2_ip)
-        assert "100% packet loss" not in ping_res, f"Ping from {eth1_ip} to {eth2_ip} failed:\n{ping_res}"
-        log.info(f"Ping from {eth1_ip} to {eth2_ip} has been finished successfully")
-
-        log.info(f"Check ping from {eth2_ip} to {eth1_ip}")
-        ping_res = self.client.eth2.ping(eth1_ip)
-        assert "100% packet loss" not in ping_res, f"Ping from {eth2_ip} to {eth1_ip} failed:\n{ping_res}"
-        log.info(f"Ping from {eth2_ip} to {eth1_ip} has been finished successfully")
+        eth1_ip = get_client_ip(self.client.eth1, self.eth1_iface)
+        eth2_ip = get_client_ip(self.client.eth2, self.eth2_iface)
+
+        network_mode = marker_kwarg(self.all_markers, "network_mode", "target")
+        kpi = KpiScope(kpi_recorder, type(self).__name__, network_mode)
+        directions = (
+            (self.client.eth1, self.eth1_iface, eth1_ip, eth2_ip),
+            (self.client.eth2, self.eth2_iface, eth2_ip, eth1_ip),
+        )
+        for client, iface, source_ip, target_ip in directions:
+            log.info(f"Check ping from {source_ip} to {target_ip}")
+            ping_res = ping(client, target_ip, iface)
+            record_ping_kpi(kpi, ping_res, source=client.get_nickname())
+            violations = ping_res.budget_violations(max_rtt=self.lan_rtt_budget, max_jitter=self.lan_jitter_budget)
+            assert not violations, f"Ping from {source_ip} to {target_ip} failed: {violations}\n{ping_res.output}"
+            log.info(f"Ping from {source_ip} to {target_ip} has been finished successfully: {ping_res}")
 
 
 @pytest.mark.wan(port="primary")
@@ -6,6 +6,7 @@ from tests.client_connectivity.device_fingerprinting_root import (
 )
 from lib.util.testrail.plugin import pytestrail
 from lib_testbed.generic.util.logger import log
+from tests.client_connectivity.util.ifaddr import get_client_ip, refresh_ip_address
 
 
 @pytest.mark.opensync_client(eth=True, name="eth", vlan=".*")
@@ -37,28 +38,19 @@ class DeviceFingerprintingEthRoot(DeviceFingerprintingRoot):
         log.info(f"Connect {client_cfg_name} client to {self.gw_name} device")
         self.switch.api.connect_eth_client(self.gw_name, client_cfg_name)
         log.info("Refresh ip address on eth client")
-        self.client.eth.refresh_ip_address(timeout=20)
-        self.client.eth.ping_check()
+        refresh_ip_address(self.client.eth, timeout=20)
 
-        client_ip = self.client.eth.run(
-            f'ip -4 add show dev {self.client_iface} | grep "inet "',
-            skip_exception=True,
-        )
+        client_ip = get_client_ip(self.client.eth, self.client_iface)
         assert client_ip, f"Can not get ip address for {self.client_hostname}, {self.client_iface}"
 
         log.info(f"Check client internet access on {self.client_mac} {client_cfg_name}")
-        assert self.client.eth.ping_check(), "Ethernet client has not internet access"
-        log.info("Client has internet access")
         # Run ping constantly to be sure, that cloud see client as connected
-        ip_address = (
-            self.tb_config["wifi_check"]["ip_check"] if self.tb_config["wifi_check"].get("ip_check") else "8.8.8.8"
-        )
-        self.client.eth.run(f"ping {ip_address} &> /dev/null &")
+        self.check_internet_and_keep_pinging(self.client.eth)
+        log.info("Client has internet access")
 
     @allure.title("Check client details in NOC")
     def test_04_check_client_details_in_noc(self):
-        client_ip = self.client.eth.run(f'ip -4 add show dev {self.client_iface} | grep "inet "')
-        client_ip = client_ip[client_ip.rfind("inet") + 5 : client_ip.rfind("/")]
+        client_ip = get_client_ip(self.client.eth, self.client_iface)
         self.check_client_in_noc(client_ip)
 
     @allure.title("Check client connectivity after reboot gateway")
@@ -74,12 +66,11 @@ class DeviceFingerprintingEthRoot(DeviceFingerprintingRoot):
         time.sleep(120)
         log.info("Check loop status before connect eth client to node")
         self.wait_eth_connection_ready(dev_obj=self.pod.gw)
-        self.client.eth.refresh_ip_address(timeout=20)
+        refresh_ip_address(self.client.eth, timeout=20)
         self.client.eth.ping_check()
 
-        client_ip = self.client.eth.run(f'ip -4 add show dev {self.client_iface} | grep "inet "')
+        client_ip = get_client_ip(self.client.eth, self.client_iface)
         assert client_ip, f"Can not get ip address from {self.client_hostname} client"
-        client_ip = client_ip[client_ip.rfind("inet") + 5 : client_ip.rfind("/")]
         self.check_client_in_noc(client_ip)
 
 
@@ -3,6 +3,9 @@ import allure
 from lib_testbed.generic.util.logger import log
 from lib.util.testrail.plugin import pytestrail
 from lib.util.base_case import BaseCase
+from tests.client_connectivity.util.kpi import KpiScope, kpi_recorder, marker_kwarg
+from tests.client_connectivity.util.pmtu import MAX_PAYLOAD, PmtuProber, pmtu_table, record_pmtu_kpi
+from tests.client_connectivity.util.ifaddr import refresh_ip_address
 
 
 @pytest.mark.opensync_cloud()
@@ -23,16 +26,17 @@ class ClientConnectivityMtuEth(BaseCase):
 
     @allure.title("Check ping to test server")
     def test_02_check_ping_to_test_server(self):
-        log.info(f"Checking client ping to {self.test_server}")
-        cmd = f"sudo /bin/ping -c 5 -w 60 -s 1472 -M do {self.test_server}"
-        ping_result = self.client.test_client.run_raw(cmd, skip_exception=True)
-        log.debug(ping_result)
-        assert not ping_result[0], f"Can not ping {self.test_server}. Ping result:\n{ping_result}"
-        log.info(f"Ping results:\n{ping_result[1]}")
+        log.info(f"Probing path MTU from client to {self.test_server}")
+        result = PmtuProber(self.client.test_client, self.test_server).run()
+        log.info(f"Path MTU results:\n{pmtu_table({self.test_server: result})}")
+        network_mode = marker_kwarg(self.all_markers, "network_mode", "target")
+        record_pmtu_kpi(KpiScope(kpi_recorder, type(self).__name__, network_mode), result)
+        assert result.max_payload, f"Can not ping {self.test_server}. Probes:\n{result.probes}"
+        assert result.max_payload >= MAX_PAYLOAD, f"Path MTU to {self.test_server} is only {result.path_mtu}"
 
     def prepare_test_client(self):
         log.info("Refresh ip address on eth client")
-        self.client.test_client.refresh_ip_address(timeout=20)
+        refresh_ip_address(self.client.test_client, timeout=20)
         log.info("Check client internet access")
         assert self.client.test_client.ping_check(), "Ethernet client has not internet access"
         log.info("Client has internet access")
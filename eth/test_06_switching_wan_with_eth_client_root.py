@@ -3,6 +3,10 @@ import allure
 from lib.util.base_case import BaseCase
 from lib_testbed.generic.util.logger import log
 from lib.util.testrail.plugin import pytestrail
+from tests.client_connectivity.util.readiness import ReadinessBarrier, sanity_passed
+from tests.client_connectivity.util.ifaddr import refresh_ip_address
+from tests.client_connectivity.util.switch_transaction import SwitchTransaction, switch_changed
+from tests.client_connectivity.util.cloud_cache import invalidate_cloud_caches
 
 
 @pytest.mark.opensync_switch()
@@ -40,12 +44,14 @@ class SwitchingWanWithEthClientRoot(BaseCase):
         self.pod.gw.wait_eth_connection_ready()
         log.info(f"Connect {self.eth_name} client to {self.gw_name} device")
         self.switch.api.connect_eth_client(self.gw_name, self.eth_name)
+        switch_changed()
         self.check_ping_on_client()
 
     @allure.title("Reboot gateway device")
     def test_02_reboot_gateway_device(self):
         log.info(f"Rebooting gateway {self.gw_name}")
         self.pod.gw.reboot()
+        invalidate_cloud_caches(f"after the reboot of {self.gw_name}")
         log.info("Wait for disconnect location from cloud")
         assert self.cloud.admin.check_pods_connected(option="disconnected"), "Location" "is still connected to cloud"
         self.wait_pods_ready()
@@ -66,6 +72,7 @@ class SwitchingWanWithEthClientRoot(BaseCase):
             self.pod.gw.wait_eth_connection_ready()
             log.info("Connect eth client to gateway")
             self.switch.api.connect_eth_client(self.gw_name, self.eth_name)
+            switch_changed()
             self.wait_pods_ready()
             self.check_ping_on_client()
 
@@ -76,29 +83,41 @@ class SwitchingWanWithEthClientRoot(BaseCase):
             log.info("")
             log.info(f"Reconnect wan port and client eth. Attempt: {i + 1}")
             wan_port = self.switch.api.get_wan_port(self.gw_name)
-            self.switch.api.disconnect_eth_client(self.gw_name, self.eth_name)
-            self.switch.api.disable_port(wan_port)
-            log.info("Wait for disconnect location from cloud")
-            assert self.cloud.admin.check_pods_connected(option="disconnected"), "Location is still connected to cloud"
-            log.info(f"Enabling wan port on {self.gw_name}")
-            self.switch.api.enable_port(wan_port)
-            log.info("Check loop status before connect eth client to node")
-            self.pod.gw.wait_eth_connection_ready()
+            log.info(f"Disconnect eth client and reconnect wan port on {self.gw_name}")
+            # The location has to go offline while the wan port is down, before it is enabled again
+            (
+                SwitchTransaction(self.switch.api)
+                .disconnect(self.gw_name, self.eth_name)
+                .disable_port(wan_port)
+                .enable_port(wan_port)
+                .commit(before_up=self.wait_location_disconnected)
+            )
             log.info("Connect eth client to gateway")
-            self.switch.api.connect_eth_client(self.gw_name, self.eth_name)
+            (
+                SwitchTransaction(self.switch.api)
+                .connect(self.gw_name, self.eth_name)
+                .commit(before_up=self.pod.gw.wait_eth_connection_ready)
+            )
             self.wait_pods_ready()
             self.check_ping_on_client()
 
+    def wait_location_disconnected(self):
+        log.info("Wait for disconnect location from cloud")
+        assert self.cloud.admin.check_pods_connected(option="disconnected"), "Location is still connected to cloud"
+
     def wait_pods_ready(self):
         log.info("Waiting for pods to be ready")
-        assert self.cloud.admin.check_pods_connected(), "Location is still disconnected from cloud"
-        log.info("Check sanity on connected pods")
-        assert not self.pods.all.poll_pods_sanity(), "Sanity is still failing"
-        log.info("Sanity has been finished successfully")
+        ready = (
+            ReadinessBarrier()
+            .add_location_stage("cloud connected", self.cloud.admin.check_pods_connected)
+            .add_stage("sanity", sanity_passed)
+            .run(self.pods.all.get_devices())
+        )
+        assert ready, f"Pods are not ready: {ready.failure}"
 
     def check_ping_on_client(self):
         log.info("Refresh ip address on eth client")
-        self.client.eth.refresh_ip_address(timeout=20)
+        refresh_ip_address(self.client.eth, timeout=20)
         log.info(f"Check client internet access on {self.eth_name}")
         assert self.client.eth.ping_check(), "Ethernet client has not internet access"
         log.info("Client has internet access")
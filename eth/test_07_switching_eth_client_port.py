@@ -3,6 +3,12 @@ import allure
 from lib.util.base_case import BaseCase
 from lib_testbed.generic.util.logger import log
 from lib.util.testrail.plugin import pytestrail
+from tests.client_connectivity.util.fan_out import fan_out
+from tests.client_connectivity.util.ifaddr import get_client_ip, refresh_ip_address
+from tests.client_connectivity.util.kpi import KpiScope, kpi_recorder, marker_kwarg
+from tests.client_connectivity.util.ping import ping, record_ping_kpi
+from tests.client_connectivity.util.sanity import incremental_sanity
+from tests.client_connectivity.util.switch_transaction import SwitchTransaction
 
 
 @pytest.mark.opensync_switch()
@@ -26,6 +32,7 @@ class SwitchingEthClientPortRoot(BaseCase):
             cls.eth1_iface = cls.client.eth1.get_eth_iface()
             cls.eth2_name = cls.client.eth2.get_nickname()
             cls.eth2_iface = cls.client.eth2.get_eth_iface()
+            cls.kpi = KpiScope(kpi_recorder, cls.__name__, marker_kwarg(cls.all_markers, "network_mode", "target"))
             log.info(f"Recovery default switch configuration on all used devices: {cls.all_pods}")
             cls.switch.api.recovery_switch_configuration(cls.all_pods)
 
@@ -40,11 +47,13 @@ class SwitchingEthClientPortRoot(BaseCase):
     def test_01_connect_eth_clients_to_leaf(self):
         log.info("Check loop status before connect eth client to node")
         self.pod.leaf.wait_eth_connection_ready()
-        log.info("Connect eth clients to leaf")
-        log.info(f"Connect {self.eth1_name} client to {self.leaf_name} device")
-        self.switch.api.connect_eth_client(self.leaf_name, self.eth1_name)
-        log.info(f"Connect {self.eth2_name} client to {self.leaf_name} device")
-        self.switch.api.connect_eth_client(self.leaf_name, self.eth2_name)
+        log.info(f"Connect {self.eth1_name} and {self.eth2_name} clients to {self.leaf_name} device")
+        (
+            SwitchTransaction(self.switch.api)
+            .connect(self.leaf_name, self.eth1_name, link=(self.client.eth1, self.eth1_iface))
+            .connect(self.leaf_name, self.eth2_name, link=(self.client.eth2, self.eth2_iface))
+            .commit()
+        )
         self.check_internet_access_on_clients()
         self.check_ping_between_clients()
 
@@ -54,56 +63,65 @@ class SwitchingEthClientPortRoot(BaseCase):
         # default port name
         first_port = "eth0"
         second_port = "eth1"
+        # Ports the clients are connected to now, the default ones before the first move
+        eth1_port = eth2_port = None
         for i in range(0, self.attempts):
             log.info("")
             log.info(f"Switch port eth client. Attempt: {i + 1}")
-            self.switch.api.disconnect_eth_client(self.leaf_name, self.eth1_name)
-            self.switch.api.disconnect_eth_client(self.leaf_name, self.eth2_name)
-            log.info("Check loop status before connect eth client to node")
-            self.pod.leaf.wait_eth_connection_ready()
-            log.info(f"Connect {self.eth1_name} client to {self.leaf_name} device on {first_port}")
-            self.switch.api.connect_eth_client(self.leaf_name, self.eth1_name, connect_port=first_port)
-            log.info(f"Connect {self.eth2_name} client to {self.leaf_name} device on {second_port}")
-            self.switch.api.connect_eth_client(self.leaf_name, self.eth2_name, connect_port=second_port)
+            log.info(f"Move {self.eth1_name} to {first_port} and {self.eth2_name} to {second_port} of {self.leaf_name}")
+            transaction = (
+                SwitchTransaction(self.switch.api)
+                .disconnect(self.leaf_name, self.eth1_name, port=eth1_port)
+                .disconnect(self.leaf_name, self.eth2_name, port=eth2_port)
+                .connect(self.leaf_name, self.eth1_name, port=first_port, link=(self.client.eth1, self.eth1_iface))
+                .connect(self.leaf_name, self.eth2_name, port=second_port, link=(self.client.eth2, self.eth2_iface))
+            )
+            # Loop status is checked once all ports are down, before connecting the clients again
+            up_at = transaction.commit(before_up=self.pod.leaf.wait_eth_connection_ready)
+            for label, seconds in up_at.items():
+                self.kpi.record("port_up_time", seconds, change=label)
+            eth1_port, eth2_port = first_port, second_port
             first_port, second_port = self.get_port(first_port, second_port)
 
             log.info("Check sanity on leaf client")
-            assert self.pod.leaf.poll_pod_sanity() == 0, f"Sanity failed on {self.leaf_name}"
+            assert incremental_sanity(self.pod.leaf, force=True) == 0, f"Sanity failed on {self.leaf_name}"
             log.info("Sanity has been finished successfully")
             self.check_internet_access_on_clients()
             self.check_ping_between_clients()
 
     def check_internet_access_on_clients(self):
+        clients = (self.client.eth1, self.client.eth2)
         log.info("Refresh ip address on eth clients")
-        self.client.eth1.refresh_ip_address(timeout=20)
-        self.client.eth2.refresh_ip_address(timeout=20)
-
-        log.info(f"Check client internet access on {self.eth1_name}")
-        assert self.client.eth1.ping_check(), f"Ethernet client: {self.eth1_name} has not internet access"
-        log.info(f"Client: {self.eth1_name} has internet access")
+        fan_out(lambda client: refresh_ip_address(client, timeout=20), clients, name="ip refresh").raise_errors()
 
-        log.info(f"Check client internet access on {self.eth2_name}")
-        assert self.client.eth2.ping_check(), f"Ethernet client: {self.eth2_name} has not internet access"
-        log.info(f"Client: {self.eth2_name} has internet access")
+        log.info(f"Check client internet access on {self.eth1_name} and {self.eth2_name}")
+        ping_results = fan_out(lambda client: client.ping_check(), clients, name="internet access check")
+        ping_results.raise_errors()
+        assert ping_results.all_ok(), f"Ethernet clients: {ping_results.failed()} have not internet access"
+        log.info(f"Clients: {self.eth1_name} and {self.eth2_name} have internet access")
 
     def check_ping_between_clients(self):
-        eth1_ip = self.client.eth1.run(f'ip -4 add show dev {self.eth1_iface} | grep "inet "')
-        eth1_ip = eth1_ip[eth1_ip.rfind("inet") + 5 : eth1_ip.rfind("/")]
-        eth2_ip = self.client.eth2.run(f'ip -4 add show dev {self.eth2_iface} | grep "inet "')
-        eth2_ip = eth2_ip[eth2_ip.rfind("inet") + 5 : eth2_ip.rfind("/")]
+        eth1_ip = get_client_ip(self.client.eth1, self.eth1_iface)
+        eth2_ip = get_client_ip(self.client.eth2, self.eth2_iface)
 
         assert eth1_ip and eth2_ip, (
             f"Can not get IP from eth client. "
             f"{self.eth1_name}: ip address: {eth1_ip}, {self.eth2_name}: ip address: {eth2_ip}"
         )
 
-        log.info(f"Check ping from {eth1_ip} to {eth2_ip}")
-        assert self.client.eth1.ping_check(ipaddr=eth2_ip, fqdn_check=False), f"Ping from {eth1_ip} to {eth2_ip} failed"
-        log.info(f"Ping from {eth1_ip} to {eth2_ip} has been finished successfully")
-
-        log.info(f"Check ping from {eth2_ip} to {eth1_ip}")
-        assert self.client.eth2.ping_check(ipaddr=eth1_ip, fqdn_check=False), f"Ping from {eth2_ip} to {eth1_ip} failed"
-        log.info(f"Ping from {eth2_ip} to {eth1_ip} has been finished successfully")
+        targets = {self.eth1_name: (eth2_ip, self.eth1_iface), self.eth2_name: (eth1_ip, self.eth2_iface)}
+        log.info(f"Check ping between {eth1_ip} and {eth2_ip}")
+        ping_results = fan_out(
+            lambda client: ping(client, *targets[client.get_nickname()]),
+            (self.client.eth1, self.client.eth2),
+            name="ping between clients",
+        )
+        ping_results.raise_errors()
+        assert ping_results[self.eth1_name].value, f"Ping from {eth1_ip} to {eth2_ip} failed"
+        assert ping_results[self.eth2_name].value, f"Ping from {eth2_ip} to {eth1_ip} failed"
+        for client_name, result in ping_results.items():
+            record_ping_kpi(self.kpi, result.value, source=client_name)
+        log.info(f"Ping between {eth1_ip} and {eth2_ip} has been finished successfully")
 
     @staticmethod
     def get_port(first_port, second_port):
@@ -1,9 +1,12 @@
 import pytest
 import allure
-import time
 from lib.util.base_case import BaseCase
 from lib_testbed.generic.util.logger import log
 from lib.util.testrail.plugin import pytestrail
+from tests.client_connectivity.util.wait import wait_until
+from tests.client_connectivity.util.cloud_cache import enable_cloud_cache
+from tests.client_connectivity.util.readiness import ReadinessBarrier, sanity_passed
+from tests.client_connectivity.util.ifaddr import refresh_ip_address
 
 
 @pytest.mark.opensync_switch()
@@ -20,6 +23,7 @@ class SwitchingNetworkModeClientRoot(BaseCase):
     def setup_class(cls):
         cls.attempts = 3
         with cls.SafeSetup(SwitchingNetworkModeClientRoot, cls):
+            enable_cloud_cache(cls.cloud)
             cls.all_pods = cls.pods.all.get_nicknames()
             cls.gw_name = cls.pod.gw.get_nickname()
             cls.eth_name = cls.client.eth.get_nickname()
@@ -41,7 +45,7 @@ class SwitchingNetworkModeClientRoot(BaseCase):
         log.info(f"Connect {self.eth_name} client to {self.gw_name} device")
         self.switch.api.connect_eth_client(self.gw_name, self.eth_name)
         log.info("Refresh ip address on eth client")
-        self.client.eth.refresh_ip_address(timeout=20)
+        refresh_ip_address(self.client.eth, timeout=20)
         log.info(f"Check client internet access on {self.eth_name}")
         assert self.client.eth.ping_check(), "Ethernet client has not internet access"
         log.info("Client has internet access")
@@ -68,27 +72,24 @@ class SwitchingNetworkModeClientRoot(BaseCase):
 
     def wait_pods_ready(self):
         log.info("Waiting for pods to be ready")
-        assert self.cloud.user.check_pods_connected(), "Location is still disconnected from cloud"
-        log.info("Check sanity on connected pods")
-        assert not self.pods.all.poll_pods_sanity(), "Sanity is still failing"
-        log.info("Sanity has been finished successfully")
-        log.info("Wait for disable loop status")
-        self.pod.gw.wait_eth_connection_ready()
+        ready = (
+            ReadinessBarrier()
+            .add_location_stage("cloud connected", self.cloud.user.check_pods_connected)
+            .add_stage("sanity", sanity_passed)
+            .add_stage("loop flag down", lambda pod: pod.wait_eth_connection_ready(), pods=[self.pod.gw])
+            .run(self.pods.all.get_devices())
+        )
+        assert ready, f"Pods are not ready: {ready.failure}"
 
     def wait_for_connect_eth_client(self):
-        timeout = time.time() + 300
-        status = False
-        while timeout > time.time():
-            log.info(f"Check if eth client {self.eth_name} has internet access")
-            self.client.eth.refresh_ip_address(timeout=20, skip_exception=True)
-            check_ping = self.client.eth.ping_check()
-            if check_ping:
-                log.info("Client eth has internet access")
-                status = True
-                break
-            log.info("Wait 5 seconds and try again")
-            time.sleep(5)
-        assert status, "Ethernet clients have not internet access after expired 300s"
+        client_wait = wait_until(self.eth_client_has_internet, timeout=300, name="eth client internet access")
+        assert client_wait, "Ethernet clients have not internet access after expired 300s"
+        log.info(f"Client eth has internet access after {client_wait.elapsed:.2f} sec")
+
+    def eth_client_has_internet(self):
+        log.info(f"Check if eth client {self.eth_name} has internet access")
+        refresh_ip_address(self.client.eth, timeout=20, skip_exception=True)
+        return self.client.eth.ping_check()
 
 
 @pytest.mark.wan(port="primary")
@@ -1,10 +1,15 @@
 import pytest
 import allure
-import time
 import datetime
 from lib.util.base_case import BaseCase
 from lib_testbed.generic.util.logger import log
 from lib.util.testrail.plugin import pytestrail
+from tests.client_connectivity.util.fan_out import fan_out
+from tests.client_connectivity.util.wait import wait_until
+from tests.client_connectivity.util.cloud_cache import enable_cloud_cache
+from tests.client_connectivity.util.ifaddr import get_client_ip, refresh_ip_address
+from tests.client_connectivity.util.readiness import ReadinessBarrier, sanity_passed
+from tests.client_connectivity.util.switch_transaction import SwitchTransaction
 
 
 @pytest.mark.opensync_switch()
@@ -25,6 +30,7 @@ class Test09NetworkModeChangeWithTwoEthClients(BaseCase):
     def setup_class(cls):
         cls.attempts = 3
         with cls.SafeSetup(Test09NetworkModeChangeWithTwoEthClients, cls):
+            enable_cloud_cache(cls.cloud)
             cls.all_pods = cls.pods.all.get_nicknames()
             cls.leaf_name = cls.pod.leaf.get_nickname()
             cls.eth1_name = cls.client.eth1.get_nickname()
@@ -62,11 +68,13 @@ class Test09NetworkModeChangeWithTwoEthClients(BaseCase):
     def test_01_2_connect_eth_clients_to_leaf(self):
         log.info("Check loop status before connect eth client to node")
         self.pod.leaf.wait_eth_connection_ready()
-        log.info("Connect eth clients to leaf")
-        log.info(f"Connect {self.eth1_name} client to {self.leaf_name} device")
-        self.switch.api.connect_eth_client(self.leaf_name, self.eth1_name)
-        log.info(f"Connect {self.eth2_name} client to {self.leaf_name} device")
-        self.switch.api.connect_eth_client(self.leaf_name, self.eth2_name)
+        log.info(f"Connect {self.eth1_name} and {self.eth2_name} clients to {self.leaf_name} device")
+        (
+            SwitchTransaction(self.switch.api)
+            .connect(self.leaf_name, self.eth1_name, link=(self.client.eth1, self.eth1_iface))
+            .connect(self.leaf_name, self.eth2_name, link=(self.client.eth2, self.eth2_iface))
+            .commit()
+        )
         self.check_internet_access_on_clients()
         self.check_ping_between_clients()
 
@@ -90,36 +98,36 @@ class Test09NetworkModeChangeWithTwoEthClients(BaseCase):
         )["result"], "Optimization check failed"
 
     def check_internet_access_on_clients(self):
+        clients = (self.client.eth1, self.client.eth2)
         log.info("Refresh ip address on eth clients")
-        self.client.eth1.refresh_ip_address(timeout=20)
-        self.client.eth2.refresh_ip_address(timeout=20)
-
-        log.info(f"Check client internet access on {self.eth1_name}")
-        assert self.client.eth1.ping_check(), f"Ethernet client: {self.eth1_name} has not internet access"
-        log.info(f"Client: {self.eth1_name} has internet access")
+        fan_out(lambda client: refresh_ip_address(client, timeout=20), clients, name="ip refresh").raise_errors()
 
-        log.info(f"Check client internet access on {self.eth2_name}")
-        assert self.client.eth2.ping_check(), f"Ethernet client: {self.eth2_name} has not internet access"
-        log.info(f"Client: {self.eth2_name} has internet access")
+        log.info(f"Check client internet access on {self.eth1_name} and {self.eth2_name}")
+        ping_results = fan_out(lambda client: client.ping_check(), clients, name="internet access check")
+        ping_results.raise_errors()
+        assert ping_results.all_ok(), f"Ethernet clients: {ping_results.failed()} have not internet access"
+        log.info(f"Clients: {self.eth1_name} and {self.eth2_name} have internet access")
 
     def check_ping_between_clients(self):
-        eth1_ip = self.client.eth1.run(f'ip -4 add show dev {self.eth1_iface} | grep "inet "')
-        eth1_ip = eth1_ip[eth1_ip.rfind("inet") + 5 : eth1_ip.rfind("/")]
-        eth2_ip = self.client.eth2.run(f'ip -4 add show dev {self.eth2_iface} | grep "inet "')
-        eth2_ip = eth2_ip[eth2_ip.rfind("inet") + 5 : eth2_ip.rfind("/")]
+        eth1_ip = get_client_ip(self.client.eth1, self.eth1_iface)
+        eth2_ip = get_client_ip(self.client.eth2, self.eth2_iface)
 
         assert eth1_ip and eth2_ip, (
             f"Can not get IP from eth client. "
             f"{self.eth1_name}: ip address: {eth1_ip}, {self.eth2_name}: ip address: {eth2_ip}"
         )
 
-        log.info(f"Check ping from {eth1_ip} to {eth2_ip}")
-        assert self.client.eth1.ping_check(ipaddr=eth2_ip, fqdn_check=False), f"Ping from {eth1_ip} to {eth2_ip} failed"
-        log.info(f"Ping from {eth1_ip} to {eth2_ip} has been finished successfully")
-
-        log.info(f"Check ping from {eth2_ip} to {eth1_ip}")
-        assert self.client.eth2.ping_check(ipaddr=eth1_ip, fqdn_check=False), f"Ping from {eth2_ip} to {eth1_ip} failed"
-        log.info(f"Ping from {eth2_ip} to {eth1_ip} has been finished successfully")
+        targets = {self.eth1_name: eth2_ip, self.eth2_name: eth1_ip}
+        log.info(f"Check ping between {eth1_ip} and {eth2_ip}")
+        ping_results = fan_out(
+            lambda client: client.ping_check(ipaddr=targets[client.get_nickname()], fqdn_check=False),
+            (self.client.eth1, self.client.eth2),
+            name="ping between clients",
+        )
+        ping_results.raise_errors()
+        assert ping_results[self.eth1_name].value, f"Ping from {eth1_ip} to {eth2_ip} failed"
+        assert ping_results[self.eth2_name].value, f"Ping from {eth2_ip} to {eth1_ip} failed"
+        log.info(f"Ping between {eth1_ip} and {eth2_ip} has been finished successfully")
 
     def get_net_for_change(self):
         network_mode = self.cloud.user.get_network_mode()
@@ -131,26 +139,22 @@ class Test09NetworkModeChangeWithTwoEthClients(BaseCase):
 
     def wait_pods_ready(self):
         log.info("Waiting for pods to be ready")
-        assert self.cloud.user.check_pods_connected(), "Location is still disconnected from cloud"
-        log.info("Check sanity on connected pods")
-        assert not self.pods.all.poll_pods_sanity(), "Sanity is still failing"
-        log.info("Sanity has been finished successfully")
-        log.info("Wait for disable loop status")
-        self.pod.leaf.wait_eth_connection_ready()
+        ready = (
+            ReadinessBarrier()
+            .add_location_stage("cloud connected", self.cloud.user.check_pods_connected)
+            .add_stage("sanity", sanity_passed)
+            .add_stage("loop flag down", lambda pod: pod.wait_eth_connection_ready(), pods=[self.pod.leaf])
+            .run(self.pods.all.get_devices())
+        )
+        assert ready, f"Pods are not ready: {ready.failure}"
 
     def wait_for_connect_eth_client(self):
-        timeout = time.time() + 300
-        status = False
-        while timeout > time.time():
-            log.info(f"Check if eth clients {self.eth1_name} and {self.eth2_name} have internet access")
-            self.client.eth1.refresh_ip_address(timeout=20, skip_exception=True)
-            self.client.eth2.refresh_ip_address(timeout=20, skip_exception=True)
-            check_ping_eth1 = self.client.eth1.ping_check(skip_exception=True)
-            check_ping_eth2 = self.client.eth2.ping_check(skip_exception=True)
-            if check_ping_eth1 and check_ping_eth2:
-                log.info("Ethernet clients have internet access")
-                status = True
-                break
-            log.info("Wait 5 seconds and try again")
-            time.sleep(5)
-        assert status, "Ethernet clients have not internet access after expired 300s"
+        client_wait = wait_until(self.eth_clients_have_internet, timeout=300, name="eth clients internet access")
+        assert client_wait, "Ethernet clients have not internet access after expired 300s"
+        log.info(f"Ethernet clients have internet access after {client_wait.elapsed:.2f} sec")
+
+    def eth_clients_have_internet(self):
+        log.info(f"Check if eth clients {self.eth1_name} and {self.eth2_name} have internet access")
+        clients = (self.client.eth1, self.client.eth2)
+        fan_out(lambda client: refresh_ip_address(client, timeout=20, skip_exception=True), clients, name="ip refresh")
+        return fan_out(lambda client: client.ping_check(skip_exception=True), clients, name="ping check").all_ok()
@@ -4,6 +4,10 @@ import time
 from lib.util.base_case import BaseCase
 from lib_testbed.generic.util.logger import log
 from lib.util.testrail.plugin import pytestrail
+from tests.client_connectivity.util.fan_out import fan_out
+from tests.client_connectivity.util.readiness import ReadinessBarrier, sanity_passed
+from tests.client_connectivity.util.ifaddr import refresh_ip_address
+from tests.client_connectivity.util.switch_transaction import SwitchTransaction
 
 
 @pytest.mark.opensync_switch()
@@ -41,11 +45,13 @@ class EthClientConnectivityAfterRebootRoot(BaseCase):
     def test_01_connect_eth_clients_to_leaf(self):
         log.info("Check loop status before connect eth client to node")
         self.wait_eth_connection_ready(self.pod.leaf)
-        log.info("Connect eth clients to leaf")
-        log.info(f"Connect {self.eth1_name} client to {self.leaf_name} device")
-        self.switch.api.connect_eth_client(self.leaf_name, self.eth1_name)
-        log.info(f"Connect {self.eth2_name} client to {self.leaf_name} device")
-        self.switch.api.connect_eth_client(self.leaf_name, self.eth2_name)
+        log.info(f"Connect {self.eth1_name} and {self.eth2_name} clients to {self.leaf_name} device")
+        (
+            SwitchTransaction(self.switch.api)
+            .connect(self.leaf_name, self.eth1_name, link=(self.client.eth1, self.eth1_iface))
+            .connect(self.leaf_name, self.eth2_name, link=(self.client.eth2, self.eth2_iface))
+            .commit()
+        )
         self.check_internet_access_on_clients()
 
     @allure.title("Reboot device")
@@ -56,28 +62,30 @@ class EthClientConnectivityAfterRebootRoot(BaseCase):
     @allure.title("Check client connectivity")
     def test_03_check_client_eth_connectivity(self):
         timeout = time.time() + 300
-        eth1_dhcp_status = self.client.eth1.refresh_ip_address(timeout=20, skip_exception=True)
-        eth2_dhcp_status = self.client.eth2.refresh_ip_address(timeout=20, skip_exception=True)
+        clients = {self.eth1_name: self.client.eth1, self.eth2_name: self.client.eth2}
+        dhcp_status = {}
         while timeout > time.time():
             log.info(f"Check if eth clients: {self.eth1_name} and {self.eth2_name} got IP from {self.leaf_name}")
-            if not eth1_dhcp_status:
-                log.warn(f"{self.eth1_name} did not get IP address from {self.leaf_name}. Refreshing IP address...")
-                eth1_dhcp_status = self.client.eth1.refresh_ip_address(timeout=20, skip_exception=True)
-
-            if not eth2_dhcp_status:
-                log.warn(f"{self.eth2_name} did not get IP address from {self.leaf_name}. Refreshing IP address...")
-                eth2_dhcp_status = self.client.eth2.refresh_ip_address(timeout=20, skip_exception=True)
-
-            if eth1_dhcp_status and eth2_dhcp_status:
+            pending = [client for name, client in clients.items() if not dhcp_status.get(name)]
+            refresh_results = fan_out(
+                lambda client: refresh_ip_address(client, timeout=20, skip_exception=True), pending, name="ip refresh"
+            )
+            dhcp_status.update({name: result.value for name, result in refresh_results.items()})
+            if all(dhcp_status.get(name) for name in clients):
                 log.info(f"All clients got IP address from {self.leaf_name}")
                 break
+            for name in refresh_results.failed():
+                log.warn(f"{name} did not get IP address from {self.leaf_name}. Refreshing IP address...")
             log.info("Wait 5 seconds and try again")
             time.sleep(5)
 
-        assert eth1_dhcp_status and eth2_dhcp_status, f"" f"Eth Clients did not get IP address from {self.leaf_name}"
+        assert all(
+            dhcp_status.get(name) for name in clients
+        ), f"Eth Clients did not get IP address from {self.leaf_name}"
 
-        assert self.client.eth1.ping_check(), f"{self.eth1_name} has no internet access"
-        assert self.client.eth2.ping_check(), f"{self.eth2_name} has no internet access"
+        ping_results = fan_out(lambda client: client.ping_check(), clients.values(), name="internet access check")
+        ping_results.raise_errors()
+        assert ping_results.all_ok(), f"{ping_results.failed()} have no internet access"
 
     def wait_pods_ready(self):
         log.info("Waiting for disconnect pods from cloud")
@@ -86,26 +94,24 @@ class EthClientConnectivityAfterRebootRoot(BaseCase):
             minpods=minpods
         ), "Pods have not been disconnected from cloud after recreate location"
         log.info("Waiting for pods to be ready")
-        assert self.cloud.user.check_pods_connected(), "Location is still disconnected from cloud"
+        barrier = ReadinessBarrier().add_location_stage("cloud connected", self.cloud.user.check_pods_connected)
         if "" not in self.pods.all.get_nicknames():
-            log.info("Check sanity on connected pods")
-            assert not self.pods.all.poll_pods_sanity(), "Sanity is still failing"
-            log.info("Sanity has been finished successfully")
-        log.info("Wait for disable loop status")
-        self.wait_eth_connection_ready(self.pod.leaf)
+            barrier.add_stage("sanity", sanity_passed)
+        # Pods without management access wait a fixed time for the loop flag instead
+        barrier.add_stage("loop flag down", self.wait_eth_connection_ready, pods=[self.pod.leaf])
+        ready = barrier.run(self.pods.all.get_devices())
+        assert ready, f"Pods are not ready: {ready.failure}"
 
     def check_internet_access_on_clients(self):
+        clients = (self.client.eth1, self.client.eth2)
         log.info("Refresh ip address on eth clients")
-        self.client.eth1.refresh_ip_address(timeout=20)
-        self.client.eth2.refresh_ip_address(timeout=20)
-
-        log.info(f"Check client internet access on {self.eth1_name}")
-        assert self.client.eth1.ping_check(), f"Ethernet client: {self.eth1_name} has not internet access"
-        log.info(f"Client: {self.eth1_name} has internet access")
+        fan_out(lambda client: refresh_ip_address(client, timeout=20), clients, name="ip refresh").raise_errors()
 
-        log.info(f"Check client internet access on {self.eth2_name}")
-        assert self.client.eth2.ping_check(), f"Ethernet client: {self.eth2_name} has not internet access"
-        log.info(f"Client: {self.eth2_name} has internet access")
+        log.info(f"Check client internet access on {self.eth1_name} and {self.eth2_name}")
+        ping_results = fan_out(lambda client: client.ping_check(), clients, name="internet access check")
+        ping_results.raise_errors()
+        assert ping_results.all_ok(), f"Ethernet clients: {ping_results.failed()} have not internet access"
+        log.info(f"Clients: {self.eth1_name} and {self.eth2_name} have internet access")
 
     @classmethod
     def get_leaf_to_test(cls):
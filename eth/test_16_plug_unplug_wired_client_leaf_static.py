@@ -2,7 +2,10 @@ import allure
 import pytest
 from lib_testbed.generic.util.logger import log
 from tests.client_connectivity.eth.wired_connection_root import WiredConnectionRoot
+from tests.client_connectivity.util.phases import PhaseProfiler
 from lib.util.testrail.plugin import pytestrail
+from tests.client_connectivity.util.cloud_cache import invalidate_cloud_caches
+from tests.client_connectivity.util.switch_transaction import switch_changed
 
 
 @pytest.mark.opensync_pod(role="leaf", switch=".*")
@@ -20,33 +23,49 @@ class PlugUnplugWiredClientLeafStatic(WiredConnectionRoot):
         max_conn_time_noc = self.leaf_onboard_time + 60 + 30
         log.info(f"KPI for Leaf's ETH client working after leaf reboot: {max_conn_time} sec")
         log.info(f"KPI for Leaf's ETH client showing in FTL after leaf reboot: {max_conn_time_noc} sec")
-        for i in range(0, 4):
-            log.info("*" * 75)
-            log.info(f"Unplugging and plugging eth client, attempt: {i + 1}")
-            # Timeout no matter here, because verification of KPI is done after.
-            con_time, start_time = self.connect_eth_client(device=self.pod.leaf, dhcp_timeout=200)
-            log.info("Verify client at the NOC")
-            stop_time = self.verify_client_noc(self.pod.leaf)
-            noc_conn_time = stop_time - start_time
-            log.info(f"Eth client connection time: {con_time:.2f} sec")
-            log.info(f"Eth client NOC appear time: {noc_conn_time:.2f} sec")
-            assert con_time < max_conn_time, f"Connection time too long about {con_time - max_conn_time}"
-            assert (
-                noc_conn_time < max_conn_time_noc
-            ), f"NOC appear time too long about {noc_conn_time - max_conn_time_noc}"
+        kpi = self.kpi_scope(wan_id)
+        profiler = PhaseProfiler(f"{self.pod.leaf.get_nickname()} onboarding")
+        try:
+            for i in range(0, 4):
+                kpi.iteration = i + 1
+                log.info("*" * 75)
+                log.info(f"Unplugging and plugging eth client, attempt: {i + 1}")
+                # Timeout no matter here, because verification of KPI is done after.
+                con_time, start_time = self.connect_eth_client(
+                    device=self.pod.leaf, dhcp_timeout=200, kpi=kpi, profiler=profiler
+                )
+                log.info("Verify client at the NOC")
+                stop_time = self.verify_client_noc(self.pod.leaf, since=start_time, profiler=profiler)
+                noc_conn_time = stop_time - start_time
+                kpi.record("con_time", con_time)
+                kpi.record("noc_conn_time", noc_conn_time)
+                profiler.record_kpi(kpi)
+                log.info(profiler.describe())
+                assert (
+                    con_time < max_conn_time
+                ), f"Connection time too long about {con_time - max_conn_time}{profiler.hint()}"
+                assert (
+                    noc_conn_time < max_conn_time_noc
+                ), f"NOC appear time too long about {noc_conn_time - max_conn_time_noc}{profiler.hint()}"
 
-            self.switch.api.disconnect_eth_client(self.pod.leaf.nickname, self.eth_name)
-            log.info(f"Reboot {self.pod.leaf.nickname} after connect eth client")
-            self.pod.leaf.reboot()
-            log.info("Wait for disconnect")
-            assert self.cloud.user.check_pods_connected(
-                minpods=1, option="disconnected"
-            ), f"{self.pod.leaf.nickname} not disconnected after reboot"
-            log.info("Leaf device disconnected")
-            log.info("Wait for connect all pods to cloud")
-            assert self.cloud.user.check_pods_connected(), "Not all devices connected to cloud"
-            log.info("All devices connected to cloud")
-            self.verify_client_noc(present=False)
+                self.switch.api.disconnect_eth_client(self.pod.leaf.nickname, self.eth_name)
+                switch_changed()
+                log.info(f"Reboot {self.pod.leaf.nickname} after connect eth client")
+                self.pod.leaf.reboot()
+                invalidate_cloud_caches(f"after the reboot of {self.pod.leaf.nickname}")
+                log.info("Wait for disconnect")
+                assert self.cloud.user.check_pods_connected(
+                    minpods=1, option="disconnected"
+                ), f"{self.pod.leaf.nickname} not disconnected after reboot"
+                log.info("Leaf device disconnected")
+                log.info("Wait for connect all pods to cloud")
+                assert self.cloud.user.check_pods_connected(), "Not all devices connected to cloud"
+                log.info("All devices connected to cloud")
+                self.verify_client_noc(present=False)
+        finally:
+            # Also on a failure inside connect_eth_client or verify_client_noc
+            log.info(profiler.describe())
+            log.info(f"Onboarding phases per iteration, in seconds:\n{profiler.table()}")
 
 
 @pytest.mark.duration(seconds=1577)
@@ -4,27 +4,31 @@ import time
 from lib_testbed.generic.util.logger import log
 from tests.client_connectivity.eth.wired_connection_root import WiredConnectionRoot
 from lib.util.testrail.plugin import pytestrail
+from tests.client_connectivity.util.switch_transaction import switch_changed
 
 
 @pytest.mark.opensync_pod(role="gw", switch=".*")
 class PlugUnplugWiredClientGwDynamic(WiredConnectionRoot):
     @allure.title("Plugging and unplugging a wired client")
     def test_01_plug_and_unplug_eth_client(self, wan_id):
+        kpi = self.kpi_scope(wan_id)
         for i in range(0, 4):
+            kpi.iteration = i + 1
             log.info("*" * 75)
             log.info(f"Unplugging and plugging eth client, attempt: {i + 1}")
             # Timeout no matter here, because verification of KPI is done after.
-            con_time, start_time = self.connect_eth_client(device=self.pod.gw, dhcp_timeout=200)
+            con_time, start_time = self.connect_eth_client(device=self.pod.gw, dhcp_timeout=200, kpi=kpi)
             log.info("Verify client at the NOC")
-            stop_time = self.verify_client_noc(self.pod.gw)
+            stop_time = self.verify_client_noc(self.pod.gw, since=start_time)
             noc_conn_time = stop_time - start_time
             self.switch.api.disconnect_eth_client(self.pod.gw.get_nickname(), self.eth_name)
+            switch_changed()
             start_time = time.time()
-            stop_time = self.verify_client_noc(present=False)
+            stop_time = self.verify_client_noc(present=False, since=start_time)
             noc_disconn_time = stop_time - start_time
-            log.info(f"Eth client connection time: {con_time:.2f} sec")
-            log.info(f"Eth client NOC appear time: {noc_conn_time:.2f} sec")
-            log.info(f"Eth client NOC disappear time: {noc_disconn_time:.2f} sec")
+            kpi.record("con_time", con_time)
+            kpi.record("noc_conn_time", noc_conn_time)
+            kpi.record("noc_disconn_time", noc_disconn_time)
             assert con_time < 20, "Connection time too long"
             assert noc_conn_time < 50, "NOC appear time too long"
             assert noc_disconn_time < 30, "NOC disappear time too long"
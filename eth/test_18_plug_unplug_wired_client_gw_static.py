@@ -2,7 +2,9 @@ import allure
 import pytest
 from lib_testbed.generic.util.logger import log
 from tests.client_connectivity.eth.wired_connection_root import WiredConnectionRoot
+from tests.client_connectivity.util.phases import PhaseProfiler
 from lib.util.testrail.plugin import pytestrail
+from tests.client_connectivity.util.switch_transaction import switch_changed
 
 
 @pytest.mark.opensync_pod(role="gw", switch=".*")
@@ -18,32 +20,47 @@ class PlugUnplugWiredClientGwStatic(WiredConnectionRoot):
     def test_01_plug_and_unplug_eth_client(self, wan_id):
         max_conn_time = self.gw_onboard_time + 60
         max_conn_time_noc = self.gw_onboard_time + 60 + 30
-        for i in range(0, 4):
-            log.info("*" * 75)
-            log.info(f"Unplugging and plugging eth client, attempt: {i + 1}")
-            con_time, start_time = self.connect_eth_client(device=self.pod.gw, dhcp_timeout=200)
-            log.info("Verify client at the NOC")
-            stop_time = self.verify_client_noc(self.pod.gw)
-            noc_conn_time = stop_time - start_time
-            log.info(f"Eth client connection time: {con_time:.2f} sec")
-            log.info(f"Eth client NOC appear time: {noc_conn_time:.2f} sec")
-            assert con_time < max_conn_time, f"Connection time too long about {con_time - max_conn_time}"
-            assert (
-                noc_conn_time < max_conn_time_noc
-            ), f"NOC appear time too long about {noc_conn_time - max_conn_time_noc}"
-            log.info("Disconnecting eth client")
-            self.switch.api.disconnect_eth_client(self.pod.gw.nickname, self.eth_name)
-            log.info(f"Reboot {self.pod.gw.nickname} after connect eth client")
-            self.cloud.user.reboot_pod(self.pod.gw.lib.device.config["id"])
-            log.info("Wait for disconnect")
-            assert self.cloud.user.check_pods_disconnected(
-                minpods=2
-            ), f"{self.pod.gw.get_nickname()} not disconnected after reboot"
-            log.info("GW device disconnected")
-            log.info("Wait for connect all pods to the cloud")
-            assert self.cloud.user.check_pods_connected(), "Not all devices connected to cloud"
-            log.info("All devices connected to the cloud")
-            self.verify_client_noc(present=False)
+        kpi = self.kpi_scope(wan_id)
+        profiler = PhaseProfiler(f"{self.pod.gw.get_nickname()} onboarding")
+        try:
+            for i in range(0, 4):
+                kpi.iteration = i + 1
+                log.info("*" * 75)
+                log.info(f"Unplugging and plugging eth client, attempt: {i + 1}")
+                con_time, start_time = self.connect_eth_client(
+                    device=self.pod.gw, dhcp_timeout=200, kpi=kpi, profiler=profiler
+                )
+                log.info("Verify client at the NOC")
+                stop_time = self.verify_client_noc(self.pod.gw, since=start_time, profiler=profiler)
+                noc_conn_time = stop_time - start_time
+                kpi.record("con_time", con_time)
+                kpi.record("noc_conn_time", noc_conn_time)
+                profiler.record_kpi(kpi)
+                log.info(profiler.describe())
+                assert (
+                    con_time < max_conn_time
+                ), f"Connection time too long about {con_time - max_conn_time}{profiler.hint()}"
+                assert (
+                    noc_conn_time < max_conn_time_noc
+                ), f"NOC appear time too long about {noc_conn_time - max_conn_time_noc}{profiler.hint()}"
+                log.info("Disconnecting eth client")
+                self.switch.api.disconnect_eth_client(self.pod.gw.nickname, self.eth_name)
+                switch_changed()
+                log.info(f"Reboot {self.pod.gw.nickname} after connect eth client")
+                self.cloud.user.reboot_pod(self.pod.gw.lib.device.config["id"])
+                log.info("Wait for disconnect")
+                assert self.cloud.user.check_pods_disconnected(
+                    minpods=2
+                ), f"{self.pod.gw.get_nickname()} not disconnected after reboot"
+                log.info("GW device disconnected")
+                log.info("Wait for connect all pods to the cloud")
+                assert self.cloud.user.check_pods_connected(), "Not all devices connected to cloud"
+                log.info("All devices connected to the cloud")
+                self.verify_client_noc(present=False)
+        finally:
+            # Also on a failure inside connect_eth_client or verify_client_noc
+            log.info(profiler.describe())
+            log.info(f"Onboarding phases per iteration, in seconds:\n{profiler.table()}")
 
 
 @pytest.mark.tag_frv
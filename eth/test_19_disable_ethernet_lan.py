@@ -7,6 +7,9 @@ from lib.util.testrail.plugin import pytestrail
 from tests.client_connectivity.eth.wired_connection_root import (
     connect_eth_client_to_pod,
 )
+from tests.client_connectivity.util.fan_out import fan_out
+from tests.client_connectivity.util.ping import ping
+from tests.client_connectivity.util.ifaddr import refresh_ip_address
 
 
 @pytest.mark.opensync_switch()
@@ -82,26 +85,44 @@ class DisableEthernetLANRoot(BaseCase):
         target_name = target.get_nickname()
         target_ip = target.get_eth_info()["eth"].popitem()[1].get("ip", fallback_target_ip)
         log.info(f"Pinging {target_name} client from {source_name} client ...")
-        result = source.ping_check(ipaddr=target_ip, fqdn_check=False)
-        outcome = "succeeded" if result else "failed"
+        result = ping(source, target_ip, source.get_eth_iface())
+        outcome = f"succeeded: {result}" if result else "failed"
         log.info(f"Pinging {target_name} client from {source_name} client {outcome}")
         return result
 
+    def check_internet_on_clients(self):
+        results = fan_out(self.check_internet, (self.client1, self.client2), name="internet access check")
+        results.raise_errors()
+        return results
+
     def check_internet_accessible(self):
-        for client in (self.client1, self.client2):
-            assert self.check_internet(client), f"{client.get_nickname()} client has no internet access"
+        for client_name, result in self.check_internet_on_clients().items():
+            assert result.value, f"{client_name} client has no internet access"
 
     def check_internet_inaccessible(self):
-        for client in (self.client1, self.client2):
-            assert not self.check_internet(client), f"{client.get_nickname()} client has internet access"
+        for client_name, result in self.check_internet_on_clients().items():
+            assert not result.value, f"{client_name} client has internet access"
+
+    def ping_clients_both_ways(self):
+        peers = {
+            self.client1.get_nickname(): (self.client2, self.client_ips["client2"]),
+            self.client2.get_nickname(): (self.client1, self.client_ips["client1"]),
+        }
+        results = fan_out(
+            lambda source: self.ping_between_clients(source, *peers[source.get_nickname()]),
+            (self.client1, self.client2),
+            name="ping between clients",
+        )
+        results.raise_errors()
+        return results
 
     def check_clients_accessible(self):
-        assert self.ping_between_clients(self.client1, self.client2, self.client_ips["client2"])
-        assert self.ping_between_clients(self.client2, self.client1, self.client_ips["client1"])
+        for client_name, result in self.ping_clients_both_ways().items():
+            assert result.value, f"Ping from {client_name} client to its peer failed"
 
     def check_clients_inaccessible(self):
-        assert not self.ping_between_clients(self.client1, self.client2, self.client_ips["client2"])
-        assert not self.ping_between_clients(self.client2, self.client1, self.client_ips["client1"])
+        for client_name, result in self.ping_clients_both_ways().items():
+            assert not result.value, f"Ping from {client_name} client to its peer succeeded"
 
     @allure.title("Connect first eth client to gateway or one of the leaf pods")
     def test_01_connect_first_client(self):
@@ -112,7 +133,7 @@ class DisableEthernetLANRoot(BaseCase):
     def test_02_connect_second_client(self):
         if self.second_client_static:
             log.info(f"Refreshing ip address on {self.client2.get_nickname()} client")
-            self.client2.refresh_ip_address(timeout=20)
+            refresh_ip_address(self.client2, timeout=20)
         else:
             connect_eth_client_to_pod(self.switch.api, self.client2, self.pod2)
         self.client_ips["client2"] = self.client2.get_eth_info()["eth"].popitem()[1]["ip"]
@@ -140,9 +161,10 @@ class DisableEthernetLANRoot(BaseCase):
     @allure.title("Enable Ethernet LAN")
     def test_08_enable_ethernet_lan(self):
         self.enable_ethernet_lan()
-        for client in (self.client1, self.client2):
-            log.info(f"Refreshing ip address on {client.get_nickname()} client")
-            client.refresh_ip_address(timeout=20)
+        log.info("Refreshing ip address on eth clients")
+        fan_out(
+            lambda client: refresh_ip_address(client, timeout=20), (self.client1, self.client2), name="ip refresh"
+        ).raise_errors()
 
     @allure.title("Check internet is accessible on both eth clients")
     def test_09_check_internet_connectivity(self):
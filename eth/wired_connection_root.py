@@ -4,6 +4,24 @@ import pytest
 from lib.util.base_case import BaseCase
 from lib_testbed.generic.util.logger import log
 from lib.util.common_marks import WanParam
+from tests.client_connectivity.util.wait import all_of, key_equals, wait_until
+from tests.client_connectivity.util.cloud_cache import enable_cloud_cache, invalidate_cloud_caches
+from tests.client_connectivity.util.kpi import KpiScope, kpi_recorder, marker_kwarg
+from tests.client_connectivity.util.ifaddr import get_client_ip, refresh_ip_address
+from tests.client_connectivity.util.phases import (
+    CONTROLLER_UP,
+    DISCONNECTED,
+    FIRST_PING,
+    LEASE_ACQUIRED,
+    LOOP_FLAG_DOWN,
+    NOC_VISIBLE,
+    REBOOT_ISSUED,
+)
+from tests.client_connectivity.util.switch_transaction import switch_changed
+
+
+def phase_hint(profiler):
+    return profiler.hint() if profiler else ""
 
 
 def connect_eth_client_to_pod(switch, client, pod):
@@ -13,8 +31,9 @@ def connect_eth_client_to_pod(switch, client, pod):
     assert pod.wait_eth_connection_ready()
     log.info(f"Connecting {client_name} client to {pod_name} device")
     switch.connect_eth_client(pod_name, client_name)
+    switch_changed()
     log.info(f"Refreshing ip address on {client_name} client")
-    client.refresh_ip_address(timeout=20)
+    refresh_ip_address(client, timeout=20)
     log.info(f"Client {client_name} is connected to {pod_name} device")
 
 
@@ -29,21 +48,28 @@ class WiredConnectionRoot(BaseCase):
     @classmethod
     def setup_class(cls):
         with cls.SafeSetup(__class__, cls):
+            enable_cloud_cache(cls.cloud)
             cls.all_pods = [device["name"] for device in cls.tb_config["Nodes"]]
             log.info(f"Recovery default switch configuration on all used devices: {cls.all_pods}")
             cls.switch.api.recovery_switch_configuration(cls.all_pods)
+            switch_changed()
             cls.eth_iface = cls.client.eth1.get_eth_iface()
             cls.client_mac = cls.client.eth1.get_mac(cls.eth_iface)
             cls.eth_name = cls.client.eth1.get_nickname()
             cls.static_mode = False
+            cls.network_mode = marker_kwarg(cls.all_markers, "network_mode", "target")
 
     @classmethod
     def teardown_class(cls):
         with cls.SafeTeardown(__class__, cls):
             log.info(f"Recovery default switch configuration on all used devices: {cls.all_pods}")
             cls.switch.api.recovery_switch_configuration(cls.all_pods)
+            switch_changed()
+
+    def kpi_scope(self, wan_id=None):
+        return KpiScope(kpi_recorder, type(self).__name__, network_mode=self.network_mode, wan_id=wan_id)
 
-    def connect_eth_client(self, device, dhcp_timeout=20):
+    def connect_eth_client(self, device, dhcp_timeout=20, kpi=None, profiler=None):
         log.info("Check loop status before connect eth client to node")
         device.wait_eth_connection_ready()
         device_name = device.get_nickname()
@@ -51,76 +77,104 @@ class WiredConnectionRoot(BaseCase):
         device_id = device.get_serial_number()
         log.info(f"Connect {self.eth_name} client to {device_name} device")
         self.switch.api.connect_eth_client(device_name, self.eth_name)
+        switch_changed()
         start_time = time.time()
+        if profiler:
+            profiler.start(start_time)
         if self.static_mode:
             log.info(f"Reboot {device_name} after connect eth client")
             device.reboot()
+            invalidate_cloud_caches(f"after the reboot of {device_name}")
+            if profiler:
+                profiler.mark(REBOOT_ISSUED)
             log.info(f"Wait for {device_id} disconnect")
             assert self.cloud.user.check_pods_connected(
                 expect_pods=[device_id], option="disconnected"
-            ), f"{device_name} no disconnected after reboot"
+            ), f"{device_name} no disconnected after reboot{phase_hint(profiler)}"
             log.info("Device is disconnected")
+            if profiler:
+                profiler.mark(DISCONNECTED)
             log.info(f"Wait for connect {device_id} to the cloud")
             assert self.cloud.user.check_pods_connected(
                 expect_pods=[device_id], only_controller=True
-            ), "Not all devices connected to cloud"
+            ), f"Not all devices connected to cloud{phase_hint(profiler)}"
             log.info("Required DUT connected to cloud")
+            if profiler:
+                profiler.mark(CONTROLLER_UP)
             onboarding_time = time.time() - start_time
             log.info(f"Onboarding time (without home VAPs): {onboarding_time:.2f} seconds")
+            if kpi:
+                kpi.record("onboarding_time", onboarding_time)
             # we don't need to check loop protection on the gateway.
             if device.lib.device.config.get("role", "") != "gw":
                 st_time = time.time()
                 log.info("Check loop status before connect eth client to node")
                 device.wait_eth_connection_ready()
                 log.info(f"Time spent on putting loop flag down: {time.time() - st_time:.2f}")
+                if profiler:
+                    profiler.mark(LOOP_FLAG_DOWN)
+                if kpi:
+                    kpi.record("loop_flag_time", time.time() - st_time)
         log.info("Refresh ip address on eth client")
         st_time = time.time()
         timeout = st_time + dhcp_timeout
         while time.time() < timeout:
-            ret = self.client.eth1.refresh_ip_address(timeout=7, clear_dhcp=False, skip_exception=True)
+            ret = refresh_ip_address(self.client.eth1, timeout=7, clear_dhcp=False, skip_exception=True)
             if ret:
                 log.info(f"DHCP received after: {time.time() - st_time:.2f} sec")
+                if kpi:
+                    kpi.record("dhcp_time", time.time() - st_time)
+                if profiler:
+                    profiler.mark(LEASE_ACQUIRED)
                 break
             time.sleep(2)
         else:
-            assert False, "Client did not received IP address"
+            assert False, f"Client did not received IP address{phase_hint(profiler)}"
         ip_refresh_time = time.time() - start_time
         log.info(f"Check client internet access on {self.eth_name}")
-        assert self.client.eth1.ping_check(), "Ethernet client has not internet access"
+        assert self.client.eth1.ping_check(), f"Ethernet client has not internet access{phase_hint(profiler)}"
         log.info("Client has internet access")
+        if profiler:
+            profiler.mark(FIRST_PING)
         return ip_refresh_time, start_time
 
-    def verify_client_noc(self, pod=None, present=True):
-        timeout = time.time() + 180
-        client_info = {}
+    def verify_client_noc(self, pod=None, present=True, since=None, profiler=None):
         state = "connected" if present else "disconnected"
-        while timeout > time.time():
-            client_info = self.cloud.user.get_clients_details(self.client_mac)
-            if client_info.get("conn_state", "") == state:
-                if state == "disconnected":
-                    break
-                else:
-                    if client_info.get("ip") is not None:
-                        break
-            time.sleep(5)
-        else:
+        expected = key_equals("conn_state", state)
+        if present:
+            expected = all_of(expected, lambda info: info.get("ip") is not None)
+        noc_wait = wait_until(
+            lambda: self.cloud.user.get_clients_details(self.client_mac),
+            expected,
+            timeout=180,
+            since=since,
+            name=f"client {state} in NOC",
+        )
+        client_info = noc_wait.value or {}
+        if not noc_wait:
             log.info(f"Current information about the client:\n{pprint.pformat(client_info)}")
-            assert False, "We do not have all info about the client in FTL"
+            assert False, f"We do not have all info about the client in FTL{phase_hint(profiler)}"
+        log.info(f"Client {state} in NOC after {noc_wait.elapsed:.2f} sec")
+        if profiler and present:
+            profiler.mark(NOC_VISIBLE, at=noc_wait.stop_time)
         log.info("Verify connection state")
         assert client_info.get("conn_state") == state, (
             f"Invalid connection state. " f'Expected: "{state}" but got: {client_info.get("conn_state")}'
+            f"{phase_hint(profiler)}"
         )
         if pod:
-            assert client_info.get("leaf_to_root", [{}])[0].get("id", "Disconnected") == pod.get_serial_number()
-        stop_time = time.time()
+            assert (
+                client_info.get("leaf_to_root", [{}])[0].get("id", "Disconnected") == pod.get_serial_number()
+            ), f"Client is not connected to {pod.get_nickname()}{phase_hint(profiler)}"
+        stop_time = noc_wait.stop_time
         log.info("Connection state is correct")
         if not present:
             return stop_time
         log.info("Verify IP address")
-        client_ip = self.client.eth1.run(f'ip -4 add show dev {self.eth_iface} | grep "inet "')
-        client_ip = client_ip[client_ip.rfind("inet") + 5 : client_ip.rfind("/")]
+        client_ip = get_client_ip(self.client.eth1, self.eth_iface)
         assert client_info.get("ip") == client_ip, (
             f"Incorrect ip address. Expected: {client_ip}" f' but got from NOC: {client_info.get("ip")}'
+            f"{phase_hint(profiler)}"
         )
         log.info("IP address is correct")
         return stop_time
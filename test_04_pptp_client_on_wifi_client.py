@@ -4,7 +4,8 @@ import pytest
 from lib.util.base_case import BaseCase
 from lib.util.testrail.plugin import pytestrail
 from lib_testbed.generic.util.logger import log
-from lib_testbed.generic.util.common import wait_for
+from tests.client_connectivity.util.batch import run_batch
+from tests.client_connectivity.util.wait import wait_until
 
 
 # Cloud is needed for pytest.mark.network_mode
@@ -19,8 +20,7 @@ class PPTPClientOnWifiClientRoot(BaseCase):
     @classmethod
     def teardown_class(cls):
         with cls.SafeTeardown(__class__, cls):
-            cls.client.wifi.run("sudo poff pptptest", skip_exception=True)
-            cls.client.wifi.run("sudo kilall pptp", skip_exception=True)
+            run_batch(cls.client.wifi, {"poff": "sudo poff pptptest", "kill": "sudo killall pptp"})
             cls.client.wifi.disconnect(skip_exception=True)
 
     @allure.title("Connect wireless client to testbed location")
@@ -39,14 +39,20 @@ class PPTPClientOnWifiClientRoot(BaseCase):
 
     @allure.title("Connect wireless client to PPTP VPN")
     def test_03_connect_pptp_client(self):
-        assert self.client.wifi.run("sudo pon pptptest && echo 'ok'"), "connection to PPTP server failed"
-        assert self.pptp_server in self.client.wifi.run("ps aux | grep pptp"), "connection to PPTP server lost"
-        assert "ppp" in self.client.wifi.run("ip --brief link show"), "no point-to-point interface on client"
-        assert wait_for(self.client_got_pptp_address, timeout=60, tick=3)[1], "client is missing PPTP IP address"
-        log.info("PPTP VPN connection established")
+        # pon returns before pptp is started, the client polls for it in the same call. pgrep never lists itself
+        wait_pptp = (
+            f"for i in $(seq 20); do pgrep -af pptp | grep -F {self.pptp_server} && exit 0; sleep 1; done; exit 1"
+        )
+        results = run_batch(self.client.wifi, {"pon": "sudo pon pptptest", "pptp": wait_pptp}, timeout=40)
+        assert results["pon"].ok, f"connection to PPTP server failed: {results['pon'].stderr}"
+        assert results["pptp"].ok, f"connection to PPTP server lost, pptp did not start: {results['pptp']}"
+        address = wait_until(self.client_got_pptp_address, timeout=60, name="PPTP interface and address")
+        assert address, "client is missing PPTP interface or IP"
+        log.info(f"PPTP VPN connection established, address after {address.elapsed:.2f} sec")
 
     def client_got_pptp_address(self):
-        return "192.168.218." in self.client.wifi.run("ip -4 --brief addr show")
+        results = run_batch(self.client.wifi, {"link": "ip --brief link show", "addr": "ip -4 --brief addr show"})
+        return "ppp" in results["link"].stdout and "192.168.218." in results["addr"].stdout
 
     @allure.title("Check that wireless client can reach PPTP VPN")
     def test_04_pptp_vpn_reachable(self):
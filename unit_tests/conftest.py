@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Unit test runs are not suite runs, their durations must not end up in the measured durations
+    config.option.no_duration_db = True
@@ -0,0 +1,90 @@
+from tests.client_connectivity.util.ordering import (
+    DEFAULT_TRANSITION_COSTS,
+    StateOrdering,
+    order_groups,
+    order_units,
+    parse_costs,
+    sequence_cost,
+    transition,
+)
+
+
+class Marker:
+    def __init__(self, name, **kwargs):
+        self.name = name
+        self.kwargs = kwargs
+
+
+class FixtureDef:
+    def __init__(self, scope):
+        self.scope = scope
+
+
+class Item:
+    """Item of a class parametrized by a session scoped wan_id, as pytest collects WiredConnectionRoot subclasses."""
+
+    def __init__(self, cls_name, wan_id, network_mode):
+        self.cls = type(cls_name, (), {})
+        self.nodeid = f"eth/test_x.py::{cls_name}::test_01[{wan_id}]"
+        self.callspec = type("CallSpec", (), {"params": {"wan_id": wan_id}})()
+        self._fixtureinfo = type("FixtureInfo", (), {"name2fixturedefs": {"wan_id": [FixtureDef("session")]}})()
+        self.markers = [Marker("network_mode", target=network_mode)]
+
+    def get_closest_marker(self, name):
+        return next((marker for marker in self.markers if marker.name == name), None)
+
+    def iter_markers(self):
+        return iter(self.markers)
+
+
+class Config:
+    def getoption(self, name):
+        return []
+
+
+class Unit:
+    def __init__(self, name, state):
+        self.name = name
+        self.state = state
+
+
+def test_transition_keeps_state_not_required():
+    cost, state = transition(("router", "primary"), (None, "secondary"), DEFAULT_TRANSITION_COSTS)
+    assert cost == DEFAULT_TRANSITION_COSTS["wan"]
+    assert state == ("router", "secondary")
+
+
+def test_first_state_is_free():
+    assert sequence_cost([("bridge", "primary")], DEFAULT_TRANSITION_COSTS) == 0
+
+
+def test_order_groups_minimizes_transitions():
+    states = [("router", None), ("bridge", None), ("router", None), ("bridge", None)]
+    ordered = order_groups(dict.fromkeys(states), DEFAULT_TRANSITION_COSTS)
+    assert sequence_cost(ordered, DEFAULT_TRANSITION_COSTS) == DEFAULT_TRANSITION_COSTS["network_mode"]
+
+
+def test_order_units_groups_by_state_and_keeps_file_order_within_a_group():
+    units = [
+        Unit("a", ("router", None)),
+        Unit("b", ("bridge", None)),
+        Unit("c", ("router", None)),
+        Unit("d", ("bridge", None)),
+    ]
+    names = [unit.name for unit in order_units(units, DEFAULT_TRANSITION_COSTS)]
+    assert names in (["a", "c", "b", "d"], ["b", "d", "a", "c"])
+
+
+def test_parse_costs():
+    assert parse_costs(["wan=1.5"]) == dict(DEFAULT_TRANSITION_COSTS, wan=1.5)
+
+
+def test_classes_are_ordered_within_each_session_param_group():
+    # pytest groups the items by the session scoped wan_id, each class appears once per wan_id
+    modes = {"A": "router", "B": "bridge", "C": "router"}
+    items = [Item(name, wan_id, mode) for wan_id in (1, 2) for name, mode in modes.items()]
+    StateOrdering(Config()).pytest_collection_modifyitems(None, None, items)
+    wan_ids = [item.callspec.params["wan_id"] for item in items]
+    assert wan_ids == [1, 1, 1, 2, 2, 2]
+    for group in (items[:3], items[3:]):
+        assert [item.cls.__name__ for item in group] in (["A", "C", "B"], ["B", "A", "C"])
@@ -0,0 +1,41 @@
+import json
+from tests.client_connectivity.util.ovsdb import decode_value, encode_value, parse_monitor_update
+
+ROW = "6f1c5b9e-2c3a-4c1e-9d0b-8a1f2e3d4c5b"
+
+
+def test_decode_value():
+    assert decode_value(["set", []]) is None
+    assert decode_value(["set", [["uuid", ROW]]]) == [ROW]
+    assert decode_value(["map", [["mode", "router"], ["dhcp", "true"]]]) == {"mode": "router", "dhcp": "true"}
+    assert decode_value("eth0") == "eth0"
+
+
+def test_encode_value_round_trip():
+    value = {"mode": "router", "ports": ["eth0", "eth1"]}
+    assert decode_value(encode_value(value)) == {"mode": "router", "ports": ["eth0", "eth1"]}
+
+
+def test_initial_rows():
+    line = json.dumps(
+        {
+            "headings": ["row", "action", "if_name", "enabled"],
+            "data": [[ROW, "initial", "br-home", True]],
+        }
+    )
+    (delta,) = parse_monitor_update(line, timestamp=1.0)
+    assert (delta.uuid, delta.action, delta.timestamp) == (ROW, "initial", 1.0)
+    assert delta.values == {"if_name": "br-home", "enabled": True}
+
+
+def test_modification_new_row_inherits_the_uuid():
+    line = json.dumps(
+        {
+            "headings": ["row", "action", "inet_addr"],
+            "data": [[ROW, "old", "0.0.0.0"], ["", "new", "192.168.40.1"]],
+        }
+    )
+    old, new = parse_monitor_update(line)
+    assert old.uuid == new.uuid == ROW
+    assert (old.action, new.action) == ("old", "new")
+    assert new.values == {"inet_addr": "192.168.40.1"}
@@ -0,0 +1,81 @@
+import struct
+import pytest
+from tests.client_connectivity.util.pcap import (
+    BEACON,
+    LINKTYPE_IEEE802_11_RADIOTAP,
+    PROBE_RESPONSE,
+    PcapError,
+    PcapParser,
+    find_first_frame,
+    frame_filter,
+    read_frames,
+)
+
+AP_MAC = "02:aa:bb:cc:dd:01"
+STA_MAC = "02:aa:bb:cc:dd:02"
+BROADCAST = "ff:ff:ff:ff:ff:ff"
+
+
+def mac_bytes(mac):
+    return bytes(int(part, 16) for part in mac.split(":"))
+
+
+def management_frame(subtype, addr1, addr2, addr3):
+    frame_control = bytes([subtype << 4, 0])
+    return frame_control + b"\x00\x00" + mac_bytes(addr1) + mac_bytes(addr2) + mac_bytes(addr3) + b"\x00\x00"
+
+
+def radiotap(frame, header_len=12):
+    # Version, pad, length and a present bitmap, the rest of the header is padding the parser has to skip
+    return struct.pack("<BBHI", 0, 0, header_len, 0) + b"\x00" * (header_len - 8) + frame
+
+
+def pcap_file(packets, linktype=LINKTYPE_IEEE802_11_RADIOTAP):
+    data = struct.pack("<IHHiIII", 0xA1B2C3D4, 2, 4, 0, 0, 65535, linktype)
+    for index, packet in enumerate(packets):
+        data += struct.pack("<IIII", 1_700_000_000 + index, 500_000, len(packet), len(packet)) + packet
+    return data
+
+
+CAPTURE = pcap_file(
+    [
+        radiotap(management_frame(BEACON, BROADCAST, AP_MAC, AP_MAC)),
+        radiotap(management_frame(PROBE_RESPONSE, STA_MAC, AP_MAC, AP_MAC), header_len=24),
+    ]
+)
+
+
+def test_radiotap_header_is_stripped(tmp_path):
+    path = tmp_path / "capture.pcap"
+    path.write_bytes(CAPTURE)
+    frames = list(read_frames(str(path)))
+    assert [frame.type_subtype for frame in frames] == [BEACON, PROBE_RESPONSE]
+    assert frames[1].addr1 == STA_MAC and frames[1].addr2 == AP_MAC
+    assert frames[1].timestamp == pytest.approx(1_700_000_001.5)
+
+
+def test_frame_filter(tmp_path):
+    path = tmp_path / "capture.pcap"
+    path.write_bytes(CAPTURE)
+    assert find_first_frame(str(path), frame_filter(PROBE_RESPONSE, addr=STA_MAC.upper())).addr3 == AP_MAC
+    assert find_first_frame(str(path), frame_filter(PROBE_RESPONSE, addr_any={BROADCAST})) is None
+
+
+def test_feed_parses_records_split_across_chunks():
+    parser = PcapParser()
+    frames = []
+    for offset in range(0, len(CAPTURE), 7):
+        frames += parser.feed(CAPTURE[offset : offset + 7])
+    assert [frame.type_subtype for frame in frames] == [BEACON, PROBE_RESPONSE]
+    assert parser.buffer == b""
+
+
+def test_empty_capture(tmp_path):
+    path = tmp_path / "empty.pcap"
+    path.write_bytes(b"")
+    assert list(read_frames(str(path))) == []
+
+
+def test_unsupported_link_type():
+    with pytest.raises(PcapError):
+        PcapParser().feed(pcap_file([], linktype=1))
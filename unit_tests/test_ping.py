@@ -0,0 +1,74 @@
+import pytest
+from tests.client_connectivity.util.ping import PingResult, ping
+
+IPUTILS_OUTPUT = """PING 192.168.40.11 (192.168.40.11) 56(84) bytes of data.
+64 bytes from 192.168.40.11: icmp_seq=1 ttl=64 time=0.420 ms
+64 bytes from 192.168.40.11: icmp_seq=2 ttl=64 time=0.380 ms
+64 bytes from 192.168.40.11: icmp_seq=2 ttl=64 time=0.390 ms (DUP!)
+64 bytes from 192.168.40.11: icmp_seq=4 ttl=64 time=1.20 ms
+
+--- 192.168.40.11 ping statistics ---
+4 packets transmitted, 3 received, +1 duplicates, 25% packet loss, time 604ms
+rtt min/avg/max/mdev = 0.380/0.666/1.200/0.378 ms
+"""
+BUSYBOX_OUTPUT = """PING 192.168.40.1 (192.168.40.1): 56 data bytes
+64 bytes from 192.168.40.1: seq=0 ttl=64 time=0.512 ms
+64 bytes from 192.168.40.1: seq=1 ttl=64 time=0.488 ms
+
+--- 192.168.40.1 ping statistics ---
+2 packets transmitted, 2 packets received, 0% packet loss
+round-trip min/avg/max = 0.488/0.500/0.512 ms
+"""
+NO_REPLY_OUTPUT = """PING 192.168.40.12 (192.168.40.12) 56(84) bytes of data.
+
+--- 192.168.40.12 ping statistics ---
+3 packets transmitted, 0 received, 100% packet loss, time 2040ms
+"""
+
+
+def test_iputils_output():
+    result = PingResult.parse(IPUTILS_OUTPUT, "192.168.40.11")
+    assert result
+    assert (result.transmitted, result.received, result.loss) == (4, 3, 25.0)
+    # Duplicates keep the first reply
+    assert result.rtts == [0.42, 0.38, 1.2]
+    assert result.rtt_avg == 0.666
+    assert result.jitter == 0.378
+    assert result.budget_violations(max_loss=10, max_rtt=1.0) == ["loss 25.0% > 10%"]
+
+
+def test_busybox_output():
+    result = PingResult.parse(BUSYBOX_OUTPUT)
+    assert (result.transmitted, result.received, result.loss) == (2, 2, 0.0)
+    assert result.rtt_avg == 0.5
+    # Busybox does not report mdev
+    assert result.jitter == pytest.approx(0.012)
+    assert result.rtt_stats()["max"] == 0.512
+
+
+def test_no_reply():
+    result = PingResult.parse(NO_REPLY_OUTPUT, "192.168.40.12")
+    assert not result
+    assert result.loss == 100.0 and result.rtt_avg is None
+    assert result.budget_violations(max_rtt=5) == ["no reply from 192.168.40.12"]
+
+
+class FakeClient:
+    def __init__(self, output):
+        self.output = output
+        self.commands = []
+
+    def run_raw(self, command, timeout=None, skip_exception=False):
+        self.commands.append(command)
+        return [0, self.output, ""]
+
+    def get_nickname(self):
+        return "eth1"
+
+
+def test_ping_is_bound_to_the_interface():
+    client = FakeClient(BUSYBOX_OUTPUT)
+    result = ping(client, "192.168.40.1", "eth0.100", count=2)
+    assert result.received == 2
+    assert client.commands[0].startswith("ping -I eth0.100 -c 2 ")
+    assert client.commands[0].endswith(" 192.168.40.1")
@@ -0,0 +1,80 @@
+import base64
+import re
+from tests.client_connectivity.util.batch import RESULT_PREFIX
+from tests.client_connectivity.util.pmtu import IP_ICMP_HEADERS, MAX_PAYLOAD, PmtuProber
+
+PROBE_PATTERN = re.compile(r"\( (sudo /bin/ping -c (\d+) .*? -s (\d+) .*?) \) > \$d/out(\d+)")
+
+
+class FakePath:
+    """Client whose batched DF pings pass up to `max_payload` bytes, each run_raw() call is one round."""
+
+    def __init__(self, max_payload):
+        self.max_payload = max_payload
+        self.rounds = []
+        self.measured = []
+
+    def run_raw(self, command, timeout=None, skip_exception=False):
+        script = base64.b64decode(command.split()[1]).decode()
+        parallel = script.rstrip().splitlines()[-2] == "wait; cat $d/result*"
+        lines = []
+        sizes = []
+        for _, count, size, index in PROBE_PATTERN.findall(script):
+            sizes.append(int(size))
+            output = self.ping_output(int(size), int(count))
+            encoded = base64.b64encode(output.encode()).decode()
+            lines.append(f"{RESULT_PREFIX}:{index}:{0 if int(size) <= self.max_payload else 1}:0.00:1.00:{encoded}:")
+        self.rounds.append(sorted(sizes))
+        if not parallel:
+            self.measured.extend(sizes)
+        return [0, "\n".join(lines), ""]
+
+    def ping_output(self, size, count):
+        received = count if size <= self.max_payload else 0
+        replies = "".join(
+            f"{size + 8} bytes from 10.0.0.1: icmp_seq={sequence} ttl=64 time=1.5 ms\n" for sequence in range(count)
+        )
+        return f"{replies if received else ''}{count} packets transmitted, {received} received\n"
+
+    def get_nickname(self):
+        return "client"
+
+
+def test_full_size_payload_costs_one_round():
+    client = FakePath(MAX_PAYLOAD)
+    result = PmtuProber(client, "10.0.0.1").run()
+    assert result.max_payload == MAX_PAYLOAD
+    assert result.path_mtu == MAX_PAYLOAD + IP_ICMP_HEADERS
+    assert len(client.rounds) == 1
+    assert result.rtt_stats(MAX_PAYLOAD)["median"] == 1.5
+
+
+def test_rtts_are_only_measured_by_serial_pings():
+    client = FakePath(1000)
+    result = PmtuProber(client, "10.0.0.1").run()
+    # The baseline and max payload of the first round, then the found limit
+    assert client.measured == [56, MAX_PAYLOAD, 1000]
+    assert set(result.samples) == {56, MAX_PAYLOAD, 1000}
+    assert result.rtt_stats(1000) and not result.rtt_stats(548)
+
+
+def test_search_finds_the_exact_limit():
+    for limit in (548, 1000, 1372, 1471):
+        client = FakePath(limit)
+        result = PmtuProber(client, "10.0.0.1").run()
+        assert result.max_payload == limit
+        # A 3-way search shrinks the interval 4 times per round, plus the RTT pass of the limit
+        assert len(client.rounds) <= 9
+
+
+def test_limit_below_the_minimum_payload():
+    client = FakePath(300)
+    assert PmtuProber(client, "10.0.0.1").run().max_payload == 300
+    # The failing minimum payload bounds the search, no larger size is probed
+    assert all(size <= 548 for sizes in client.rounds[2:] for size in sizes)
+
+
+def test_unreachable_target():
+    client = FakePath(0)
+    result = PmtuProber(client, "10.0.0.1").run()
+    assert result.max_payload is None and result.path_mtu is None
@@ -0,0 +1,41 @@
+from tests.client_connectivity.util import sharding
+from tests.client_connectivity.util.sharding import ScheduleUnit, build_shards, parse_testbeds, selection
+
+
+def unit(nodeid, duration, resources=()):
+    return ScheduleUnit(nodeid, duration, set(resources))
+
+
+def test_longest_units_are_spread_first():
+    units = [unit(f"test_{duration}", duration) for duration in (100, 300, 200, 400, 500)]
+    testbeds = build_shards(units, [sharding.Testbed("a"), sharding.Testbed("b")])
+    assert sorted(testbed.load for testbed in testbeds) == [700, 800]
+    assert {u.nodeid for u in testbeds[0].units} == {"test_500", "test_200", "test_100"}
+
+
+def test_units_go_only_to_capable_testbeds():
+    units = [unit("eth", 100, {"client", "client:eth"}), unit("wifi", 600, {"client", "client:wifi"})]
+    testbeds = [sharding.Testbed("eth_only", {"client", "client:eth"}), sharding.Testbed("any")]
+    build_shards(units, testbeds)
+    # The longer wifi unit can only run on the second testbed, the idle first one takes the eth unit
+    assert [u.nodeid for u in testbeds[0].units] == ["eth"]
+    assert [u.nodeid for u in testbeds[1].units] == ["wifi"]
+
+
+def test_unit_without_capable_testbed_is_skipped():
+    testbeds = build_shards([unit("switch", 100, {"switch"})], [sharding.Testbed("no_switch", {"pod"})])
+    assert testbeds[0].units == []
+
+
+def test_parse_testbeds():
+    testbeds = parse_testbeds(3, ["tb1:pod,switch"])
+    assert [testbed.name for testbed in testbeds] == ["tb1", "testbed1", "testbed2"]
+    assert testbeds[0].capabilities == {"pod", "switch"} and testbeds[1].capabilities is None
+
+
+def test_units_split_by_session_params_are_selected_by_item():
+    split = ScheduleUnit("eth/test_15.py::Test15", 100, set(), params=("wan_id=1",))
+    split.items = [type("Item", (), {"nodeid": "eth/test_15.py::Test15::test_01[1]"})()]
+    assert split.key == "eth/test_15.py::Test15[wan_id=1]"
+    assert selection(split) == ["eth/test_15.py::Test15::test_01[1]"]
+    assert selection(unit("eth/test_07.py::Test07", 100)) == ["eth/test_07.py::Test07"]
@@ -0,0 +1,66 @@
+import time
+import pytest
+# Modules, not classes, so pytest does not collect the suite classes here
+from tests.client_connectivity.eth import test_07_switching_eth_client_port as switching_port
+from tests.client_connectivity.eth import test_18_plug_unplug_wired_client_gw_static as gw_static
+from tests.client_connectivity.util.kpi import kpi_recorder
+from tests.client_connectivity.util.simulation import (
+    SimulatedTestbed,
+    VirtualClock,
+    after_event,
+    run_simulated,
+    sequence,
+)
+
+
+@pytest.fixture(autouse=True)
+def discard_simulated_kpis():
+    # KPIs of simulated runs must not end up next to the ones of the real tests of the session
+    recorded = len(kpi_recorder.samples)
+    yield
+    del kpi_recorder.samples[recorded:]
+
+
+def test_virtual_clock():
+    clock = VirtualClock(start=100.0)
+    with clock.patch():
+        clock.mark("reboot")
+        time.sleep(30)
+        assert time.time() == 130.0
+    assert clock.since("reboot") == 30.0 and clock.since("unknown") is None
+    assert time.time() != 130.0
+
+
+def test_scripted_responses():
+    clock = VirtualClock()
+    respond = sequence(False, False, True)
+    assert [respond() for _ in range(4)] == [False, False, True, True]
+    connected = after_event(clock, "reboot", 60, True, before=False)
+    clock.mark("reboot")
+    clock.advance(59)
+    assert connected() is False
+    clock.advance(1)
+    assert connected() is True
+
+
+def assert_passed(results):
+    failed = [result for result in results if not result.passed]
+    assert not failed, failed
+
+
+def test_static_onboarding_class():
+    testbed = SimulatedTestbed(clients=("eth1",))
+    results = run_simulated(gw_static.Test18PlugUnplugWiredClientGwStaticBridge, testbed, wan_id=1)
+    assert_passed(results)
+    names = [result.name for result in results]
+    assert names == ["setup_class", "test_01_plug_and_unplug_eth_client", "teardown_class"]
+    # Four reboots of the gateway, each one followed by the client showing up in the NOC
+    assert testbed.pod.gw.call_count("reboot") == 4
+    assert testbed.cloud.user.call_count("get_clients_details") >= 4
+
+
+def test_switch_port_class():
+    testbed = SimulatedTestbed(clients=("eth1", "eth2"))
+    assert_passed(run_simulated(switching_port.Test07SwitchingEthClientPortBridge, testbed))
+    connects = [call for call in testbed.switch.api.calls if call[0] == "connect_eth_client"]
+    assert {call[2].get("connect_port") for call in connects} >= {"eth0", "eth1"}
@@ -0,0 +1,98 @@
+import base64
+import time
+from lib_testbed.generic.util.logger import log
+
+RESULT_PREFIX = "@@batch"
+# Plain sh and /proc/uptime, so the same script runs on clients and on busybox pods
+COMMAND_TEMPLATE = (
+    "read start _ < /proc/uptime; ( {command} ) > $d/out{index} 2> $d/err{index} < /dev/null; rc=$?;"
+    " read stop _ < /proc/uptime; "
+    'echo "{prefix}:{index}:$rc:$start:$stop:$(base64 < $d/out{index} | tr -d "\\n"):'
+    '$(base64 < $d/err{index} | tr -d "\\n")"'
+)
+
+
+class CommandResult:
+    def __init__(self, name, command, rc=None, stdout="", stderr="", duration=None):
+        self.name = name
+        self.command = command
+        self.rc = rc
+        self.stdout = stdout
+        self.stderr = stderr
+        self.duration = duration
+
+    @property
+    def ok(self):
+        return self.rc == 0
+
+    def __repr__(self):
+        duration = f"{self.duration:.2f}s" if self.duration is not None else "not run"
+        return f"<CommandResult {self.name}: rc {self.rc} in {duration}>"
+
+
+class BatchResult(dict):
+    def __init__(self, results, round_trip_time):
+        super().__init__((result.name, result) for result in results)
+        self.round_trip_time = round_trip_time
+
+    def all_ok(self):
+        return all(result.ok for result in self.values())
+
+    def failed(self):
+        return [name for name, result in self.items() if not result.ok]
+
+
+class CommandBatch:
+    """Queue of shell commands sent to a client or pod in one remote call, executed in order or all at once."""
+
+    def __init__(self, device, parallel=False):
+        self.device = device
+        self.parallel = parallel
+        self.commands = []
+
+    def add(self, name, command):
+        assert name not in [queued[0] for queued in self.commands], f"Command {name} already queued"
+        self.commands.append((name, command))
+        return self
+
+    def script(self):
+        lines = ["d=$(mktemp -d)"]
+        for index, (_, command) in enumerate(self.commands):
+            line = COMMAND_TEMPLATE.format(command=command, prefix=RESULT_PREFIX, index=index)
+            # Background commands write their result line to a file, so the lines can not interleave
+            lines.append(f"( {line} ) > $d/result{index} &" if self.parallel else line)
+        if self.parallel:
+            lines.append("wait; cat $d/result*")
+        lines.append("rm -rf $d")
+        return "\n".join(lines)
+
+    def run(self, timeout=60):
+        encoded = base64.b64encode(self.script().encode()).decode()
+        start_time = time.time()
+        rc, stdout, stderr = self.device.run_raw(
+            f"echo {encoded} | base64 -d | sh", timeout=timeout, skip_exception=True
+        )
+        round_trip_time = time.time() - start_time
+        results = [CommandResult(name, command) for name, command in self.commands]
+        for line in stdout.splitlines():
+            if not line.startswith(f"{RESULT_PREFIX}:"):
+                continue
+            _, index, command_rc, start, stop, out, err = line.split(":")
+            result = results[int(index)]
+            result.rc = int(command_rc)
+            result.stdout = base64.b64decode(out).decode(errors="replace")
+            result.stderr = base64.b64decode(err).decode(errors="replace")
+            result.duration = float(stop) - float(start)
+        not_run = [result.name for result in results if result.rc is None]
+        if not_run:
+            log.warning(f"Batch commands {not_run} did not report a result, rc: {rc}, stderr: {stderr}")
+        log.debug(f"Ran {len(results)} commands on {self.device.get_nickname()} in {round_trip_time:.2f}s")
+        return BatchResult(results, round_trip_time)
+
+
+def run_batch(device, commands, timeout=60, parallel=False):
+    """Run {name: command} on the device in one remote call."""
+    batch = CommandBatch(device, parallel)
+    for name, command in commands.items():
+        batch.add(name, command)
+    return batch.run(timeout)
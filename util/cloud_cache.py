@@ -0,0 +1,146 @@
+import copy
+import threading
+import time
+from lib_testbed.generic.util.logger import log
+
+# Time to live in seconds of slow-changing cloud reads
+DEFAULT_TTLS = {
+    "get_network_mode": 120,
+    "get_home_network_credentials": 600,
+    "get_home_ap_bssids_from_cloud": 600,
+    "get_node_home_ap_bssids": 600,
+    "get_node_5g_home_ap_bssid": 600,
+    "get_wifi_config": 60,
+}
+# Calls with these prefixes only read the location state, every other call drops the cached reads after it
+READ_PREFIXES = ("get_", "check_", "is_", "has_", "list_", "wait_")
+
+
+class CloudCache:
+    def __init__(self, ttls=None):
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, ttl, fetch):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and time.time() - entry[0] < ttl:
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+            self.misses += 1
+        value = fetch()
+        with self.lock:
+            self.entries[key] = (time.time(), value)
+        return copy.deepcopy(value)
+
+    def invalidate(self, reason=""):
+        with self.lock:
+            if self.entries:
+                log.debug(f"Invalidating {len(self.entries)} cached cloud reads {reason}".rstrip())
+            self.entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+
+class CachedCloudApi:
+    """Proxy of a cloud API object (cloud.user, cloud.admin) with cached reads and invalidating writes."""
+
+    def __init__(self, api, cache, label):
+        self._api = api
+        self._cache = cache
+        self._label = label
+
+    def __getattr__(self, name):
+        attr = getattr(self._api, name)
+        if not callable(attr):
+            return attr
+        if name in self._cache.ttls:
+            return self._cached_call(name, attr)
+        if name.startswith(READ_PREFIXES):
+            return attr
+        return self._invalidating_call(name, attr)
+
+    def _cached_call(self, name, method):
+        def call(*args, **kwargs):
+            key = (self._label, name, repr(args), repr(sorted(kwargs.items())))
+            return self._cache.get(key, self._cache.ttls[name], lambda: method(*args, **kwargs))
+
+        return call
+
+    def _invalidating_call(self, name, method):
+        def call(*args, **kwargs):
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._cache.invalidate(f"after {self._label}.{name}")
+
+        return call
+
+    def invalidate(self):
+        self._cache.invalidate("on request")
+
+
+# One cache per location, shared by all test classes of the session
+_location_caches = {}
+
+
+def enable_cloud_cache(cloud, ttls=None):
+    """Put cloud.user and cloud.admin behind a shared, session wide cache. Safe to call from every setup_class."""
+    location_key = getattr(cloud.user, "lid", None) or id(cloud)
+    cache = _location_caches.get(location_key)
+    if cache is None:
+        cache = _location_caches[location_key] = CloudCache(ttls)
+    elif ttls:
+        cache.ttls.update(ttls)
+    for label in ("user", "admin"):
+        api = getattr(cloud, label, None)
+        if api is None:
+            continue
+        if isinstance(api, CachedCloudApi):
+            if api._cache is cache:
+                continue
+            api = api._api
+        setattr(cloud, label, CachedCloudApi(api, cache, label))
+    return cache
+
+
+def invalidate_cloud_cache(cloud):
+    api = getattr(cloud, "user", None)
+    if isinstance(api, CachedCloudApi):
+        api.invalidate()
+
+
+def invalidate_cloud_caches(reason=""):
+    """Drop the cached reads of every location after a change done outside the cloud API, e.g. a pod reboot."""
+    for cache in _location_caches.values():
+        cache.invalidate(reason)
+
+
+def cloud_cache_stats():
+    stats = {"hits": 0, "misses": 0, "invalidations": 0}
+    for cache in _location_caches.values():
+        for key, value in cache.stats().items():
+            if key in stats:
+                stats[key] += value
+    return stats
+
+
+def log_cloud_cache_stats():
+    stats = cloud_cache_stats()
+    if stats["hits"] or stats["misses"]:
+        log.info(
+            f"Cloud read cache: {stats['hits']} hits, {stats['misses']} misses,"
+            f" {stats['invalidations']} invalidations, {stats['hits']} cloud requests avoided"
+        )
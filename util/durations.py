@@ -0,0 +1,186 @@
+import os
+import sqlite3
+import threading
+import time
+import pytest
+from lib_testbed.generic.util.logger import log
+from tests.client_connectivity.util.kpi import format_table, percentile
+from tests.client_connectivity.util.sharding import get_units, unit_key
+
+DEFAULT_DB_PATH = "/tmp/automation/durations.sqlite"
+UNKNOWN = "unknown"
+DEFAULT_THRESHOLD = 0.25
+MIN_SAMPLES = 3
+SCHEMA = """CREATE TABLE IF NOT EXISTS class_durations (
+    nodeid TEXT NOT NULL,
+    testbed TEXT NOT NULL,
+    firmware TEXT NOT NULL,
+    duration REAL NOT NULL,
+    items INTEGER NOT NULL,
+    passed INTEGER NOT NULL,
+    finished_at REAL NOT NULL
+)"""
+
+
+class DurationDb:
+    """Measured test class durations per testbed and firmware in a local sqlite file."""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.connection:
+            self.connection.execute(SCHEMA)
+
+    def record(self, nodeid, testbed, firmware, duration, items, passed):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO class_durations VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (nodeid, testbed, firmware, duration, items, int(passed), time.time()),
+            )
+
+    def samples(self, nodeid, testbed=None, firmware=None):
+        """Durations of passed runs with every item of the class, partial runs (-k, sharding) are left out."""
+        query = "SELECT duration, items FROM class_durations WHERE nodeid = ? AND passed = 1"
+        params = [nodeid]
+        if testbed is not None:
+            query += " AND testbed = ?"
+            params.append(testbed)
+        if firmware is not None:
+            query += " AND firmware = ?"
+            params.append(firmware)
+        with self.lock:
+            rows = self.connection.execute(query, params).fetchall()
+        if not rows:
+            return []
+        full_items = max(items for _, items in rows)
+        return [duration for duration, items in rows if items == full_items]
+
+    def p90(self, nodeid, testbed=None, firmware=None, min_samples=MIN_SAMPLES):
+        """p90 of the most specific scope with enough samples: testbed and firmware, the testbed, any testbed."""
+        for scope in ((testbed, firmware), (testbed, None), (None, None)):
+            samples = self.samples(nodeid, *scope)
+            if len(samples) >= min_samples:
+                return percentile(samples, 90)
+        return None
+
+    def close(self):
+        self.connection.close()
+
+
+def add_duration_options(parser):
+    group = parser.getgroup("durations", "measured test class durations")
+    group.addoption("--duration-db", default=DEFAULT_DB_PATH, help="sqlite file of the measured class durations")
+    group.addoption(
+        "--no-duration-db", action="store_true", default=False, help="Do not store measured class durations"
+    )
+    group.addoption("--duration-testbed", default=None, help="Testbed name the measured durations are stored under")
+    group.addoption(
+        "--duration-firmware", default=None, help="Firmware version the measured durations are stored under"
+    )
+    group.addoption(
+        "--measured-durations",
+        action="store_true",
+        default=False,
+        help="Schedule by the measured p90 duration of each class instead of its duration marker, when known",
+    )
+    group.addoption(
+        "--duration-report",
+        action="store_true",
+        default=False,
+        help="Report classes whose duration marker is off from the measured p90, e.g. with --collect-only",
+    )
+    group.addoption(
+        "--duration-threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Relative difference between marker and measured p90 reported as stale, 0.25 means 25%%",
+    )
+
+
+class DurationPlugin:
+    """Stores the duration of every test class which ran, and serves the measured p90 to schedulers and timeouts.
+
+    Classes parametrized at session scope are stored per value, e.g. Test15[wan_id=1], as pytest runs them apart.
+    """
+
+    def __init__(self, config):
+        # No database at all with --no-duration-db, the durations are then neither stored nor read
+        self.db = None if config.getoption("no_duration_db") else DurationDb(config.getoption("duration_db"))
+        self.testbed = config.getoption("duration_testbed") or config.getoption("testbed", default=None) or UNKNOWN
+        self.firmware = config.getoption("duration_firmware") or UNKNOWN
+        self.use_measured = config.getoption("measured_durations")
+        self.report = config.getoption("duration_report")
+        self.threshold = config.getoption("duration_threshold")
+        # {unit key: [start time, items run, passed, node ids of its items which started]}
+        self.running = {}
+
+    def measured_p90(self, key):
+        return self.db.p90(key, self.testbed, self.firmware) if self.db else None
+
+    def expected_duration(self, key, declared):
+        """Measured p90 with --measured-durations when enough runs are stored, the declared duration otherwise."""
+        if not self.use_measured:
+            return declared
+        measured = self.measured_p90(key)
+        return round(measured) if measured is not None else declared
+
+    def stale_markers(self, items):
+        rows = []
+        for unit in get_units(items):
+            marker = unit.items[0].get_closest_marker("duration")
+            measured = self.measured_p90(unit.key)
+            if marker is None or measured is None:
+                continue
+            declared = unit.duration
+            deviation = (measured - declared) / declared if declared else float("inf")
+            if abs(deviation) > self.threshold:
+                rows.append([unit.key, declared, round(measured), f"{deviation:+.0%}"])
+        return rows
+
+    # Before the shard and ordering plugins, which deselect and move items
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_collection_modifyitems(self, session, config, items):
+        if not self.report:
+            return
+        if self.db is None:
+            log.warning("No duration report with --no-duration-db")
+            return
+        rows = self.stale_markers(items)
+        if not rows:
+            log.info(f"Duration markers are within {self.threshold:.0%} of the measured p90 on {self.testbed}")
+            return
+        header = ["class", "declared s", "measured p90 s", "off by"]
+        log.info(
+            f"{len(rows)} duration markers off by more than {self.threshold:.0%} on {self.testbed}"
+            f" ({self.firmware}):\n{format_table(header, rows)}"
+        )
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        key = unit_key(item)
+        self.running.setdefault(key, [time.time(), 0, True, set()])[3].add(item.nodeid)
+        yield
+        # The class teardown runs with the teardown of its last item
+        if nextitem is not None and unit_key(nextitem) == key:
+            return
+        start_time, items, passed, _ = self.running.pop(key)
+        duration = time.time() - start_time
+        log.info(f"{key} took {duration:.0f} s on {self.testbed}")
+        if self.db:
+            self.db.record(key, self.testbed, self.firmware, duration, items, passed)
+
+    def pytest_runtest_logreport(self, report):
+        for state in self.running.values():
+            if report.nodeid in state[3]:
+                if report.when == "call":
+                    state[1] += 1
+                if report.failed or report.skipped:
+                    state[2] = False
+
+    def pytest_sessionfinish(self, session):
+        if self.db:
+            self.db.close()
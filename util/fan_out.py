@@ -0,0 +1,110 @@
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from lib_testbed.generic.util.logger import log
+
+
+class ClientResult:
+    def __init__(self, name, value=None, error=None, duration=0.0):
+        self.name = name
+        self.value = value
+        self.error = error
+        self.duration = duration
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        outcome = repr(self.value) if self.ok else f"error {self.error!r}"
+        return f"<ClientResult {self.name}: {outcome} in {self.duration:.2f}s>"
+
+
+class FanOutResult(dict):
+    def __init__(self, results, wall_time):
+        super().__init__((result.name, result) for result in results)
+        self.wall_time = wall_time
+
+    @property
+    def serial_time(self):
+        return sum(result.duration for result in self.values())
+
+    @property
+    def time_saved(self):
+        return max(self.serial_time - self.wall_time, 0.0)
+
+    def all_ok(self):
+        return all(result.ok and result.value for result in self.values())
+
+    def failed(self):
+        return [name for name, result in self.items() if not result.ok or not result.value]
+
+    def raise_errors(self):
+        for result in self.values():
+            if not result.ok:
+                raise result.error
+
+
+def get_name(device):
+    try:
+        return device.get_nickname() or repr(device)
+    except Exception:
+        return repr(device)
+
+
+def fan_out(operation, devices, max_workers=4, name="operation"):
+    """Run operation(device) for every device on a bounded thread pool, results are keyed by device nickname."""
+    devices = list(devices)
+
+    def run(device):
+        device_name = get_name(device)
+        log.info(f"[{device_name}] Start {name}")
+        start_time = time.time()
+        try:
+            value = operation(device)
+        except Exception as err:
+            log.warning(f"[{device_name}] {name} raised {err!r}")
+            return ClientResult(device_name, error=err, duration=time.time() - start_time)
+        duration = time.time() - start_time
+        log.info(f"[{device_name}] Finished {name} in {duration:.2f} sec: {value}")
+        return ClientResult(device_name, value=value, duration=duration)
+
+    start_time = time.time()
+    if len(devices) <= 1:
+        results = [run(device) for device in devices]
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(devices))) as executor:
+            results = list(executor.map(run, devices))
+    fan_out_result = FanOutResult(results, time.time() - start_time)
+    log.info(
+        f"{name} on {len(devices)} devices took {fan_out_result.wall_time:.2f} sec,"
+        f" saved {fan_out_result.time_saved:.2f} sec against serial run"
+    )
+    return fan_out_result
+
+
+def share_work(operation, items, devices, name="operation", key=str):
+    """Spread items over devices, each device takes the next pending item once done. {key(item): ClientResult}"""
+    pending = queue.Queue()
+    for item in items:
+        pending.put(item)
+    results = {}
+
+    def worker(device):
+        device_name = get_name(device)
+        while True:
+            try:
+                item = pending.get_nowait()
+            except queue.Empty:
+                return True
+            log.info(f"[{device_name}] Start {name} for {key(item)}")
+            start_time = time.time()
+            try:
+                results[key(item)] = ClientResult(device_name, value=operation(device, item))
+            except Exception as err:
+                log.warning(f"[{device_name}] {name} for {key(item)} raised {err!r}")
+                results[key(item)] = ClientResult(device_name, error=err)
+            results[key(item)].duration = time.time() - start_time
+
+    fan_out(worker, devices, max_workers=len(devices) or 1, name=name)
+    return results
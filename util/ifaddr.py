@@ -0,0 +1,155 @@
+import json
+import threading
+import time
+from lib_testbed.generic.util.logger import log
+
+# One remote call for all interfaces, iproute2 without JSON support falls back to the one-line format
+IP_ADDR_CMD = "ip -j addr show 2>/dev/null || ip -o addr show"
+# Safety net for link or DHCP changes done without invalidating the cache
+MAX_AGE = 300
+
+
+class InterfaceAddress:
+    def __init__(self, family, address, prefixlen, scope="global", broadcast=None):
+        self.family = family
+        self.address = address
+        self.prefixlen = prefixlen
+        self.scope = scope
+        self.broadcast = broadcast
+
+    def __repr__(self):
+        return f"<{self.family} {self.address}/{self.prefixlen} scope {self.scope}>"
+
+
+class Interface:
+    def __init__(self, name, mac=None, state=None, flags=(), addresses=None):
+        self.name = name
+        self.mac = mac
+        self.state = state
+        self.flags = list(flags)
+        self.addresses = addresses or []
+
+    @property
+    def is_up(self):
+        return "UP" in self.flags or self.state == "UP"
+
+    def get_addresses(self, family="inet", scope="global"):
+        return [
+            addr for addr in self.addresses if addr.family == family and (scope is None or addr.scope == scope)
+        ]
+
+    @property
+    def ipv4(self):
+        addresses = self.get_addresses("inet")
+        return addresses[0].address if addresses else None
+
+    @property
+    def ipv6(self):
+        addresses = self.get_addresses("inet6")
+        return addresses[0].address if addresses else None
+
+    def __repr__(self):
+        return f"<Interface {self.name} {self.state} {self.addresses}>"
+
+
+def parse_ip_addr_json(output):
+    interfaces = {}
+    for link in json.loads(output):
+        if "ifname" not in link:
+            continue
+        addresses = [
+            InterfaceAddress(
+                addr.get("family"), addr.get("local"), addr.get("prefixlen"), addr.get("scope"), addr.get("broadcast")
+            )
+            for addr in link.get("addr_info", [])
+            if addr.get("local")
+        ]
+        interfaces[link["ifname"]] = Interface(
+            link["ifname"], link.get("address"), link.get("operstate"), link.get("flags", []), addresses
+        )
+    return interfaces
+
+
+def parse_ip_addr_oneline(output):
+    """Parse `ip -o addr show`: "2: eth0    inet 192.168.40.10/24 brd 192.168.40.255 scope global eth0 ..."."""
+    interfaces = {}
+    for line in output.splitlines():
+        fields = line.split()
+        if len(fields) < 4 or fields[2] not in ("inet", "inet6"):
+            continue
+        name = fields[1].split("@")[0]
+        address, _, prefixlen = fields[3].partition("/")
+        options = dict(zip(fields[4::2], fields[5::2]))
+        interface = interfaces.setdefault(name, Interface(name))
+        interface.addresses.append(
+            InterfaceAddress(
+                fields[2], address, int(prefixlen or 0), options.get("scope", "global"), options.get("brd")
+            )
+        )
+    return interfaces
+
+
+def parse_ip_addr(output):
+    output = output.strip()
+    if output.startswith("["):
+        return parse_ip_addr_json(output)
+    return parse_ip_addr_oneline(output)
+
+
+class InterfaceCache:
+    """Interfaces of each client, fetched in one remote call and kept until a link or DHCP event."""
+
+    def __init__(self, max_age=MAX_AGE):
+        self.max_age = max_age
+        self.entries = {}
+        self.queries = 0
+        self.lock = threading.Lock()
+
+    def get(self, client, refresh=False):
+        key = id(client)
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry and not refresh and time.time() - entry[0] < self.max_age:
+            return entry[1]
+        result = client.run_raw(IP_ADDR_CMD, skip_exception=True)
+        self.queries += 1
+        assert result[0] == 0, f"Can not get interfaces of {client.get_nickname()}: {result[2]}"
+        interfaces = parse_ip_addr(result[1])
+        with self.lock:
+            self.entries[key] = (time.time(), interfaces)
+        return interfaces
+
+    def invalidate(self, client=None):
+        with self.lock:
+            if client is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(id(client), None)
+
+
+interface_cache = InterfaceCache()
+
+
+def get_interfaces(client, refresh=False):
+    return interface_cache.get(client, refresh)
+
+
+def get_client_ip(client, iface, family="inet", refresh=False):
+    interface = get_interfaces(client, refresh).get(iface)
+    if interface is None:
+        log.warning(f"Interface {iface} not found on {client.get_nickname()}")
+        return None
+    addresses = interface.get_addresses(family)
+    return addresses[0].address if addresses else None
+
+
+def invalidate_interfaces(client=None):
+    interface_cache.invalidate(client)
+
+
+def refresh_ip_address(client, **kwargs):
+    """client.refresh_ip_address() which also drops the cached interfaces of the client."""
+    try:
+        return client.refresh_ip_address(**kwargs)
+    finally:
+        invalidate_interfaces(client)
@@ -0,0 +1,131 @@
+import json
+import os
+import statistics
+import threading
+import time
+from lib_testbed.generic.util.logger import log
+
+KPI_FILE_NAME = "kpi.json"
+DEFAULT_KPI_DIR = "/tmp/automation/kpi/"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def marker_kwarg(markers, marker_name, kwarg):
+    for mark in markers or []:
+        if mark.name == marker_name and kwarg in mark.kwargs:
+            return mark.kwargs[kwarg]
+    return None
+
+
+def format_table(header, rows):
+    rows = [[str(cell) for cell in row] for row in rows]
+    widths = [max(len(row[column]) for row in [header] + rows) for column in range(len(header))]
+    return "\n".join(" | ".join(cell.ljust(width) for cell, width in zip(row, widths)) for row in [header] + rows)
+
+
+class KpiSample:
+    def __init__(self, test_id, name, value, unit, network_mode, wan_id, iteration, labels):
+        self.test_id = test_id
+        self.name = name
+        self.value = float(value)
+        self.unit = unit
+        self.network_mode = network_mode
+        self.wan_id = wan_id
+        self.iteration = iteration
+        self.labels = labels
+        self.timestamp = time.time()
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+class KpiRecorder:
+    def __init__(self):
+        self.samples = []
+        self.lock = threading.Lock()
+
+    def record(self, test_id, name, value, unit="s", network_mode=None, wan_id=None, iteration=None, **labels):
+        sample = KpiSample(test_id, name, value, unit, network_mode, wan_id, iteration, labels)
+        with self.lock:
+            self.samples.append(sample)
+        log.info(f"KPI {name}: {sample.value:.2f} {unit}")
+        return sample
+
+    def summary(self):
+        groups = {}
+        for sample in self.samples:
+            key = (sample.test_id, sample.name, sample.unit, sample.network_mode, sample.wan_id)
+            groups.setdefault(key, []).append(sample.value)
+        summary = []
+        for (test_id, name, unit, network_mode, wan_id), values in groups.items():
+            summary.append(
+                {
+                    "test_id": test_id,
+                    "name": name,
+                    "unit": unit,
+                    "network_mode": network_mode,
+                    "wan_id": wan_id,
+                    "count": len(values),
+                    "min": min(values),
+                    "median": statistics.median(values),
+                    "p95": percentile(values, 95),
+                    "max": max(values),
+                }
+            )
+        return summary
+
+    def export(self, directory=None):
+        if not self.samples:
+            return None
+        directory = directory or DEFAULT_KPI_DIR
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, KPI_FILE_NAME)
+        with open(path, "w") as kpi_file:
+            json.dump(
+                {"samples": [sample.to_dict() for sample in self.samples], "summary": self.summary()},
+                kpi_file,
+                indent=2,
+            )
+        log.info(f"KPI results saved to {path}")
+        return path
+
+
+class KpiScope:
+    """Binds the test id, network mode, WAN id and current iteration to recorded samples."""
+
+    def __init__(self, recorder, test_id, network_mode=None, wan_id=None):
+        self.recorder = recorder
+        self.test_id = test_id
+        self.network_mode = network_mode
+        self.wan_id = wan_id
+        self.iteration = None
+
+    def record(self, name, value, unit="s", **labels):
+        return self.recorder.record(
+            self.test_id,
+            name,
+            value,
+            unit=unit,
+            network_mode=self.network_mode,
+            wan_id=self.wan_id,
+            iteration=self.iteration,
+            **labels,
+        )
+
+
+# Session wide recorder, exported next to the Allure results at the end of the run
+kpi_recorder = KpiRecorder()
+
+
+def export_kpi_results(config):
+    alluredir = config.getoption("allure_report_dir", default=None)
+    return kpi_recorder.export(alluredir)
@@ -0,0 +1,113 @@
+import itertools
+import pytest
+from lib_testbed.generic.util.logger import log
+from tests.client_connectivity.util.sharding import get_units
+
+# Estimated minutes of cloud reconfiguration and pod reconnect per state change
+DEFAULT_TRANSITION_COSTS = {"network_mode": 6.0, "wan": 4.0}
+STATE_MARKERS = (("network_mode", "target"), ("wan", "port"))
+MAX_EXACT_GROUPS = 8
+
+
+def required_state(item):
+    state = []
+    for marker_name, kwarg in STATE_MARKERS:
+        marker = item.get_closest_marker(marker_name)
+        state.append(marker.kwargs.get(kwarg) if marker else None)
+    return tuple(state)
+
+
+def transition(current, required, costs):
+    """Cost of reaching the required state, None in the required state means any value is fine."""
+    cost = 0.0
+    new_state = []
+    for (dimension, _), current_value, required_value in zip(STATE_MARKERS, current, required):
+        if required_value is None:
+            new_state.append(current_value)
+            continue
+        if current_value is not None and current_value != required_value:
+            cost += costs.get(dimension, 0.0)
+        new_state.append(required_value)
+    return cost, tuple(new_state)
+
+
+def sequence_cost(states, costs):
+    current = (None,) * len(STATE_MARKERS)
+    total = 0.0
+    for state in states:
+        cost, current = transition(current, state, costs)
+        total += cost
+    return total
+
+
+def order_groups(groups, costs):
+    states = list(groups)
+    if len(states) <= MAX_EXACT_GROUPS:
+        return list(min(itertools.permutations(states), key=lambda order: sequence_cost(order, costs)))
+    # Greedy nearest state for larger sets
+    ordered = []
+    current = (None,) * len(STATE_MARKERS)
+    remaining = list(states)
+    while remaining:
+        best = min(remaining, key=lambda state: transition(current, state, costs)[0])
+        ordered.append(best)
+        remaining.remove(best)
+        current = transition(current, best, costs)[1]
+    return ordered
+
+
+def order_units(units, costs):
+    groups = {}
+    for unit in units:
+        groups.setdefault(unit.state, []).append(unit)
+    return [unit for state in order_groups(groups, costs) for unit in groups[state]]
+
+
+def parse_costs(specs):
+    costs = dict(DEFAULT_TRANSITION_COSTS)
+    for spec in specs or []:
+        dimension, _, minutes = spec.partition("=")
+        assert dimension in costs and minutes, f"Invalid transition cost: {spec}, expected e.g. network_mode=6"
+        costs[dimension] = float(minutes)
+    return costs
+
+
+def add_ordering_options(parser):
+    group = parser.getgroup("ordering", "order test classes to minimize testbed state transitions")
+    group.addoption(
+        "--order-by-state",
+        action="store_true",
+        default=False,
+        help="Group test classes by required network mode and WAN port to minimize reconfigurations",
+    )
+    group.addoption(
+        "--transition-cost",
+        action="append",
+        default=[],
+        help="Minutes per state change, e.g. network_mode=6 or wan=4. Repeat per state kind",
+    )
+
+
+class StateOrdering:
+    def __init__(self, config):
+        self.costs = parse_costs(config.getoption("transition_cost"))
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, session, config, items):
+        # pytest runs the suite once per value of the session scoped params (wan_id), classes move within a run only
+        param_groups = {}
+        for unit in get_units(items):
+            unit.state = required_state(unit.items[0])
+            param_groups.setdefault(unit.params, []).append(unit)
+        units = [unit for group in param_groups.values() for unit in group]
+        file_order_cost = sequence_cost([unit.state for unit in units], self.costs)
+        ordered = [unit for group in param_groups.values() for unit in order_units(group, self.costs)]
+        ordered_cost = sequence_cost([unit.state for unit in ordered], self.costs)
+        if ordered_cost >= file_order_cost:
+            log.info(f"State ordering: keeping file order, {file_order_cost:.0f} min of transitions")
+            return
+        items[:] = [item for unit in ordered for item in unit.items]
+        log.info(
+            f"State ordering: {file_order_cost:.0f} min of transitions in file order, {ordered_cost:.0f} min"
+            f" after reordering, estimated {file_order_cost - ordered_cost:.0f} min saved"
+        )
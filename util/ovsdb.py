@@ -0,0 +1,217 @@
+import json
+import shlex
+import time
+import uuid
+from lib_testbed.generic.util.logger import log
+from tests.client_connectivity.util.fan_out import fan_out
+from tests.client_connectivity.util.remote_tail import RemoteFileTail
+from tests.client_connectivity.util.wait import wait_until
+
+DATABASE = "Open_vSwitch"
+# The OpenSync ovsdb-server socket, ovsdb-client does not default to it on every platform
+SERVER = "unix:/var/run/db.sock"
+# Actions of `ovsdb-client monitor` which carry the full new content of a row
+ROW_CONTENT_ACTIONS = ("initial", "insert", "new")
+
+
+def decode_value(value):
+    """OVSDB JSON value to python: ["set", [...]] -> list (None if empty), ["map", ...] -> dict, ["uuid", x] -> x."""
+    if not isinstance(value, list) or len(value) != 2:
+        return value
+    kind, content = value
+    if kind == "set":
+        items = [decode_value(item) for item in content]
+        return items or None
+    if kind == "map":
+        return {decode_value(key): decode_value(item) for key, item in content}
+    if kind in ("uuid", "named-uuid"):
+        return content
+    return value
+
+
+def encode_value(value):
+    if isinstance(value, (list, tuple, set)):
+        return ["set", [encode_value(item) for item in value]]
+    if isinstance(value, dict):
+        return ["map", [[encode_value(key), encode_value(item)] for key, item in value.items()]]
+    return value
+
+
+class RowDelta:
+    def __init__(self, uuid, action, values, timestamp):
+        self.uuid = uuid
+        self.action = action
+        self.values = values
+        self.timestamp = timestamp
+
+    def __repr__(self):
+        return f"<RowDelta {self.action} {self.uuid[:8]} {self.values}>"
+
+
+def parse_monitor_update(line, timestamp=None):
+    update = json.loads(line)
+    headings = update.get("headings", [])
+    deltas = []
+    row_uuid = ""
+    for data in update.get("data", []):
+        cells = dict(zip(headings, data))
+        action = cells.pop("action", "")
+        # The "new" row of a modification follows its "old" row with an empty row column
+        row_uuid = decode_value(cells.pop("row", "")) or (row_uuid if action == "new" else "")
+        values = {column: decode_value(value) for column, value in cells.items()}
+        deltas.append(RowDelta(row_uuid, action, values, timestamp or time.time()))
+    return deltas
+
+
+class OvsdbMonitor:
+    """Subscription to row changes of one OVSDB table on a pod, only the deltas are transferred."""
+
+    def __init__(self, pod, table, columns=None, where=None, database=DATABASE, server=SERVER):
+        self.pod = pod
+        self.table = table
+        self.where = where or {}
+        # Columns of the where clause have to be monitored as well to filter on them
+        self.columns = list(dict.fromkeys(list(columns or []) + list(self.where))) if columns else []
+        self.database = database
+        self.server = server
+        self.remote_path = f"/tmp/ovsdb_monitor_{table}_{uuid.uuid4().hex[:8]}.json"
+        self.tail = RemoteFileTail(pod, self.remote_path)
+        self.rows = {}
+        self.deltas = []
+        self.synced = False
+        self.pid = None
+
+    def start(self):
+        columns = ",".join(self.columns)
+        result = self.pod.run_raw(
+            f"ovsdb-client monitor {self.server} {self.database} {self.table} {columns} --format=json"
+            f" > {self.remote_path} 2>/dev/null < /dev/null & echo $!",
+            skip_exception=True,
+        )
+        assert result[0] == 0 and result[1].strip(), f"Can not start {self.table} monitor: {result}"
+        self.pid = result[1].strip()
+        log.info(f"Monitoring {self.table} on {self.pod.get_nickname()}, columns: {columns or 'all'}")
+        return self
+
+    def stop(self):
+        if self.pid:
+            self.pod.run_raw(f"kill {self.pid}; rm -f {self.remote_path}", skip_exception=True)
+            self.pid = None
+        log.info(f"Stopped {self.table} monitor, {len(self.deltas)} row deltas received")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_exc_info):
+        self.stop()
+
+    def matches(self, values):
+        return all(values.get(column) == value for column, value in self.where.items())
+
+    def poll(self):
+        """Apply the updates received since the previous poll, returns the deltas of rows matching the where clause."""
+        deltas = []
+        for line in self.tail.read_new_lines():
+            if not line.startswith("{"):
+                continue
+            self.synced = True
+            for delta in parse_monitor_update(line):
+                if delta.action == "delete":
+                    old = self.rows.pop(delta.uuid, None)
+                    if old is not None:
+                        deltas.append(delta)
+                elif delta.action in ROW_CONTENT_ACTIONS:
+                    row = dict(self.rows.get(delta.uuid, {}), **delta.values)
+                    if self.matches(row):
+                        self.rows[delta.uuid] = row
+                        deltas.append(delta)
+                    elif self.rows.pop(delta.uuid, None) is not None:
+                        # Row no longer matches the where clause, report it as removed
+                        deltas.append(RowDelta(delta.uuid, "delete", delta.values, delta.timestamp))
+        self.deltas.extend(deltas)
+        return deltas
+
+    def get_rows(self):
+        return list(self.rows.values())
+
+    def wait_for(self, condition, timeout=60, since=None, name=None):
+        """Wait until condition(rows) holds. The condition is evaluated only when rows changed."""
+        state = {}
+
+        def probe():
+            if self.poll() or ("rows" not in state and self.synced):
+                state["rows"] = self.get_rows()
+                state["met"] = bool(condition(state["rows"]))
+            return state.get("met", False)
+
+        result = wait_until(
+            probe, timeout=timeout, since=since, name=name or f"{self.table} update", max_interval=1.0
+        )
+        result.value = state.get("rows", self.get_rows())
+        return result
+
+    def wait_converged(self, key, expected, timeout=60, since=None):
+        """Wait for {key column value: {column: value}} rows, the result value holds seconds to converge per row."""
+        start_time = since if since is not None else time.time()
+        converged = {}
+
+        def probe():
+            self.poll()
+            for row in self.get_rows():
+                row_key = row.get(key)
+                if row_key in expected and row_key not in converged:
+                    if all(row.get(column) == value for column, value in expected[row_key].items()):
+                        converged[row_key] = time.time() - start_time
+            return converged
+
+        result = wait_until(
+            probe,
+            lambda done: len(done) == len(expected),
+            timeout=timeout,
+            since=start_time,
+            name=f"{self.table} convergence",
+            max_interval=1.0,
+        )
+        pending = sorted(set(expected) - set(converged))
+        if pending:
+            log.warning(f"{self.table} rows {pending} did not converge within {timeout}s")
+        return result
+
+
+def transact_updates(pod, table, updates, database=DATABASE, server=SERVER):
+    """Apply [(where, row), ...] updates, e.g. ({"if_name": "wl0.2"}, {"group_rekey": 30}), in one transaction."""
+    operations = [
+        {
+            "op": "update",
+            "table": table,
+            "where": [[column, "==", encode_value(value)] for column, value in where.items()],
+            "row": {column: encode_value(value) for column, value in row.items()},
+        }
+        for where, row in updates
+    ]
+    transaction = json.dumps([database] + operations)
+    result = pod.run_raw(f"ovsdb-client transact {server} {shlex.quote(transaction)}", skip_exception=True)
+    assert result[0] == 0, f"{table} transaction failed on {pod.get_nickname()}: {result}"
+    replies = json.loads(result[1])
+    errors = [reply for reply in replies if reply and "error" in reply]
+    assert not errors, f"{table} transaction failed on {pod.get_nickname()}: {errors}"
+    counts = [reply.get("count", 0) for reply in replies[: len(operations)]]
+    log.info(f"Updated {sum(counts)} {table} rows in one transaction on {pod.get_nickname()}")
+    return counts
+
+
+def get_json_table_on_pods(pods, table, where=None, max_workers=8):
+    """Read the same OVSDB table on every pod of a pods group in parallel, {pod nickname: rows} of reachable pods."""
+    kwargs = {"where": where} if where else {}
+    results = fan_out(
+        lambda device: device.ovsdb.get_json_table(table=table, skip_exception=True, **kwargs),
+        pods.get_devices(),
+        max_workers=max_workers,
+        name=f"{table} query",
+    )
+    latencies = ", ".join(f"{name}: {result.duration:.2f}s" for name, result in results.items())
+    log.info(f"{table} query latency per pod: {latencies}")
+    unreachable = [name for name, result in results.items() if not result.ok or result.value is None]
+    if unreachable:
+        log.warning(f"Skipping pods which did not answer the {table} query: {unreachable}")
+    return {name: result.value for name, result in results.items() if name not in unreachable}
@@ -0,0 +1,147 @@
+import mmap
+import struct
+from collections import namedtuple
+
+LINKTYPE_IEEE802_11 = 105
+LINKTYPE_IEEE802_11_RADIOTAP = 127
+
+# 802.11 type_subtype values, same numbering as wireshark's wlan.fc.type_subtype
+ASSOC_REQUEST = 0x00
+ASSOC_RESPONSE = 0x01
+PROBE_REQUEST = 0x04
+PROBE_RESPONSE = 0x05
+BEACON = 0x08
+AUTHENTICATION = 0x0B
+DEAUTHENTICATION = 0x0C
+
+PCAP_MAGICS = {
+    b"\xd4\xc3\xb2\xa1": ("<", 1e-6),
+    b"\xa1\xb2\xc3\xd4": (">", 1e-6),
+    b"\x4d\x3c\xb2\xa1": ("<", 1e-9),
+    b"\xa1\xb2\x3c\x4d": (">", 1e-9),
+}
+GLOBAL_HEADER_LEN = 24
+RECORD_HEADER_LEN = 16
+
+Frame = namedtuple("Frame", ["timestamp", "type_subtype", "addr1", "addr2", "addr3"])
+
+
+class PcapError(Exception):
+    pass
+
+
+def format_mac(raw):
+    return ":".join(f"{byte:02x}" for byte in raw)
+
+
+def parse_80211(timestamp, data):
+    if len(data) < 10:
+        return None
+    frame_type = (data[0] >> 2) & 0x3
+    subtype = (data[0] >> 4) & 0xF
+    addr1 = format_mac(data[4:10])
+    addr2 = format_mac(data[10:16]) if len(data) >= 16 else None
+    addr3 = format_mac(data[16:22]) if len(data) >= 22 and frame_type != 1 else None
+    return Frame(timestamp, (frame_type << 4) | subtype, addr1, addr2, addr3)
+
+
+class PcapParser:
+    """Incremental parser of classic pcap files with 802.11 or radiotap link layer."""
+
+    def __init__(self):
+        self.endian = None
+        self.ts_scale = None
+        self.linktype = None
+        self.buffer = b""
+        self.frames_parsed = 0
+
+    def parse_global_header(self, data):
+        if data[:4] not in PCAP_MAGICS:
+            raise PcapError(f"Not a classic pcap file, magic: {data[:4].hex()}")
+        self.endian, self.ts_scale = PCAP_MAGICS[data[:4]]
+        self.linktype = struct.unpack_from(f"{self.endian}I", data, 20)[0]
+        if self.linktype not in (LINKTYPE_IEEE802_11, LINKTYPE_IEEE802_11_RADIOTAP):
+            raise PcapError(f"Unsupported link type: {self.linktype}, expected 802.11 or radiotap capture")
+
+    def strip_link_header(self, packet):
+        if self.linktype == LINKTYPE_IEEE802_11_RADIOTAP:
+            if len(packet) < 4:
+                return b""
+            radiotap_len = struct.unpack_from("<H", packet, 2)[0]
+            return packet[radiotap_len:]
+        return packet
+
+    def iter_frames(self, data, offset=0):
+        """Yield frames from a buffer of records, the last yielded value is the offset of the unparsed tail."""
+        view = memoryview(data)
+        record_fmt = f"{self.endian}IIII"
+        while offset + RECORD_HEADER_LEN <= len(view):
+            ts_sec, ts_frac, incl_len, _orig_len = struct.unpack_from(record_fmt, view, offset)
+            end = offset + RECORD_HEADER_LEN + incl_len
+            if end > len(view):
+                break
+            packet = bytes(self.strip_link_header(view[offset + RECORD_HEADER_LEN : end]))
+            offset = end
+            self.frames_parsed += 1
+            frame = parse_80211(ts_sec + ts_frac * self.ts_scale, packet)
+            if frame:
+                yield frame
+        return offset
+
+    def feed(self, chunk):
+        """Parse a chunk of a growing capture, returns complete frames found so far."""
+        self.buffer += chunk
+        offset = 0
+        if self.linktype is None:
+            if len(self.buffer) < GLOBAL_HEADER_LEN:
+                return []
+            self.parse_global_header(self.buffer)
+            offset = GLOBAL_HEADER_LEN
+        frames = []
+        generator = self.iter_frames(self.buffer, offset)
+        while True:
+            try:
+                frames.append(next(generator))
+            except StopIteration as stop:
+                offset = stop.value
+                break
+        self.buffer = self.buffer[offset:]
+        return frames
+
+
+def read_frames(path):
+    """Stream frames from a pcap file without loading it into memory."""
+    with open(path, "rb") as pcap_file:
+        if not pcap_file.seek(0, 2):
+            return
+        with mmap.mmap(pcap_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if len(data) < GLOBAL_HEADER_LEN:
+                raise PcapError(f"Truncated pcap file: {path}")
+            parser = PcapParser()
+            parser.parse_global_header(data)
+            yield from parser.iter_frames(data, GLOBAL_HEADER_LEN)
+
+
+def frame_filter(type_subtype=None, addr=None, addr_any=None):
+    """Like wlan.fc.type_subtype == X && wlan.addr == addr && (wlan.addr == any of addr_any)."""
+    addr = addr.lower() if addr else None
+    addr_any = {mac.lower() for mac in addr_any} if addr_any is not None else None
+
+    def match(frame):
+        if type_subtype is not None and frame.type_subtype != type_subtype:
+            return False
+        addresses = {frame.addr1, frame.addr2, frame.addr3}
+        if addr and addr not in addresses:
+            return False
+        if addr_any is not None and not addresses & addr_any:
+            return False
+        return True
+
+    return match
+
+
+def find_first_frame(path, predicate):
+    for frame in read_frames(path):
+        if predicate(frame):
+            return frame
+    return None
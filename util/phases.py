@@ -0,0 +1,111 @@
+import statistics
+import time
+from tests.client_connectivity.util.kpi import format_table, percentile
+
+# Phase boundaries of the static mode onboarding, in the order they are reached
+REBOOT_ISSUED = "reboot issued"
+DISCONNECTED = "disconnected"
+CONTROLLER_UP = "controller up"
+LOOP_FLAG_DOWN = "loop flag down"
+LEASE_ACQUIRED = "lease acquired"
+FIRST_PING = "first ping"
+NOC_VISIBLE = "NOC visible"
+ONBOARDING_PHASES = (
+    REBOOT_ISSUED,
+    DISCONNECTED,
+    CONTROLLER_UP,
+    LOOP_FLAG_DOWN,
+    LEASE_ACQUIRED,
+    FIRST_PING,
+    NOC_VISIBLE,
+)
+AGGREGATES = {"median": statistics.median, "p90": lambda values: percentile(values, 90), "max": max}
+
+
+class PhaseIteration:
+    def __init__(self, start_time):
+        self.start_time = start_time
+        # [(phase, time)] in the order the boundaries were reached
+        self.marks = []
+
+    def breakdown(self):
+        """{phase: seconds since the previous boundary}, phases which were not reached are left out."""
+        durations = {}
+        previous = self.start_time
+        for phase, timestamp in self.marks:
+            durations[phase] = timestamp - previous
+            previous = timestamp
+        return durations
+
+    def elapsed(self):
+        return self.marks[-1][1] - self.start_time if self.marks else 0.0
+
+
+class PhaseProfiler:
+    """Named phase boundaries of a repeated flow, a breakdown per iteration and percentiles across iterations."""
+
+    def __init__(self, name, phases=ONBOARDING_PHASES):
+        self.name = name
+        self.phases = list(phases)
+        self.iterations = []
+
+    def start(self, at=None):
+        self.iterations.append(PhaseIteration(at if at is not None else time.time()))
+        return self
+
+    def mark(self, phase, at=None):
+        if not self.iterations:
+            return
+        if phase not in self.phases:
+            self.phases.append(phase)
+        self.iterations[-1].marks.append((phase, at if at is not None else time.time()))
+
+    def breakdown(self, iteration=-1):
+        return self.iterations[iteration].breakdown() if self.iterations else {}
+
+    def slowest(self, iteration=-1):
+        breakdown = self.breakdown(iteration)
+        if not breakdown:
+            return None, 0.0
+        return max(breakdown.items(), key=lambda item: item[1])
+
+    def hint(self, iteration=-1):
+        """Slowest phase reached so far, appended to assertion messages."""
+        phase, seconds = self.slowest(iteration)
+        return f", slowest phase: {phase} ({seconds:.1f}s)" if phase else ""
+
+    def describe(self, iteration=-1):
+        breakdown = self.breakdown(iteration)
+        phases = ", ".join(f"{phase}: {seconds:.1f}s" for phase, seconds in breakdown.items())
+        return f"{self.name}: {phases or 'no phases reached'}"
+
+    def percentiles(self):
+        """{phase: {"median": s, "p90": s, "max": s}} of the phase durations across iterations."""
+        durations = {}
+        for iteration in self.iterations:
+            for phase, seconds in iteration.breakdown().items():
+                durations.setdefault(phase, []).append(seconds)
+        return {
+            phase: {name: aggregate(values) for name, aggregate in AGGREGATES.items()}
+            for phase, values in durations.items()
+        }
+
+    def table(self):
+        def cell(value):
+            return f"{value:.1f}" if value is not None else "-"
+
+        header = ["iteration"] + self.phases + ["total"]
+        rows = []
+        for index, iteration in enumerate(self.iterations, start=1):
+            breakdown = iteration.breakdown()
+            rows.append([index] + [cell(breakdown.get(phase)) for phase in self.phases] + [cell(iteration.elapsed())])
+        stats = self.percentiles()
+        totals = [iteration.elapsed() for iteration in self.iterations]
+        for name, aggregate in AGGREGATES.items():
+            phase_cells = [cell(stats[phase][name]) if phase in stats else "-" for phase in self.phases]
+            rows.append([name] + phase_cells + [cell(aggregate(totals)) if totals else "-"])
+        return format_table(header, rows)
+
+    def record_kpi(self, kpi, iteration=-1):
+        for phase, seconds in self.breakdown(iteration).items():
+            kpi.record(f"phase_{phase.lower().replace(' ', '_')}", seconds)
@@ -0,0 +1,116 @@
+import re
+import statistics
+from lib_testbed.generic.util.logger import log
+from tests.client_connectivity.util.kpi import percentile
+
+# iputils "icmp_seq=1 ttl=64 time=0.42 ms", busybox "seq=0 ttl=64 time=0.420 ms"
+REPLY_PATTERN = re.compile(r"\b(?:icmp_)?seq=(\d+)\b.*?\btime[=<]([\d.]+) ?ms")
+COUNTS_PATTERN = re.compile(r"(\d+) packets transmitted, (\d+) (?:packets )?received")
+LOSS_PATTERN = re.compile(r"([\d.]+)% packet loss")
+# iputils "rtt min/avg/max/mdev = a/b/c/d ms", busybox "round-trip min/avg/max = a/b/c ms"
+SUMMARY_PATTERN = re.compile(r"(?:rtt|round-trip) ([\w/]+) = ([\d./]+) ms")
+
+
+class PingResult:
+    """Parsed ping output, truthy when at least one reply came back."""
+
+    def __init__(self, target=None, transmitted=0, received=0, loss=100.0, replies=None, summary=None, output=""):
+        self.target = target
+        self.transmitted = transmitted
+        self.received = received
+        self.loss = loss
+        # {sequence number: rtt in ms}, duplicates are ignored
+        self.replies = replies or {}
+        # {"min": ms, "avg": ms, "max": ms, "mdev": ms} as reported by ping
+        self.summary = summary or {}
+        self.output = output
+
+    def __bool__(self):
+        return self.received > 0
+
+    @classmethod
+    def parse(cls, output, target=None):
+        replies = {}
+        for sequence, rtt in REPLY_PATTERN.findall(output):
+            replies.setdefault(int(sequence), float(rtt))
+        counts = COUNTS_PATTERN.search(output)
+        transmitted, received = (int(counts.group(1)), int(counts.group(2))) if counts else (0, len(replies))
+        loss = LOSS_PATTERN.search(output)
+        if loss:
+            loss = float(loss.group(1))
+        else:
+            loss = 100.0 * (transmitted - received) / transmitted if transmitted else 100.0
+        summary = {}
+        match = SUMMARY_PATTERN.search(output)
+        if match:
+            summary = dict(zip(match.group(1).split("/"), (float(value) for value in match.group(2).split("/"))))
+        return cls(target, transmitted, received, loss, replies, summary, output)
+
+    @property
+    def rtts(self):
+        return [self.replies[sequence] for sequence in sorted(self.replies)]
+
+    @property
+    def rtt_avg(self):
+        if "avg" in self.summary:
+            return self.summary["avg"]
+        return statistics.mean(self.rtts) if self.rtts else None
+
+    @property
+    def jitter(self):
+        """Mean deviation reported by ping, the RTT standard deviation for pings which do not report it."""
+        if "mdev" in self.summary:
+            return self.summary["mdev"]
+        return statistics.pstdev(self.rtts) if len(self.rtts) > 1 else None
+
+    def rtt_stats(self):
+        rtts = self.rtts
+        if not rtts:
+            return {}
+        return {
+            "min": min(rtts),
+            "median": statistics.median(rtts),
+            "p95": percentile(rtts, 95),
+            "max": max(rtts),
+        }
+
+    def budget_violations(self, max_loss=None, max_rtt=None, max_jitter=None):
+        """Exceeded budgets as readable strings, an unanswered ping always violates them."""
+        if not self:
+            return [f"no reply from {self.target}"]
+        violations = []
+        if max_loss is not None and self.loss > max_loss:
+            violations.append(f"loss {self.loss:.1f}% > {max_loss}%")
+        if max_rtt is not None and self.rtt_avg > max_rtt:
+            violations.append(f"average rtt {self.rtt_avg:.2f} ms > {max_rtt} ms")
+        if max_jitter is not None and self.jitter is not None and self.jitter > max_jitter:
+            violations.append(f"jitter {self.jitter:.2f} ms > {max_jitter} ms")
+        return violations
+
+    def __repr__(self):
+        if not self:
+            return f"<PingResult {self.target}: {self.received}/{self.transmitted} received>"
+        return (
+            f"<PingResult {self.target}: {self.received}/{self.transmitted} received,"
+            f" avg {self.rtt_avg:.2f} ms, jitter {self.jitter or 0:.2f} ms>"
+        )
+
+
+def ping(client, target, iface, count=5, interval=0.2, size=None, timeout=None):
+    """Ping the target from the client interface, the PingResult also covers failed pings."""
+    deadline = timeout or int(count * interval) + 5
+    size_option = f" -s {size}" if size is not None else ""
+    # Bound to the interface, so a reply can not come back over another route of the client
+    command = f"ping -I {iface} -c {count} -i {interval} -w {deadline}{size_option} {target}"
+    result = client.run_raw(command, timeout=deadline + 10, skip_exception=True)
+    ping_result = PingResult.parse(result[1] or "", target)
+    log.debug(f"{client.get_nickname()}: {ping_result}")
+    return ping_result
+
+
+def record_ping_kpi(kpi, result, **labels):
+    kpi.record("ping_loss", result.loss, unit="%", **labels)
+    if result:
+        kpi.record("ping_rtt", result.rtt_avg, unit="ms", **labels)
+        if result.jitter is not None:
+            kpi.record("ping_jitter", result.jitter, unit="ms", **labels)
@@ -0,0 +1,175 @@
+import statistics
+from lib_testbed.generic.util.logger import log
+from tests.client_connectivity.util.batch import CommandBatch
+from tests.client_connectivity.util.kpi import format_table, percentile
+from tests.client_connectivity.util.ping import PingResult
+
+# IPv4 and ICMP headers on top of the ping payload
+IP_ICMP_HEADERS = 28
+MIN_PAYLOAD = 548
+MAX_PAYLOAD = 1472
+BASELINE_PAYLOAD = 56
+
+
+class ProbeResult:
+    def __init__(self, size, sent=0, received=0, rtts=None):
+        self.size = size
+        self.sent = sent
+        self.received = received
+        self.rtts = rtts or []
+
+    @property
+    def ok(self):
+        return self.received > 0
+
+    @property
+    def loss(self):
+        return 100.0 * (self.sent - self.received) / self.sent if self.sent else 100.0
+
+    def rtt_stats(self):
+        if not self.rtts:
+            return {}
+        return {
+            "min": min(self.rtts),
+            "median": statistics.median(self.rtts),
+            "p95": percentile(self.rtts, 95),
+            "max": max(self.rtts),
+        }
+
+    @classmethod
+    def parse(cls, size, output):
+        result = PingResult.parse(output)
+        return cls(size, result.transmitted, result.received, result.rtts)
+
+    def __repr__(self):
+        return f"<ProbeResult {self.size}B: {self.received}/{self.sent} received, rtt {self.rtt_stats()}>"
+
+
+class PmtuResult:
+    def __init__(self, target, probes, max_payload, samples=None):
+        self.target = target
+        # Pass/fail probes of the search and the serial RTT measurements, by payload size
+        self.probes = probes
+        self.samples = samples or {}
+        self.max_payload = max_payload
+
+    @property
+    def path_mtu(self):
+        return self.max_payload + IP_ICMP_HEADERS if self.max_payload else None
+
+    def rtt_stats(self, size):
+        sample = self.samples.get(size)
+        return sample.rtt_stats() if sample else {}
+
+
+class PmtuProber:
+    """Largest payload reaching the target with DF set, found by a k-way search.
+
+    The pass/fail probes of a search round run at once, RTTs are only measured by pings running one after the other.
+    """
+
+    def __init__(
+        self,
+        client,
+        target,
+        count=5,
+        search_count=2,
+        ways=3,
+        min_payload=MIN_PAYLOAD,
+        max_payload=MAX_PAYLOAD,
+        baseline=BASELINE_PAYLOAD,
+    ):
+        self.client = client
+        self.target = target
+        self.count = count
+        self.search_count = search_count
+        self.ways = ways
+        self.min_payload = min_payload
+        self.max_payload = max_payload
+        self.baseline = baseline
+        self.probes = {}
+        self.samples = {}
+
+    def ping_command(self, size, count):
+        return f"sudo /bin/ping -c {count} -i 0.2 -W 1 -w {count + 2} -s {size} -M do {self.target}"
+
+    def probe(self, sizes, count, parallel=True):
+        batch = CommandBatch(self.client, parallel=parallel)
+        for size in sizes:
+            batch.add(size, self.ping_command(size, count))
+        timeout = (count + 2) * (1 if parallel else len(sizes)) + 8
+        results = {}
+        for size, result in batch.run(timeout=timeout).items():
+            results[size] = self.probes[size] = ProbeResult.parse(size, result.stdout)
+            log.debug(f"{self.target}: {self.probes[size]}")
+        return results
+
+    def measure(self, sizes):
+        """RTT samples of `sizes`, the pings run one after the other so they do not queue behind each other."""
+        self.samples.update(self.probe(sizes, self.count, parallel=False))
+        return self.samples
+
+    def search_sizes(self, low, high):
+        step = (high - low) / (self.ways + 1)
+        return sorted({int(low + step * index) for index in range(1, self.ways + 1)} - {low, high})
+
+    def run(self):
+        # The common case, the full size payload passes, costs one round which measures both RTTs
+        self.measure([self.baseline, self.max_payload])
+        if self.probes[self.max_payload].ok:
+            return PmtuResult(self.target, self.probes, self.max_payload, self.samples)
+        if not self.probes[self.baseline].ok:
+            log.warning(f"{self.target} is unreachable with {self.baseline} bytes payload")
+            return PmtuResult(self.target, self.probes, None, self.samples)
+        # Largest known passing and smallest known failing payload
+        low, high = self.baseline, self.max_payload
+        if self.min_payload > low:
+            self.probe([self.min_payload], self.search_count)
+            if self.probes[self.min_payload].ok:
+                low = self.min_payload
+            else:
+                high = self.min_payload
+        while high - low > 1:
+            sizes = self.search_sizes(low, high)
+            self.probe(sizes, self.search_count)
+            for size in sizes:
+                if not self.probes[size].ok:
+                    high = size
+                    break
+                low = size
+        if low not in self.samples:
+            self.measure([low])
+        log.info(f"Path MTU to {self.target}: {low + IP_ICMP_HEADERS}, largest DF payload: {low}")
+        return PmtuResult(self.target, self.probes, low, self.samples)
+
+
+def pmtu_table(results):
+    """{label: PmtuResult} as a table of path MTU and RTT near the limit against the baseline payload."""
+    rows = []
+    for label, result in results.items():
+        if result is None:
+            rows.append([label, "error", "-", "-", "-", "-"])
+            continue
+        baseline = result.rtt_stats(BASELINE_PAYLOAD)
+        full_size = result.rtt_stats(result.max_payload) if result.max_payload else {}
+        rows.append(
+            [
+                label,
+                result.path_mtu or "unreachable",
+                f"{baseline['median']:.2f}" if baseline else "-",
+                f"{full_size['median']:.2f}" if full_size else "-",
+                f"{full_size['p95']:.2f}" if full_size else "-",
+                len(result.probes),
+            ]
+        )
+    header = ["target", "path MTU", "rtt median (baseline)", "rtt median (max)", "rtt p95 (max)", "probed sizes"]
+    return format_table(header, rows)
+
+
+def record_pmtu_kpi(kpi, result, **labels):
+    if not result.max_payload:
+        return
+    kpi.record("path_mtu", result.path_mtu, unit="B", **labels)
+    full_size = result.rtt_stats(result.max_payload)
+    if full_size:
+        kpi.record("max_payload_rtt", full_size["median"], unit="ms", **labels)
@@ -0,0 +1,137 @@
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from lib_testbed.generic.util.logger import log
+from tests.client_connectivity.util.fan_out import get_name
+from tests.client_connectivity.util.kpi import format_table
+from tests.client_connectivity.util.sanity import incremental_sanity
+
+LOCATION = "location"
+
+
+def sanity_passed(pod):
+    return incremental_sanity(pod) == 0
+
+
+class StageFailed(Exception):
+    def __init__(self, pod_name, stage, reason):
+        super().__init__(f"{stage} failed on {pod_name}: {reason}")
+        self.pod_name = pod_name
+        self.stage = stage
+        self.reason = reason
+
+
+class ReadinessResult:
+    def __init__(self, stages):
+        self.stages = stages
+        # {pod name: {stage: seconds}} and {pod name: seconds since the barrier start}
+        self.timings = {}
+        self.ready_at = {}
+        self.failure = None
+        self.elapsed = 0.0
+
+    def __bool__(self):
+        return self.failure is None
+
+    def record(self, pod_name, stage, duration):
+        self.timings.setdefault(pod_name, {})[stage] = duration
+
+    def table(self):
+        header = ["pod"] + self.stages + ["ready at"]
+        rows = []
+        for pod_name, timings in self.timings.items():
+            ready_at = self.ready_at.get(pod_name)
+            rows.append(
+                [pod_name]
+                + [f"{timings[stage]:.1f}" if stage in timings else "-" for stage in self.stages]
+                + [f"{ready_at:.1f}" if ready_at is not None else "-"]
+            )
+        return format_table(header, rows)
+
+
+class ReadinessBarrier:
+    """Location stages first, then per pod stage pipelines running concurrently, each pod moves on as soon as it can."""
+
+    def __init__(self, name="pods ready", max_workers=8):
+        self.name = name
+        self.max_workers = max_workers
+        self.location_stages = []
+        self.pod_stages = []
+
+    def add_location_stage(self, name, check):
+        self.location_stages.append((name, check))
+        return self
+
+    def add_stage(self, name, check, pods=None):
+        """check(pod) fails the stage by raising or returning False, `pods` limits it to some pods (all by default)."""
+        pod_names = {get_name(pod) for pod in pods} if pods is not None else None
+        self.pod_stages.append((name, check, pod_names))
+        return self
+
+    def run_stage(self, result, pod_name, stage, check, *args):
+        log.info(f"[{pod_name}] Waiting for {stage}")
+        start_time = time.time()
+        try:
+            value = check(*args)
+        except Exception as err:
+            raise StageFailed(pod_name, stage, repr(err))
+        finally:
+            result.record(pod_name, stage, time.time() - start_time)
+        # Helpers which only wait return None, a stage fails on an exception or an explicit False
+        if value is False:
+            raise StageFailed(pod_name, stage, f"check returned {value!r}")
+        log.info(f"[{pod_name}] {stage} passed after {time.time() - start_time:.2f} sec")
+
+    def run(self, pods):
+        stages = [name for name, _ in self.location_stages] + [name for name, _, _ in self.pod_stages]
+        result = ReadinessResult(stages)
+        start_time = time.time()
+        try:
+            for stage, check in self.location_stages:
+                self.run_stage(result, LOCATION, stage, check)
+            if self.location_stages:
+                result.ready_at[LOCATION] = time.time() - start_time
+            self.run_pipelines(result, list(pods), start_time)
+        except StageFailed as err:
+            result.failure = err
+        result.elapsed = time.time() - start_time
+        outcome = "passed" if result else f"failed: {result.failure}"
+        log.info(f"{self.name} {outcome} after {result.elapsed:.2f} sec\n{result.table()}")
+        return result
+
+    def run_pipelines(self, result, pods, start_time):
+        stop = threading.Event()
+        # In the order the pipelines failed, the first one is the cause, the others may be its consequences
+        failures = []
+
+        def pipeline(pod):
+            pod_name = get_name(pod)
+            for stage, check, pod_names in self.pod_stages:
+                # Another pod failed, the running stage finishes but no further stage starts
+                if stop.is_set():
+                    return
+                if pod_names is None or pod_name in pod_names:
+                    try:
+                        self.run_stage(result, pod_name, stage, check, pod)
+                    except Exception as err:
+                        failures.append(err)
+                        stop.set()
+                        raise
+            result.ready_at[pod_name] = time.time() - start_time
+
+        if not pods or not self.pod_stages:
+            return
+        for pod in pods:
+            result.timings.setdefault(get_name(pod), {})
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(pods)))
+        futures = [executor.submit(pipeline, pod) for pod in pods]
+        try:
+            wait(futures, return_when=FIRST_EXCEPTION)
+        finally:
+            stop.set()
+            for future in futures:
+                future.cancel()
+            # No stage may keep touching the testbed once the barrier returned
+            executor.shutdown(wait=True)
+        if failures:
+            raise failures[0]
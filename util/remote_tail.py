@@ -0,0 +1,31 @@
+import base64
+from lib_testbed.generic.util.logger import log
+
+
+class RemoteFileTail:
+    """Reads only the bytes appended to a file on a remote device since the previous read."""
+
+    def __init__(self, device, path):
+        self.device = device
+        self.path = path
+        self.offset = 0
+        self.reads = 0
+
+    def read_new(self, timeout=30):
+        result = self.device.run_raw(
+            f"tail -c +{self.offset + 1} {self.path} 2>/dev/null | base64", timeout=timeout, skip_exception=True
+        )
+        self.reads += 1
+        if result[0]:
+            log.debug(f"Can not read {self.path}: {result}")
+            return b""
+        chunk = base64.b64decode("".join(result[1].split()))
+        self.offset += len(chunk)
+        return chunk
+
+    def read_new_lines(self, timeout=30):
+        # Only complete lines are consumed, a partially written line is read again next time
+        chunk = self.read_new(timeout=timeout)
+        complete, _, partial = chunk.rpartition(b"\n")
+        self.offset -= len(partial)
+        return complete.decode(errors="replace").splitlines() if complete else []
@@ -0,0 +1,112 @@
+import hashlib
+import threading
+import time
+from lib_testbed.generic.util.logger import log
+from tests.client_connectivity.util.batch import run_batch
+from tests.client_connectivity.util.fan_out import fan_out, get_name
+
+# State the sanity checks depend on, a pod whose inputs did not change since its last pass is not checked again
+SANITY_INPUTS = {
+    "boot": "cat /proc/sys/kernel/random/boot_id",
+    "manager": "ovsh s Manager is_connected target -r",
+    "radios": "ovsh s Wifi_Radio_State if_name enabled channel ht_mode -r",
+    "vifs": "ovsh s Wifi_VIF_State if_name enabled mode ssid bridge -r",
+    "inet": "ovsh s Wifi_Inet_State if_name enabled network inet_addr -r",
+    "uplink": "ovsh s Connection_Manager_Uplink if_name is_used has_L3 -r",
+    # Bridge membership and link state of the ports, both change with a port swap
+    "ports": "for br in $(ovs-vsctl list-br); do echo $br $(ovs-vsctl list-ports $br); done",
+    "links": "grep -H . /sys/class/net/eth*/carrier 2>/dev/null || true",
+}
+# Safety net for changes the fingerprint does not cover
+MAX_AGE = 900
+
+
+def pod_fingerprint(pod):
+    """Hash of each sanity input, read in one remote call. None if the pod can not be read."""
+    try:
+        results = run_batch(pod, SANITY_INPUTS, timeout=30)
+    except Exception as err:
+        log.debug(f"Can not fingerprint {get_name(pod)}: {err!r}")
+        return None
+    if not results.all_ok():
+        return None
+    return {name: hashlib.sha1(result.stdout.encode()).hexdigest() for name, result in results.items()}
+
+
+class SanityCache:
+    def __init__(self, max_age=MAX_AGE):
+        self.max_age = max_age
+        # {pod name: (fingerprint, time of the passing sanity)}
+        self.passed = {}
+        self.force = False
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def changed_inputs(self, pod_name, fingerprint):
+        with self.lock:
+            entry = self.passed.get(pod_name)
+        if self.force or entry is None or fingerprint is None or time.time() - entry[1] > self.max_age:
+            return list(SANITY_INPUTS)
+        return [name for name in SANITY_INPUTS if entry[0].get(name) != fingerprint.get(name)]
+
+    def store(self, pod_name, fingerprint):
+        with self.lock:
+            if fingerprint is None:
+                self.passed.pop(pod_name, None)
+            else:
+                self.passed[pod_name] = (fingerprint, time.time())
+
+    def invalidate(self, pod_name=None):
+        with self.lock:
+            if pod_name is None:
+                self.passed.clear()
+            else:
+                self.passed.pop(pod_name, None)
+
+
+sanity_cache = SanityCache()
+
+
+def incremental_sanity(pod, force=False):
+    """poll_pod_sanity() skipped when the pod state did not change since its last pass, 0 means passed."""
+    pod_name = get_name(pod)
+    changed = list(SANITY_INPUTS) if force else sanity_cache.changed_inputs(pod_name, pod_fingerprint(pod))
+    if not changed:
+        sanity_cache.hits += 1
+        log.info(f"[{pod_name}] State unchanged since the last passing sanity, skipping it")
+        return 0
+    sanity_cache.misses += 1
+    log.info(f"[{pod_name}] Running sanity, changed inputs: {changed}")
+    result = pod.poll_pod_sanity()
+    # Fingerprint of the state which passed, a transitional state read before the sanity is never stored
+    sanity_cache.store(pod_name, pod_fingerprint(pod) if result == 0 else None)
+    return result
+
+
+def pods_sanity(pods, force=False, max_workers=8):
+    """Incremental sanity of every pod of a pods group in parallel. Empty (falsy) when all pods passed."""
+    results = fan_out(
+        lambda pod: incremental_sanity(pod, force=force), pods.get_devices(), max_workers=max_workers, name="sanity"
+    )
+    outcomes = {name: result.value if result.ok else result.error for name, result in results.items()}
+    return {name: outcome for name, outcome in outcomes.items() if outcome != 0}
+
+
+def add_sanity_options(parser):
+    group = parser.getgroup("sanity", "incremental pod sanity")
+    group.addoption(
+        "--full-sanity",
+        action="store_true",
+        default=False,
+        help="Run the full sanity on every pod even when its state did not change since the last pass",
+    )
+
+
+def configure_sanity(config):
+    sanity_cache.force = config.getoption("full_sanity")
+
+
+def log_sanity_stats():
+    if sanity_cache.hits or sanity_cache.misses:
+        log.info(f"Incremental sanity: {sanity_cache.hits} passes reused, {sanity_cache.misses} sanity runs")
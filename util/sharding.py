@@ -0,0 +1,187 @@
+import json
+import os
+import pytest
+from lib_testbed.generic.util.logger import log
+
+DEFAULT_DURATION = 300
+RESOURCE_MARKERS = {
+    "opensync_switch": "switch",
+    "opensync_pod": "pod",
+    "opensync_pods": "pod",
+    "opensync_client": "client",
+}
+
+
+class ScheduleUnit:
+    """A test class (or a module with plain test functions), its items never get split between testbeds.
+
+    Classes parametrized at session scope, e.g. by wan_id, are one unit per value: pytest runs them apart anyway.
+    """
+
+    def __init__(self, nodeid, duration, resources, params=()):
+        self.nodeid = nodeid
+        self.duration = duration
+        self.resources = resources
+        self.params = params
+        self.items = []
+
+    @property
+    def key(self):
+        return format_key(self.nodeid, self.params)
+
+
+class Testbed:
+    def __init__(self, name, capabilities=None):
+        self.name = name
+        # None means the testbed has every resource
+        self.capabilities = capabilities
+        self.units = []
+        self.load = 0
+
+    def can_run(self, unit):
+        return self.capabilities is None or unit.resources <= self.capabilities
+
+    def add(self, unit):
+        self.units.append(unit)
+        self.load += unit.duration
+
+
+def unit_resources(item):
+    resources = set()
+    for mark in item.iter_markers():
+        kind = RESOURCE_MARKERS.get(mark.name)
+        if not kind:
+            continue
+        resources.add(kind)
+        if kind == "client":
+            resources.update(f"client:{kwarg}" for kwarg in ("eth", "wifi") if mark.kwargs.get(kwarg))
+    return resources
+
+
+def format_key(nodeid, params):
+    return f"{nodeid}[{','.join(params)}]" if params else nodeid
+
+
+def unit_nodeid(item):
+    module_nodeid = item.nodeid.split("::")[0]
+    return module_nodeid if item.cls is None else f"{module_nodeid}::{item.cls.__name__}"
+
+
+def session_params(item):
+    """("wan_id=1", ...) of the session scoped parameters, pytest groups the items of the session by their values."""
+    callspec = getattr(item, "callspec", None)
+    if callspec is None:
+        return ()
+    fixturedefs = item._fixtureinfo.name2fixturedefs
+    return tuple(
+        f"{name}={value}"
+        for name, value in sorted(callspec.params.items())
+        if name in fixturedefs and fixturedefs[name][-1].scope == "session"
+    )
+
+
+def unit_key(item):
+    return format_key(unit_nodeid(item), session_params(item))
+
+
+def get_units(items, default_duration=DEFAULT_DURATION, expected_duration=None):
+    """`expected_duration(unit key, declared)` may replace the duration marker, e.g. by a measured duration."""
+    units = {}
+    for item in items:
+        key = (unit_nodeid(item), session_params(item))
+        unit = units.get(key)
+        if unit is None:
+            marker = item.get_closest_marker("duration")
+            duration = marker.kwargs.get("seconds", default_duration) if marker else default_duration
+            unit = units[key] = ScheduleUnit(key[0], duration, unit_resources(item), key[1])
+            if expected_duration is not None:
+                unit.duration = expected_duration(unit.key, duration)
+        unit.items.append(item)
+    return list(units.values())
+
+
+def build_shards(units, testbeds):
+    """Longest processing time first: the longest unit goes to the least loaded testbed which can run it."""
+    for unit in sorted(units, key=lambda unit: (-unit.duration, unit.key)):
+        candidates = [testbed for testbed in testbeds if testbed.can_run(unit)]
+        if not candidates:
+            log.warning(f"No testbed provides {sorted(unit.resources)} required by {unit.key}, skipping it")
+            continue
+        min(candidates, key=lambda testbed: (testbed.load, testbed.name)).add(unit)
+    return testbeds
+
+
+def parse_testbeds(shards, testbed_names):
+    testbeds = []
+    for spec in testbed_names or []:
+        name, _, capabilities = spec.partition(":")
+        testbeds.append(Testbed(name, set(capabilities.split(",")) if capabilities else None))
+    testbeds.extend(Testbed(f"testbed{index}") for index in range(len(testbeds), shards))
+    return testbeds
+
+
+def selection(unit):
+    """Node ids selecting the unit, the items themselves when another value of its session params may run elsewhere."""
+    return [item.nodeid for item in unit.items] if unit.params else [unit.nodeid]
+
+
+def write_shard_plan(testbeds, directory):
+    os.makedirs(directory, exist_ok=True)
+    plan = {}
+    for testbed in testbeds:
+        with open(os.path.join(directory, f"shard_{testbed.name}.txt"), "w") as selection_file:
+            for unit in sorted(testbed.units, key=lambda u: u.key):
+                selection_file.writelines(f"{nodeid}\n" for nodeid in selection(unit))
+        plan[testbed.name] = {"estimated_duration": testbed.load, "tests": [unit.key for unit in testbed.units]}
+    with open(os.path.join(directory, "shard_plan.json"), "w") as plan_file:
+        json.dump(plan, plan_file, indent=2)
+    return plan
+
+
+def add_sharding_options(parser):
+    group = parser.getgroup("sharding", "split the suite across testbeds by duration markers")
+    group.addoption("--shards", type=int, default=0, help="Number of testbeds to split the suite across")
+    group.addoption("--shard-index", type=int, default=None, help="Run only the shard of this testbed (0 based)")
+    group.addoption("--shard-plan-dir", default=None, help="Write one test selection file per testbed to this dir")
+    group.addoption(
+        "--shard-testbed",
+        action="append",
+        default=[],
+        help="Testbed name with optional resources, e.g. tb1:switch,pod,client,client:eth. Repeat per testbed",
+    )
+    group.addoption(
+        "--shard-default-duration",
+        type=int,
+        default=DEFAULT_DURATION,
+        help="Duration in seconds assumed for tests without a duration marker",
+    )
+
+
+class ShardScheduler:
+    def __init__(self, config):
+        self.config = config
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, session, config, items):
+        shards = max(config.getoption("shards"), len(config.getoption("shard_testbed")))
+        # Measured class durations, when the durations plugin is active and --measured-durations is given
+        durations = config.pluginmanager.get_plugin("durations")
+        expected_duration = durations.expected_duration if durations else None
+        units = get_units(items, config.getoption("shard_default_duration"), expected_duration)
+        testbeds = build_shards(units, parse_testbeds(shards, config.getoption("shard_testbed")))
+        total = sum(unit.duration for unit in units)
+        for index, testbed in enumerate(testbeds):
+            log.info(f"Shard {index} ({testbed.name}): {len(testbed.units)} classes, {testbed.load / 60:.1f} min")
+        log.info(f"Total {total / 60:.1f} min, ideal split {total / len(testbeds) / 60:.1f} min per testbed")
+        if config.getoption("shard_plan_dir"):
+            write_shard_plan(testbeds, config.getoption("shard_plan_dir"))
+        shard_index = config.getoption("shard_index")
+        if shard_index is None:
+            return
+        assert 0 <= shard_index < len(testbeds), f"Invalid shard index: {shard_index}, shards: {len(testbeds)}"
+        selected_ids = {id(item) for unit in testbeds[shard_index].units for item in unit.items}
+        selected = [item for item in items if id(item) in selected_ids]
+        deselected = [item for item in items if id(item) not in selected_ids]
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
@@ -0,0 +1,378 @@
+import contextlib
+import inspect
+import json
+import os
+import threading
+import time
+import traceback
+from unittest import mock
+from lib_testbed.generic.util.logger import log
+
+SUITE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Wall clock reference which stays real while time.time() is patched
+time_real = time.perf_counter
+
+
+class VirtualClock:
+    """Replaces time.time() and time.sleep(), so sleeping only moves the clock forward."""
+
+    def __init__(self, start=1_700_000_000.0):
+        self.now = start
+        self.start = start
+        self.events = {}
+        self.lock = threading.Lock()
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.advance(seconds)
+
+    def advance(self, seconds):
+        with self.lock:
+            self.now += max(seconds, 0)
+
+    def mark(self, event):
+        self.events[event] = self.now
+
+    def since(self, event):
+        return self.now - self.events[event] if event in self.events else None
+
+    @property
+    def elapsed(self):
+        return self.now - self.start
+
+    @contextlib.contextmanager
+    def patch(self):
+        with mock.patch.object(time, "time", self.time), mock.patch.object(time, "sleep", self.sleep):
+            yield self
+
+
+def sequence(*values):
+    """Scripted response returning the values one by one, the last one repeats."""
+    remaining = list(values)
+
+    def respond(*_args, **_kwargs):
+        return remaining.pop(0) if len(remaining) > 1 else remaining[0]
+
+    return respond
+
+
+def after_event(clock, event, seconds, value, before=None):
+    """Scripted response which becomes `value` once `seconds` passed since `event` was marked on the clock."""
+
+    def respond(*_args, **_kwargs):
+        since = clock.since(event)
+        return value if since is not None and since >= seconds else before
+
+    return respond
+
+
+class FakeDevice:
+    """Testbed object double: every call is recorded, costs `latency` virtual seconds and returns the script."""
+
+    def __init__(self, clock, nickname="", latency=0.0, **attributes):
+        self._clock = clock
+        self._nickname = nickname
+        self._latency = latency
+        self._scripts = {}
+        self.calls = []
+        self.nickname = nickname
+        self.__dict__.update(attributes)
+
+    def script(self, method, returns=None, latency=None, raises=None):
+        self._scripts[method] = (returns, latency, raises)
+        return self
+
+    def defaults(self):
+        return {"get_nickname": self._nickname}
+
+    def call_count(self, method):
+        return sum(1 for call in self.calls if call[0] == method)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        returns, latency, raises = self._scripts.get(name, (self.defaults().get(name), None, None))
+
+        def method(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            self._clock.advance(self._latency if latency is None else latency)
+            self.on_call(name, args, kwargs)
+            if raises:
+                raise raises
+            return returns(*args, **kwargs) if callable(returns) else returns
+
+        return method
+
+    def on_call(self, name, args, kwargs):
+        pass
+
+
+class FakePod(FakeDevice):
+    def __init__(self, clock, nickname, serial, role="leaf", latency=0.1, **attributes):
+        super().__init__(clock, nickname, latency, **attributes)
+        self.serial = serial
+        self.lib = Namespace(device=Namespace(config={"role": role, "id": serial}))
+
+    def defaults(self):
+        return dict(
+            super().defaults(),
+            get_serial_number=self.serial,
+            wait_eth_connection_ready=True,
+            poll_pod_sanity=0,
+            get_ovsh_table="[]",
+            run="",
+            run_raw=[0, "", ""],
+        )
+
+    def on_call(self, name, args, kwargs):
+        if name == "reboot":
+            self._clock.mark(f"reboot:{self._nickname}")
+
+
+class FakePodGroup(FakeDevice):
+    def __init__(self, clock, pods, latency=0.0):
+        super().__init__(clock, "all", latency)
+        self.pods = pods
+
+    def defaults(self):
+        return dict(
+            super().defaults(),
+            get_nicknames=[pod._nickname for pod in self.pods],
+            get_devices=list(self.pods),
+            poll_pods_sanity=0,
+        )
+
+
+class FakeClient(FakeDevice):
+    def __init__(self, clock, nickname, iface="eth0", mac="02:00:00:00:00:01", ip="192.168.40.10", latency=0.2):
+        super().__init__(clock, nickname, latency, mac=mac, ifname=iface)
+        self.iface = iface
+        self.ip = ip
+
+    def defaults(self):
+        return dict(
+            super().defaults(),
+            get_eth_iface=self.iface,
+            get_wlan_iface=self.iface,
+            get_mac=self.mac,
+            refresh_ip_address=True,
+            ping_check=True,
+            connect=True,
+            run=f"    inet {self.ip}/24 brd 192.168.40.255 scope global {self.iface}",
+            run_raw=self.run_raw_output,
+            get_eth_info={"eth": {self.iface: {"ip": self.ip}}},
+        )
+
+    def run_raw_output(self, command, *_args, **_kwargs):
+        if command.startswith("ip -j addr show"):
+            return [0, json.dumps([self.link()]), ""]
+        if command.startswith("ping "):
+            return [0, self.ping_output(command.split()[-1]), ""]
+        if command.startswith("cat /sys/class/net/"):
+            # Carrier of a link which is up
+            return [0, "1\n", ""]
+        return [0, "", ""]
+
+    @staticmethod
+    def ping_output(target, count=3):
+        """iputils output of a ping answered with a constant 1 ms round trip time."""
+        replies = "".join(
+            f"64 bytes from {target}: icmp_seq={sequence} ttl=64 time=1.00 ms\n" for sequence in range(1, count + 1)
+        )
+        return (
+            f"PING {target} ({target}) 56(84) bytes of data.\n{replies}\n--- {target} ping statistics ---\n"
+            f"{count} packets transmitted, {count} received, 0% packet loss, time {count}ms\n"
+            "rtt min/avg/max/mdev = 1.000/1.000/1.000/0.000 ms\n"
+        )
+
+    def link(self):
+        """`ip -j addr show` entry of the client interface, its address is the one reported to the NOC."""
+        address = {"family": "inet", "local": self.ip, "prefixlen": 24, "scope": "global"}
+        return {
+            "ifname": self.iface,
+            "address": self.mac,
+            "operstate": "UP",
+            "flags": ["BROADCAST", "MULTICAST", "UP", "LOWER_UP"],
+            "addr_info": [address],
+        }
+
+
+class FakeSwitchApi(FakeDevice):
+    def __init__(self, clock, latency=0.5):
+        super().__init__(clock, "switch", latency)
+        # {client name: pod name} of the connected eth clients
+        self.connections = {}
+
+    def defaults(self):
+        return dict(super().defaults(), get_all_switch_aliases=["port1", "port2"], get_wan_port="port1")
+
+    def on_call(self, name, args, kwargs):
+        if name in ("connect_eth_client", "disconnect_eth_client") and len(args) >= 2:
+            self._clock.mark(f"{name.split('_')[0]}:{args[1]}")
+            if name == "connect_eth_client":
+                self.connections[args[1]] = args[0]
+            else:
+                self.connections.pop(args[1], None)
+
+
+class FakeCloudApi(FakeDevice):
+    def __init__(self, clock, label, latency=0.3):
+        super().__init__(clock, label, latency, lid="simulated-location", cid="simulated-customer")
+
+    def defaults(self):
+        return dict(
+            super().defaults(),
+            check_pods_connected=True,
+            check_pods_disconnected=True,
+            get_network_mode="bridge",
+            get_clients_details={},
+        )
+
+    def on_call(self, name, args, kwargs):
+        self._clock.mark(f"cloud:{name}")
+
+
+class Namespace:
+    def __init__(self, **attributes):
+        self.__dict__.update(attributes)
+
+
+class SimulatedTestbed:
+    """Fake pod, pods, client, switch and cloud objects sharing one virtual clock."""
+
+    def __init__(self, pods=("gw", "leaf"), clients=("eth",), clock=None):
+        self.clock = clock or VirtualClock()
+        pod_objects = {
+            role: FakePod(self.clock, f"pod_{role}", f"SERIAL{index:04d}", role="gw" if index == 0 else "leaf")
+            for index, role in enumerate(pods)
+        }
+        client_objects = {
+            name: FakeClient(self.clock, name, mac=f"02:00:00:00:00:{index + 1:02x}", ip=f"192.168.40.{index + 10}")
+            for index, name in enumerate(clients)
+        }
+        self.pod = Namespace(**pod_objects)
+        self.pods = Namespace(all=FakePodGroup(self.clock, list(pod_objects.values())))
+        self.client = Namespace(**client_objects)
+        self.switch = Namespace(api=FakeSwitchApi(self.clock))
+        self.cloud = Namespace(user=FakeCloudApi(self.clock, "user"), admin=FakeCloudApi(self.clock, "admin"))
+        self.cloud.user.script("get_clients_details", returns=self.client_details)
+        capabilities = {"kpi": {"cloud_gw_onboard_time": 120, "cloud_leaf_onboard_time": 180}}
+        self.tb_config = {
+            "Nodes": [
+                {"name": pod._nickname, "id": pod.serial, "switch": {}, "capabilities": capabilities}
+                for pod in pod_objects.values()
+            ],
+            "Networks": [{"ssid": "simulated", "key": "simulated-key"}],
+            "wifi_check": {"ipaddr": "192.168.100.1"},
+        }
+        self.util = Namespace()
+
+    def client_details(self, mac, *_args, **_kwargs):
+        """NOC view of a client: connected with its address while the switch connects it to a pod."""
+        client = next((client for client in vars(self.client).values() if client.mac == mac), None)
+        if client is None:
+            return {}
+        pod_name = self.switch.api.connections.get(client._nickname)
+        if pod_name is None:
+            return {"mac": mac, "conn_state": "disconnected"}
+        pod = next((pod for pod in vars(self.pod).values() if pod._nickname == pod_name), None)
+        return {
+            "mac": mac,
+            "conn_state": "connected",
+            "ip": client.ip,
+            "leaf_to_root": [{"id": pod.serial if pod else pod_name}],
+        }
+
+    def attributes(self):
+        return dict(
+            pod=self.pod,
+            pods=self.pods,
+            client=self.client,
+            switch=self.switch,
+            cloud=self.cloud,
+            tb_config=self.tb_config,
+            util=self.util,
+        )
+
+
+def is_suite_class(klass):
+    try:
+        return inspect.getsourcefile(klass).startswith(SUITE_ROOT)
+    except TypeError:
+        return False
+
+
+def class_markers(test_cls):
+    return [mark for klass in reversed(test_cls.__mro__) for mark in klass.__dict__.get("pytestmark", [])]
+
+
+def test_method_names(test_cls):
+    names = []
+    for klass in reversed(test_cls.__mro__):
+        names.extend(name for name in klass.__dict__ if name.startswith("test") and name not in names)
+    return names
+
+
+class SimulatedResult:
+    def __init__(self, name, passed, virtual_time, real_time, error=None):
+        self.name = name
+        self.passed = passed
+        self.virtual_time = virtual_time
+        self.real_time = real_time
+        self.error = error
+
+    def __repr__(self):
+        outcome = "passed" if self.passed else f"failed: {self.error}"
+        return f"<{self.name} {outcome}, {self.virtual_time:.1f}s virtual, {self.real_time * 1000:.1f}ms real>"
+
+
+def simulated_case(test_cls, testbed):
+    """Subclass of a suite class bound to the simulated testbed instead of the framework's BaseCase setup."""
+
+    @contextlib.contextmanager
+    def safe_context(klass, cls, method_name):
+        # Call the parent setup/teardown defined in this suite, never the framework's one
+        for parent in klass.__mro__[1:]:
+            if method_name in parent.__dict__ and is_suite_class(parent):
+                getattr(super(klass, cls), method_name)()
+                break
+        yield
+
+    attributes = dict(testbed.attributes(), all_markers=class_markers(test_cls))
+    attributes["SafeSetup"] = classmethod(lambda cls, klass, _cls: safe_context(klass, cls, "setup_class"))
+    attributes["SafeTeardown"] = classmethod(lambda cls, klass, _cls: safe_context(klass, cls, "teardown_class"))
+    return type(f"Simulated{test_cls.__name__}", (test_cls,), attributes)
+
+
+def run_simulated(test_cls, testbed, **params):
+    """Run setup_class, the test methods in order (stopping at the first failure) and teardown_class."""
+    case = simulated_case(test_cls, testbed)
+    results = []
+    with testbed.clock.patch():
+        steps = [("setup_class", case.setup_class)]
+        instance = case()
+        for name in test_method_names(test_cls):
+            method = getattr(instance, name)
+            arguments = {arg: params[arg] for arg in inspect.signature(method).parameters if arg in params}
+            steps.append((name, lambda method=method, arguments=arguments: method(**arguments)))
+        for name, step in steps:
+            virtual_start, real_start = testbed.clock.now, time_real()
+            try:
+                step()
+                results.append(SimulatedResult(name, True, testbed.clock.now - virtual_start, time_real() - real_start))
+            except Exception as err:
+                log.debug(traceback.format_exc())
+                results.append(
+                    SimulatedResult(name, False, testbed.clock.now - virtual_start, time_real() - real_start, err)
+                )
+                break
+        virtual_start, real_start = testbed.clock.now, time_real()
+        try:
+            case.teardown_class()
+            results.append(SimulatedResult("teardown_class", True, testbed.clock.now - virtual_start, 0.0))
+        except Exception as err:
+            results.append(SimulatedResult("teardown_class", False, testbed.clock.now - virtual_start, 0.0, err))
+        results[-1].real_time = time_real() - real_start
+    return results
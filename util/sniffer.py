@@ -0,0 +1,98 @@
+import threading
+from lib_testbed.generic.util.logger import log
+from tests.client_connectivity.util.pcap import PcapParser
+from tests.client_connectivity.util.remote_tail import RemoteFileTail
+
+# tcpdump names of the 802.11 management subtypes, keyed by wlan.fc.type_subtype
+MGMT_SUBTYPE_NAMES = {
+    0x00: "assoc-req",
+    0x01: "assoc-resp",
+    0x02: "reassoc-req",
+    0x03: "reassoc-resp",
+    0x04: "probe-req",
+    0x05: "probe-resp",
+    0x08: "beacon",
+    0x0A: "disassoc",
+    0x0B: "auth",
+    0x0C: "deauth",
+}
+
+
+def build_bpf_filter(sta_mac, subtypes):
+    subtype_filter = " or ".join(f"subtype {MGMT_SUBTYPE_NAMES[subtype]}" for subtype in subtypes)
+    return f"type mgt and ({subtype_filter}) and wlan addr1 {sta_mac.lower()}"
+
+
+class LiveCapture:
+    """Runs a BPF filtered tcpdump on a sniffer client and streams the captured frames to a local consumer."""
+
+    def __init__(self, client, ifname, remote_path, bpf_filter, predicate, local_path=None, poll_interval=2):
+        self.client = client
+        self.ifname = ifname
+        self.remote_path = remote_path
+        self.bpf_filter = bpf_filter
+        self.predicate = predicate
+        self.local_path = local_path
+        self.poll_interval = poll_interval
+        self.parser = PcapParser()
+        self.tail = RemoteFileTail(client, remote_path)
+        self.matches = []
+        self.frames = 0
+        self.bytes_received = 0
+        self.matched = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def first_match(self):
+        return self.matches[0] if self.matches else None
+
+    def start(self):
+        log.info(f"Starting capture on {self.client.nickname} with filter: {self.bpf_filter}")
+        self.client.run(
+            f"tcpdump -U -i {self.ifname} -w {self.remote_path} '{self.bpf_filter}'"
+            f" > {self.remote_path}.log 2>&1 &"
+        )
+        if self.local_path:
+            open(self.local_path, "wb").close()
+        self._thread = threading.Thread(target=self._poll_loop, name=f"capture-{self.client.nickname}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._stop.is_set():
+            return self.matches
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.client.run("killall tcpdump", skip_exception=True)
+        # Flush whatever tcpdump wrote between the last poll and its exit
+        self.poll()
+        log.info(
+            f"Capture stopped: {self.frames} frames, {self.bytes_received} bytes streamed,"
+            f" {len(self.matches)} matching frames"
+        )
+        return self.matches
+
+    def poll(self):
+        chunk = self.tail.read_new()
+        if not chunk:
+            return []
+        self.bytes_received += len(chunk)
+        if self.local_path:
+            with open(self.local_path, "ab") as local_file:
+                local_file.write(chunk)
+        frames = self.parser.feed(chunk)
+        self.frames += len(frames)
+        matches = [frame for frame in frames if self.predicate(frame)]
+        if matches:
+            log.warning(f"Capture matched frames: {matches}")
+            self.matches.extend(matches)
+            self.matched.set()
+        return matches
+
+    def _poll_loop(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll()
+            except Exception as err:
+                log.error(f"Capture polling on {self.client.nickname} failed: {err!r}")
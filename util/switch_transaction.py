@@ -0,0 +1,158 @@
+import time
+from lib_testbed.generic.util.logger import log
+from tests.client_connectivity.util.cloud_cache import invalidate_cloud_caches
+from tests.client_connectivity.util.ifaddr import invalidate_interfaces
+from tests.client_connectivity.util.wait import wait_until
+
+DOWN = "down"
+UP = "up"
+LINK_UP_TIMEOUT = 60
+
+
+def switch_changed():
+    """Drop client state cached across a port change, call it after every switch reconfiguration."""
+    invalidate_interfaces()
+    # Pods report the new links to the cloud, e.g. the eth clients and the backhaul type
+    invalidate_cloud_caches("after a switch change")
+
+
+def link_up(device, iface):
+    """Carrier of `iface` on a client or pod, as the kernel sees it."""
+    result = device.run_raw(f"cat /sys/class/net/{iface}/carrier", skip_exception=True)
+    return result[0] == 0 and result[1].strip() == "1"
+
+
+class SwitchChange:
+    def __init__(self, phase, label, method, args, kwargs, undo, link=None):
+        self.phase = phase
+        self.label = label
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+        # (method, args, kwargs) restoring the previous state, None if the change can not be undone
+        self.undo = undo
+        # (device, iface) whose carrier comes up with an up change, None if nothing can be polled
+        self.link = link
+
+    def apply(self, api):
+        return getattr(api, self.method)(*self.args, **self.kwargs)
+
+    def __repr__(self):
+        return f"<SwitchChange {self.phase} {self.label}>"
+
+
+class SwitchTransactionFailed(Exception):
+    def __init__(self, change, error, rolled_back):
+        super().__init__(f"{change.label} failed: {error!r}, rolled back: {rolled_back}")
+        self.change = change
+        self.error = error
+        self.rolled_back = rolled_back
+
+
+class SwitchTransaction:
+    """Port changes applied in one go, all ports down first and then all up, a failure rolls back applied changes."""
+
+    def __init__(self, api):
+        self.api = api
+        self.changes = []
+        # {change label: seconds from the commit start until the switch call of an up change returned}
+        self.call_done_at = {}
+        # {change label: seconds from the commit start until the carrier of the up change link was seen}
+        self.up_at = {}
+
+    def add(self, phase, label, method, *args, undo=None, link=None, **kwargs):
+        self.changes.append(SwitchChange(phase, label, method, args, kwargs, undo, link))
+        return self
+
+    def disconnect(self, pod_name, client_name, port=None):
+        """`port` is the pod port the client is connected to now, a rollback connects it there again."""
+        label = f"disconnect {client_name} from {pod_name}"
+        undo = ("connect_eth_client", (pod_name, client_name), {"connect_port": port} if port else {})
+        return self.add(DOWN, label, "disconnect_eth_client", pod_name, client_name, undo=undo)
+
+    def connect(self, pod_name, client_name, port=None, link=None):
+        """`link` is the (client, iface) polled for carrier to time when the port came up."""
+        label = f"connect {client_name} to {pod_name}" + (f" {port}" if port else "")
+        kwargs = {"connect_port": port} if port else {}
+        undo = ("disconnect_eth_client", (pod_name, client_name), {})
+        return self.add(UP, label, "connect_eth_client", pod_name, client_name, undo=undo, link=link, **kwargs)
+
+    def disable_port(self, port):
+        return self.add(DOWN, f"disable {port}", "disable_port", port, undo=("enable_port", (port,), {}))
+
+    def enable_port(self, port, link=None):
+        return self.add(UP, f"enable {port}", "enable_port", port, undo=("disable_port", (port,), {}), link=link)
+
+    def commit(self, before_up=None, link_timeout=LINK_UP_TIMEOUT):
+        """Apply all changes, `before_up()` runs between the down and up changes, e.g. a loop status check.
+
+        Returns {change label: seconds until its port came up} of the up changes with a link to poll.
+        """
+        start_time = time.time()
+        applied = []
+        ordered = [change for change in self.changes if change.phase == DOWN]
+        ordered += [change for change in self.changes if change.phase == UP]
+        log.info(f"Applying {len(ordered)} switch changes: {[change.label for change in ordered]}")
+        try:
+            for change in ordered:
+                if change.phase == UP and before_up is not None:
+                    try:
+                        before_up()
+                    except Exception as err:
+                        rolled_back = self.rollback(applied)
+                        log.error(f"Check before the up changes failed: {err!r}, rolled back: {rolled_back}")
+                        raise
+                    before_up = None
+                try:
+                    change.apply(self.api)
+                except Exception as err:
+                    raise SwitchTransactionFailed(change, err, self.rollback(applied))
+                applied.append(change)
+                if change.phase == UP:
+                    self.call_done_at[change.label] = time.time() - start_time
+        finally:
+            # Ports changed even when a change failed and got rolled back
+            if applied:
+                switch_changed()
+        self.changes = []
+        call_times = ", ".join(f"{label}: {seconds:.1f}s" for label, seconds in self.call_done_at.items())
+        log.info(
+            f"Switch changes applied in {time.time() - start_time:.1f}s,"
+            f" switch calls of the up changes returned after {call_times or '-'}"
+        )
+        self.wait_links_up(ordered, start_time, link_timeout)
+        return self.up_at
+
+    def wait_links_up(self, changes, start_time, timeout):
+        pending = {change.label: change.link for change in changes if change.phase == UP and change.link}
+        if not pending:
+            return
+
+        def poll():
+            for label, (device, iface) in list(pending.items()):
+                if link_up(device, iface):
+                    self.up_at[label] = time.time() - start_time
+                    del pending[label]
+            return pending
+
+        # Short intervals, the poll time is the resolution of the up times
+        links_wait = wait_until(
+            poll, lambda links: not links, timeout=timeout, name="switch ports up", initial_interval=0.2, max_interval=1
+        )
+        up_times = ", ".join(f"{label}: {seconds:.1f}s" for label, seconds in self.up_at.items())
+        log.info(f"Ports came up after {up_times or '-'}")
+        if not links_wait:
+            log.error(f"No carrier after {timeout}s on: {list(pending)}")
+
+    def rollback(self, applied):
+        rolled_back = []
+        for change in reversed(applied):
+            if change.undo is None:
+                continue
+            method, args, kwargs = change.undo
+            try:
+                getattr(self.api, method)(*args, **kwargs)
+                rolled_back.append(change.label)
+            except Exception as err:
+                log.error(f"Can not roll back {change.label}: {err!r}")
+        return rolled_back
@@ -0,0 +1,221 @@
+import json
+import re
+import pytest
+from lib_testbed.generic.util.logger import log
+from tests.client_connectivity.util.ifaddr import get_client_ip
+from tests.client_connectivity.util.kpi import format_table
+
+IPERF_PORT = 5201
+DEFAULT_DURATION = 10
+# Offered load of the UDP run, the achieved rate and loss show where the link gives up
+DEFAULT_UDP_BANDWIDTH = "200M"
+PROTOCOLS = ("tcp", "udp")
+
+
+class ThroughputSettings:
+    def __init__(self):
+        self.enabled = False
+        self.duration = DEFAULT_DURATION
+        self.udp_bandwidth = DEFAULT_UDP_BANDWIDTH
+
+
+throughput_settings = ThroughputSettings()
+
+
+class ThroughputResult:
+    def __init__(self, protocol, goodput=None, retransmits=None, rtt=None, jitter=None, loss=None, error=None):
+        self.protocol = protocol
+        # Mbit/s received by the server, retransmitted segments, mean RTT and jitter in ms, lost datagrams in %
+        self.goodput = goodput
+        self.retransmits = retransmits
+        self.rtt = rtt
+        self.jitter = jitter
+        self.loss = loss
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None and self.goodput is not None
+
+    @classmethod
+    def parse(cls, protocol, output):
+        """Result of an `iperf3 --json` client run."""
+        try:
+            report = json.loads(output)
+        except ValueError:
+            return cls(protocol, error=f"no iperf3 report: {output.strip()[:200]!r}")
+        if report.get("error"):
+            return cls(protocol, error=report["error"])
+        end = report.get("end", {})
+        if protocol == "udp":
+            summary = end.get("sum", {})
+            return cls(
+                protocol,
+                goodput=summary.get("bits_per_second", 0) / 1e6,
+                jitter=summary.get("jitter_ms"),
+                loss=summary.get("lost_percent"),
+            )
+        senders = [stream["sender"] for stream in end.get("streams", []) if "mean_rtt" in stream.get("sender", {})]
+        return cls(
+            protocol,
+            goodput=end.get("sum_received", {}).get("bits_per_second", 0) / 1e6,
+            retransmits=end.get("sum_sent", {}).get("retransmits"),
+            rtt=sum(sender["mean_rtt"] for sender in senders) / len(senders) / 1000 if senders else None,
+        )
+
+    def __repr__(self):
+        if not self.ok:
+            return f"<ThroughputResult {self.protocol} error: {self.error}>"
+        return f"<ThroughputResult {self.protocol} {self.goodput:.1f} Mbit/s>"
+
+
+class Iperf3Server:
+    """iperf3 server daemon on the testbed host, the stand-in bulk transfer peer of the clients."""
+
+    def __init__(self, host, port=IPERF_PORT):
+        self.host = host
+        self.port = port
+        self.pid_file = f"/tmp/iperf3_{port}.pid"
+        self.addresses = {}
+
+    def start(self):
+        result = self.host.run_raw(
+            f"iperf3 --server --daemon --port {self.port} --pidfile {self.pid_file} 2>&1 || true", skip_exception=True
+        )
+        log.info(f"Started iperf3 server on {self.host.get_nickname()}:{self.port} {result[1].strip()}")
+        return self
+
+    def stop(self):
+        self.host.run_raw(f"kill $(cat {self.pid_file}) 2>/dev/null; rm -f {self.pid_file}", skip_exception=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_exc_info):
+        self.stop()
+
+    def address_for(self, client_ip):
+        """Source address of the host route towards the client, the address the client reaches the host on."""
+        if client_ip not in self.addresses:
+            result = self.host.run_raw(f"ip -o route get {client_ip}", skip_exception=True)
+            match = re.search(r"\bsrc (\S+)", result[1])
+            assert match, f"Can not find a route from {self.host.get_nickname()} to {client_ip}: {result}"
+            self.addresses[client_ip] = match.group(1)
+        return self.addresses[client_ip]
+
+
+def run_transfer(client, server_address, protocol="tcp", duration=DEFAULT_DURATION, port=IPERF_PORT, bandwidth=None):
+    options = f"--udp --bandwidth {bandwidth or DEFAULT_UDP_BANDWIDTH}" if protocol == "udp" else ""
+    command = f"iperf3 --client {server_address} --port {port} --time {duration} --json {options}"
+    result = client.run_raw(command, timeout=duration + 30, skip_exception=True)
+    # iperf3 reports failures in the JSON document as well, with a non zero exit code
+    return ThroughputResult.parse(protocol, result[1] or result[2])
+
+
+class ThroughputMatrix:
+    """TCP and UDP transfer results per (node, band, BSSID), in a stable layout to compare firmware builds."""
+
+    def __init__(self, server, duration=DEFAULT_DURATION, udp_bandwidth=DEFAULT_UDP_BANDWIDTH):
+        self.server = server
+        self.duration = duration
+        self.udp_bandwidth = udp_bandwidth
+        # {(node, band, bssid): {protocol: ThroughputResult}}
+        self.results = {}
+
+    def measure(self, client, node, band, bssid):
+        client_ip = get_client_ip(client, client.ifname, refresh=True)
+        assert client_ip, f"{client.get_nickname()} has no address on {client.ifname}"
+        server_address = self.server.address_for(client_ip)
+        results = {}
+        for protocol in PROTOCOLS:
+            log.info(f"Running {self.duration}s {protocol.upper()} transfer from {client_ip} to {server_address}")
+            results[protocol] = run_transfer(
+                client,
+                server_address,
+                protocol,
+                duration=self.duration,
+                port=self.server.port,
+                bandwidth=self.udp_bandwidth,
+            )
+            log.info(f"{node} {band} {bssid}: {results[protocol]}")
+        self.results[(node, band, bssid)] = results
+        return results
+
+    def failed(self):
+        return {
+            key: {protocol: result.error for protocol, result in results.items() if not result.ok}
+            for key, results in self.results.items()
+            if not all(result.ok for result in results.values())
+        }
+
+    def table(self):
+        def cell(value, fmt="{:.1f}"):
+            return fmt.format(value) if value is not None else "-"
+
+        header = ["node", "band", "bssid", "tcp Mbit/s", "retransmits", "rtt ms", "udp Mbit/s", "jitter ms", "loss %"]
+        rows = []
+        for (node, band, bssid), results in sorted(self.results.items(), key=lambda item: [str(k) for k in item[0]]):
+            tcp, udp = results["tcp"], results["udp"]
+            rows.append(
+                [node, band, bssid]
+                + [cell(tcp.goodput), cell(tcp.retransmits, "{}"), cell(tcp.rtt, "{:.2f}")]
+                + [cell(udp.goodput), cell(udp.jitter, "{:.2f}"), cell(udp.loss)]
+            )
+        return format_table(header, rows)
+
+    def record_kpi(self, kpi):
+        for (node, band, bssid), results in self.results.items():
+            labels = {"node": node, "band": band, "bssid": bssid}
+            tcp, udp = results["tcp"], results["udp"]
+            if tcp.ok:
+                kpi.record("tcp_goodput", tcp.goodput, unit="Mbit/s", **labels)
+                if tcp.retransmits is not None:
+                    kpi.record("tcp_retransmits", tcp.retransmits, unit="segments", **labels)
+                if tcp.rtt is not None:
+                    kpi.record("tcp_rtt", tcp.rtt, unit="ms", **labels)
+            if udp.ok:
+                kpi.record("udp_goodput", udp.goodput, unit="Mbit/s", **labels)
+                if udp.jitter is not None:
+                    kpi.record("udp_jitter", udp.jitter, unit="ms", **labels)
+                if udp.loss is not None:
+                    kpi.record("udp_loss", udp.loss, unit="%", **labels)
+
+
+def add_throughput_options(parser):
+    group = parser.getgroup("throughput", "per BSSID throughput matrix")
+    group.addoption(
+        "--throughput",
+        action="store_true",
+        default=False,
+        help="Run TCP and UDP bulk transfers against an iperf3 server on the testbed host for every connected BSSID",
+    )
+    group.addoption(
+        "--throughput-duration",
+        type=int,
+        default=DEFAULT_DURATION,
+        help="Seconds of each bulk transfer of the throughput matrix",
+    )
+    group.addoption(
+        "--throughput-udp-bandwidth",
+        default=DEFAULT_UDP_BANDWIDTH,
+        help="Offered load of the UDP transfer of the throughput matrix, iperf3 --bandwidth format",
+    )
+
+
+def configure_throughput(config):
+    throughput_settings.enabled = config.getoption("throughput")
+    throughput_settings.duration = config.getoption("throughput_duration")
+    throughput_settings.udp_bandwidth = config.getoption("throughput_udp_bandwidth")
+
+
+def add_throughput_host(items):
+    """Request the host client for classes with `throughput_host = True`, only when --throughput is enabled."""
+    if not throughput_settings.enabled:
+        return
+    marked = set()
+    for item in items:
+        class_node = item.getparent(pytest.Class)
+        if class_node is None or class_node in marked or not getattr(item.cls, "throughput_host", False):
+            continue
+        class_node.add_marker(pytest.mark.opensync_client(name="host", nickname="host"))
+        marked.add(class_node)
@@ -0,0 +1,286 @@
+import contextlib
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import pytest
+from lib_testbed.generic.util.logger import log
+from tests.client_connectivity.util.kpi import format_table
+
+TRACE_FILE_NAME = "trace.json"
+DEFAULT_TRACE_DIR = "/tmp/automation/trace/"
+# Testbed objects BaseCase hands to the test classes
+TRACED_ATTRIBUTES = ("pod", "pods", "client", "switch", "cloud")
+# Attribute values which are data, not testbed objects to descend into
+PLAIN_TYPES = (str, bytes, int, float, bool, list, tuple, dict, set, type(None))
+MAX_ARG_LENGTH = 120
+# Arguments whose name contains one of these never leave the process, e.g. client.wifi.connect(psk=...)
+SECRET_ARG_NAMES = ("psk", "password", "passwd", "passphrase", "key", "token", "secret")
+REDACTED = "<redacted>"
+PHASE_CATEGORY = "pytest"
+TOP_SINKS = 10
+
+
+class Span:
+    def __init__(self, name, category, start, duration, thread_id, depth, owner, args):
+        self.name = name
+        self.category = category
+        self.start = start
+        self.duration = duration
+        self.thread_id = thread_id
+        self.depth = depth
+        self.owner = owner
+        self.args = args
+
+    def to_trace_event(self):
+        return {
+            "name": self.name,
+            "cat": self.category,
+            "ph": "X",
+            "ts": round(self.start * 1e6),
+            "dur": round(self.duration * 1e6),
+            "pid": 1,
+            "tid": self.thread_id,
+            "args": self.args,
+        }
+
+
+def format_arg(value):
+    text = repr(value)
+    return text if len(text) <= MAX_ARG_LENGTH else f"{text[:MAX_ARG_LENGTH]}..."
+
+
+def format_call_args(function, args, kwargs):
+    """{argument name: repr} of a call, positional arguments get their parameter names so secrets are found."""
+    try:
+        signature = inspect.signature(function)
+        bound = signature.bind_partial(*args, **kwargs).arguments
+    except (TypeError, ValueError):
+        signature = None
+        bound = dict({f"arg{index}": arg for index, arg in enumerate(args)}, **kwargs)
+    named = {}
+    for name, value in bound.items():
+        kind = signature.parameters[name].kind if signature else None
+        if kind == inspect.Parameter.VAR_KEYWORD:
+            named.update(value)
+        elif kind == inspect.Parameter.VAR_POSITIONAL:
+            named.update({f"{name}{index}": arg for index, arg in enumerate(value)})
+        else:
+            named[name] = value
+    return {
+        name: REDACTED if any(secret in name.lower() for secret in SECRET_ARG_NAMES) else format_arg(value)
+        for name, value in named.items()
+    }
+
+
+class Tracer:
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans = []
+        self.owner = None
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        # Test code runs in this thread, spans of fan_out worker threads start at depth 0 of their own
+        self.main_thread = threading.get_ident()
+
+    @contextlib.contextmanager
+    def span(self, name, category, args, nested=True):
+        """Record the enclosed block, spans opened inside count as its children unless nested is False."""
+        depth = getattr(self.local, "depth", 0)
+        if nested:
+            self.local.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            yield args
+        except Exception as err:
+            args["error"] = format_arg(err)
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            self.local.depth = depth
+            span = Span(name, category, start - self.origin, duration, threading.get_ident(), depth, self.owner, args)
+            with self.lock:
+                self.spans.append(span)
+
+    def call(self, name, category, function, *args, **kwargs):
+        with self.span(name, category, format_call_args(function, args, kwargs)):
+            return function(*args, **kwargs)
+
+    def wrap(self, name, category, function):
+        @functools.wraps(function)
+        def traced(*args, **kwargs):
+            return self.call(name, category, function, *args, **kwargs)
+
+        return traced
+
+    def owner_spans(self, owner):
+        with self.lock:
+            return [span for span in self.spans if span.owner == owner]
+
+    def summary(self, owner):
+        """Busy time per category of the test thread, the overlapping busy time of worker threads, the top calls."""
+        spans = self.owner_spans(owner)
+        categories = {}
+        in_threads = 0.0
+        for span in spans:
+            if span.depth != 0:
+                continue
+            if span.thread_id != self.main_thread:
+                in_threads += span.duration
+                continue
+            categories[span.category] = categories.get(span.category, 0.0) + span.duration
+        names = {}
+        for span in spans:
+            if span.category != PHASE_CATEGORY:
+                count, total = names.get(span.name, (0, 0.0))
+                names[span.name] = (count + 1, total + span.duration)
+        top = sorted(names.items(), key=lambda item: item[1][1], reverse=True)[:TOP_SINKS]
+        return categories, in_threads, top
+
+    def summary_table(self, owner):
+        categories, in_threads, top = self.summary(owner)
+        phases = categories.pop(PHASE_CATEGORY, 0.0)
+        rows = [["test phases", "-", f"{phases:.1f}"]]
+        rows += [[category, "-", f"{total:.1f}"] for category, total in sorted(categories.items(), key=lambda i: -i[1])]
+        # Includes the time the test thread waited for fan_out threads
+        rows.append(["untraced", "-", f"{max(0.0, phases - sum(categories.values())):.1f}"])
+        rows.append(["in fan_out threads (overlapping)", "-", f"{in_threads:.1f}"])
+        rows += [[name, count, f"{total:.1f}"] for name, (count, total) in top]
+        return format_table(["category / call", "calls", "seconds"], rows)
+
+    def export(self, directory=None):
+        directory = directory or DEFAULT_TRACE_DIR
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, TRACE_FILE_NAME)
+        with self.lock:
+            events = [span.to_trace_event() for span in self.spans]
+        with open(path, "w") as trace_file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, trace_file)
+        log.info(f"Trace with {len(events)} spans saved to {path}, open it in chrome://tracing or Perfetto")
+        return path
+
+
+class TracingProxy:
+    """Stands in for a testbed object, records a span for each method call, also on nested objects."""
+
+    def __init__(self, target, path, tracer):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_path", path)
+        object.__setattr__(self, "_tracer", tracer)
+        object.__setattr__(self, "_children", {})
+
+    @property
+    def __class__(self):
+        # Keeps isinstance() checks of the framework working on traced objects
+        return type(object.__getattribute__(self, "_target"))
+
+    def __getattr__(self, name):
+        target = object.__getattribute__(self, "_target")
+        value = getattr(target, name)
+        if name.startswith("__") or isinstance(value, PLAIN_TYPES):
+            return value
+        path = f"{object.__getattribute__(self, '_path')}.{name}"
+        tracer = object.__getattribute__(self, "_tracer")
+        if callable(value):
+            return tracer.wrap(path, path.split(".")[0], value)
+        children = object.__getattribute__(self, "_children")
+        child = children.get(name)
+        if child is None or object.__getattribute__(child, "_target") is not value:
+            child = children[name] = TracingProxy(value, path, tracer)
+        return child
+
+    def __setattr__(self, name, value):
+        setattr(object.__getattribute__(self, "_target"), name, value)
+
+    def __iter__(self):
+        return iter(object.__getattribute__(self, "_target"))
+
+    def __len__(self):
+        return len(object.__getattribute__(self, "_target"))
+
+    def __bool__(self):
+        return bool(object.__getattribute__(self, "_target"))
+
+    def __repr__(self):
+        return repr(object.__getattribute__(self, "_target"))
+
+
+def add_tracing_options(parser):
+    group = parser.getgroup("tracing", "spans of testbed calls and sleeps")
+    group.addoption(
+        "--trace-calls",
+        action="store_true",
+        default=False,
+        help="Record a span per pod, pods, client, switch and cloud call and per time.sleep, export a Chrome trace",
+    )
+    group.addoption(
+        "--trace-dir",
+        default=None,
+        help=f"Directory of the trace file, the Allure results directory or {DEFAULT_TRACE_DIR} by default",
+    )
+
+
+class TracingPlugin:
+    """Wraps the testbed objects of each test class once its setup is done, and time.sleep for the whole session."""
+
+    def __init__(self, config):
+        self.config = config
+        self.tracer = Tracer()
+        self.sleep = time.sleep
+        self.wrapped = {}
+
+    def pytest_sessionstart(self, session):
+        time.sleep = self.tracer.wrap("time.sleep", "sleep", self.sleep)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_setup(self, item):
+        self.tracer.owner = item.cls.__name__ if item.cls else item.nodeid
+        with self.phase(item, "setup"):
+            yield
+        # Testbed objects are assigned during class setup, calls of the test steps and the class teardown are traced
+        if item.cls is not None:
+            self.wrap_class(item.cls)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        with self.phase(item, "call"):
+            yield
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_teardown(self, item, nextitem):
+        with self.phase(item, "teardown"):
+            yield
+        if item.cls is not None and (nextitem is None or nextitem.cls is not item.cls):
+            self.unwrap_class(item.cls)
+            log.info(f"Time sinks of {item.cls.__name__}:\n{self.tracer.summary_table(item.cls.__name__)}")
+
+    def phase(self, item, name):
+        # Test code spans stay outermost, phases only give the total time to compare them with
+        return self.tracer.span(f"{item.name} {name}", PHASE_CATEGORY, {"nodeid": item.nodeid}, nested=False)
+
+    def wrap_class(self, cls):
+        if cls in self.wrapped:
+            return
+        originals = {}
+        for name in TRACED_ATTRIBUTES:
+            value = getattr(cls, name, None)
+            if value is None or type(value) is TracingProxy:
+                continue
+            # Attributes inherited from a root class are shadowed on the test class only
+            originals[name] = (value, name in cls.__dict__)
+            setattr(cls, name, TracingProxy(value, name, self.tracer))
+        self.wrapped[cls] = originals
+
+    def unwrap_class(self, cls):
+        for name, (value, own) in self.wrapped.pop(cls, {}).items():
+            if own:
+                setattr(cls, name, value)
+            else:
+                delattr(cls, name)
+
+    def pytest_sessionfinish(self, session):
+        time.sleep = self.sleep
+        alluredir = self.config.getoption("allure_report_dir", default=None)
+        self.tracer.export(self.config.getoption("trace_dir") or alluredir)
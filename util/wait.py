@@ -0,0 +1,90 @@
+import time
+from lib_testbed.generic.util.logger import log
+
+
+class WaitResult:
+    def __init__(self, name, success, value, start_time, stop_time, attempts):
+        self.name = name
+        self.success = success
+        self.value = value
+        self.start_time = start_time
+        self.stop_time = stop_time
+        self.attempts = attempts
+
+    @property
+    def elapsed(self):
+        return self.stop_time - self.start_time
+
+    def __bool__(self):
+        return self.success
+
+    def __repr__(self):
+        state = "met" if self.success else "not met"
+        return f"<WaitResult {self.name}: {state} after {self.elapsed:.2f}s, {self.attempts} attempts>"
+
+
+class Waiter:
+    """Polls a probe with an interval that starts short after a trigger and widens over time."""
+
+    def __init__(self, timeout, initial_interval=0.5, max_interval=5.0, backoff=1.5, name="condition"):
+        assert initial_interval > 0 and backoff >= 1, "Invalid backoff parameters"
+        self.timeout = timeout
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.name = name
+        self.history = []
+
+    def intervals(self):
+        interval = self.initial_interval
+        while True:
+            yield interval
+            interval = min(interval * self.backoff, self.max_interval)
+
+    def wait(self, probe, condition=bool, since=None, ignore=()):
+        """Call probe() until condition(value) holds. Time-to-condition is measured from `since` (the trigger)."""
+        start_time = since if since is not None else time.time()
+        deadline = time.time() + self.timeout
+        value = None
+        attempts = 0
+        intervals = self.intervals()
+        while True:
+            attempts += 1
+            try:
+                value = probe()
+                success = bool(condition(value))
+            except ignore as err:
+                log.warning(f"{self.name}: probe raised {err!r}")
+                success = False
+            stop_time = time.time()
+            if success or stop_time >= deadline:
+                break
+            time.sleep(min(next(intervals), deadline - stop_time))
+        result = WaitResult(self.name, success, value, start_time, stop_time, attempts)
+        self.history.append(result)
+        log.debug(repr(result))
+        return result
+
+
+def wait_until(probe, condition=bool, timeout=60, since=None, ignore=(), name="condition", **backoff):
+    return Waiter(timeout, name=name, **backoff).wait(probe, condition, since=since, ignore=ignore)
+
+
+def all_of(*conditions):
+    return lambda value: all(condition(value) for condition in conditions)
+
+
+def any_of(*conditions):
+    return lambda value: any(condition(value) for condition in conditions)
+
+
+def negate(condition):
+    return lambda value: not condition(value)
+
+
+def key_equals(key, expected):
+    return lambda value: bool(value) and value.get(key) == expected
+
+
+def key_present(key):
+    return lambda value: bool(value) and bool(value.get(key))
@@ -0,0 +1,106 @@
+import base64
+import statistics
+import uuid
+from lib_testbed.generic.util.logger import log
+from tests.client_connectivity.util.remote_tail import RemoteFileTail
+from tests.client_connectivity.util.wait import wait_until
+
+GROUP_REKEY_EVENT = "Group rekeying"
+# Attached wpa_cli session, every matching event is printed with the client clock in milliseconds
+EXPECT_SCRIPT = """log_user 0
+spawn wpa_cli -i {ifname}
+set timeout -1
+expect {{
+    -re {{{pattern}[^\\r\\n]*}} {{
+        puts "[clock milliseconds] $expect_out(0,string)"
+        flush stdout
+        exp_continue
+    }}
+    eof
+}}
+"""
+
+
+class WpaEvent:
+    def __init__(self, timestamp, text):
+        self.timestamp = timestamp
+        self.text = text
+
+    def __repr__(self):
+        return f"<WpaEvent {self.timestamp:.3f} {self.text}>"
+
+
+def interval_stats(intervals):
+    return {
+        "count": len(intervals),
+        "mean": statistics.mean(intervals),
+        "jitter": statistics.pstdev(intervals),
+        "min": min(intervals),
+        "max": max(intervals),
+    }
+
+
+class WpaEventCollector:
+    """Timestamps wpa_supplicant control interface events on the client itself and streams them back."""
+
+    def __init__(self, client, ifname, pattern=GROUP_REKEY_EVENT):
+        self.client = client
+        self.ifname = ifname
+        self.pattern = pattern
+        name = f"/tmp/wpa_events_{uuid.uuid4().hex[:8]}"
+        self.script_path = f"{name}.exp"
+        self.remote_path = f"{name}.log"
+        self.tail = RemoteFileTail(client, self.remote_path)
+        self.events = []
+        self.pid = None
+
+    def start(self):
+        script = EXPECT_SCRIPT.format(ifname=self.ifname, pattern=self.pattern)
+        encoded = base64.b64encode(script.encode()).decode()
+        result = self.client.run_raw(
+            f"echo {encoded} | base64 -d > {self.script_path} &&"
+            f" (expect {self.script_path} > {self.remote_path} 2>/dev/null < /dev/null & echo $!)",
+            skip_exception=True,
+        )
+        assert result[0] == 0 and result[1].strip(), f"Can not attach to wpa_supplicant of {self.ifname}: {result}"
+        self.pid = result[1].strip()
+        log.info(f"Collecting '{self.pattern}' events of {self.ifname} on {self.client.get_nickname()}")
+        return self
+
+    def stop(self):
+        if self.pid:
+            self.poll()
+            self.client.run_raw(f"kill {self.pid}; rm -f {self.script_path} {self.remote_path}", skip_exception=True)
+            self.pid = None
+        return self.events
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_exc_info):
+        self.stop()
+
+    def poll(self):
+        events = []
+        for line in self.tail.read_new_lines():
+            timestamp, _, text = line.strip().partition(" ")
+            if not timestamp.isdigit():
+                continue
+            events.append(WpaEvent(int(timestamp) / 1000, text))
+        for event in events:
+            log.info(f"{self.client.get_nickname()}: {event.text}")
+        self.events.extend(events)
+        return events
+
+    def wait_for_events(self, count, timeout):
+        wait_until(
+            self.poll,
+            lambda _: len(self.events) >= count,
+            timeout=timeout,
+            name=f"{count} '{self.pattern}' events",
+            initial_interval=2.0,
+        )
+        return self.events
+
+    def intervals(self):
+        return [second.timestamp - first.timestamp for first, second in zip(self.events, self.events[1:])]
@@ -5,6 +5,9 @@ import allure
 from lib.util.base_case import BaseCase
 from lib_testbed.generic.util.logger import log
 from lib.util.testrail.plugin import pytestrail
+from tests.client_connectivity.util.cloud_cache import enable_cloud_cache
+from tests.client_connectivity.util.kpi import KpiScope, kpi_recorder, marker_kwarg
+from tests.client_connectivity.util.throughput import Iperf3Server, ThroughputMatrix, throughput_settings
 
 
 @pytest.mark.opensync_cloud()
@@ -14,9 +17,13 @@ from lib.util.testrail.plugin import pytestrail
 @pytest.mark.tag_res_gw_frv
 @pytest.mark.tag_client_connectivity
 class ConnectWifiClientRoot(BaseCase):
+    # The host client is requested only with --throughput, it runs the iperf3 server
+    throughput_host = True
+
     @classmethod
     def setup_class(cls):
         with cls.SafeSetup(ConnectWifiClientRoot, cls):
+            enable_cloud_cache(cls.cloud)
             cls.short_type_test = False
             for mark in cls.all_markers:
                 if mark.name == "wifi_test":
@@ -26,30 +33,47 @@ class ConnectWifiClientRoot(BaseCase):
             cls.pods_bssid = cls.get_pods_bssid()
             cls.ssid = cls.tb_config.get("Networks")[0]["ssid"]
             cls.password = cls.tb_config.get("Networks")[0]["key"]
+            cls.iperf_server = None
+            if throughput_settings.enabled:
+                cls.iperf_server = Iperf3Server(cls.client.host).start()
 
     @classmethod
     def teardown_class(cls):
         with cls.SafeTeardown(ConnectWifiClientRoot, cls):
             cls.client.wifi.disconnect(skip_exception=True)
+            if cls.iperf_server:
+                cls.iperf_server.stop()
 
     @allure.title("Connect wifi client")
     def test_01_connect_wifi_client(self):
-        for bssid in self.pods_bssid:
+        matrix = None
+        if self.iperf_server:
+            matrix = ThroughputMatrix(
+                self.iperf_server, throughput_settings.duration, throughput_settings.udp_bandwidth
+            )
+        for node_serial, band_type, bssid in self.pods_bssid:
             self.client.wifi.connect(ssid=self.ssid, psk=self.password, bssid=bssid)
             log.info("Check external ping on the client")
             assert self.client.wifi.ping_check(fqdn_check=True), "Client has no internet access"
             log.info("External ping check finished successfully")
+            if matrix:
+                matrix.measure(self.client.wifi, node_serial, band_type, bssid)
             self.client.wifi.disconnect(skip_exception=True)
+        if matrix:
+            log.info(f"Throughput matrix:\n{matrix.table()}")
+            network_mode = marker_kwarg(self.all_markers, "network_mode", "target")
+            matrix.record_kpi(KpiScope(kpi_recorder, type(self).__name__, network_mode))
+            assert not matrix.failed(), f"Bulk transfers failed: {matrix.failed()}"
 
     @classmethod
     def get_pods_bssid(cls):
-        pods_bssid = [None]
+        pods_bssid = [(None, None, None)]
         if cls.short_type_test is False:
             all_bssid_api = cls.cloud.admin.get_home_ap_bssids_from_cloud()
             pods_bssid = []
             for node_serial in all_bssid_api.keys():
                 for band_type, bssid in all_bssid_api[node_serial]:
-                    pods_bssid.append(bssid)
+                    pods_bssid.append((node_serial, band_type, bssid))
         return pods_bssid
 
 
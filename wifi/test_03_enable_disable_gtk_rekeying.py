@@ -1,11 +1,13 @@
 import allure
 import pytest
-import json
 import time
 from lib.util.base_case import BaseCase
 from lib.util.testrail.plugin import pytestrail
 from lib_testbed.generic.util.common import DeviceCommon
 from lib_testbed.generic.util.logger import log
+from tests.client_connectivity.util.cloud_cache import enable_cloud_cache
+from tests.client_connectivity.util.ovsdb import OvsdbMonitor, transact_updates
+from tests.client_connectivity.util.wpa_events import WpaEventCollector, interval_stats
 
 
 @pytest.mark.opensync_pod(role="gw")
@@ -13,13 +15,17 @@ from lib_testbed.generic.util.logger import log
 @pytest.mark.opensync_cloud()
 @pytest.mark.incremental
 @pytest.mark.tag_frv
-@pytest.mark.duration(seconds=464)
+@pytest.mark.duration(seconds=524)
 @pytestrail.case("C270229", "C396908", "C565956")
 @allure.title("Enable disable GTK rekeying")
 class Test03EnableDisableGtkRekeying(BaseCase):
+    rekey_time = 30
+    rekey_intervals = 3
+
     @classmethod
     def setup_class(cls):
         with cls.SafeSetup(__class__, cls):
+            enable_cloud_cache(cls.cloud)
             cls.node_id = cls.pod.gw.get_serial_number()
             cls.ssid = cls.tb_config.get("Networks")[0]["ssid"]
             cls.password = cls.tb_config.get("Networks")[0]["key"]
@@ -27,8 +33,12 @@ class Test03EnableDisableGtkRekeying(BaseCase):
             # get 5g bssid from pod
             cls.bssid_5g = cls.cloud.admin.get_node_5g_home_ap_bssid(cls.node_id)[0]
             cls.wifi_iface = cls.client.wifi.get_wlan_iface()
-            cls.home_ap = {}
             cls.br_home = DeviceCommon.get_gw_br_home(cls.tb_config)
+            cls.vif_monitor = OvsdbMonitor(
+                cls.pod.gw, "Wifi_VIF_State", columns=["if_name", "group_rekey"], where={"bridge": cls.br_home}
+            ).start()
+            # Set once the monitor runs, the teardown restores the rekey time through it only then
+            cls.home_ap = {}
 
     @classmethod
     def teardown_class(cls):
@@ -39,6 +49,8 @@ class Test03EnableDisableGtkRekeying(BaseCase):
                 log.info("Set default gtk rekeying time")
                 cls.change_rekey_time(86400)
             cls.client.wifi.disconnect(skip_exception=True)
+            if hasattr(cls, "vif_monitor"):
+                cls.vif_monitor.stop()
 
     @allure.title("Enable GTK rekeying")
     def test_01_enable_gtk_rekeying(self):
@@ -67,59 +79,62 @@ class Test03EnableDisableGtkRekeying(BaseCase):
 
     @allure.title("Changing group rekey time")
     def test_04_change_group_rekey_time(self):
-        log.info("Changing group rekey time to 30s")
-        self.change_rekey_time(time_rekey=30)
-        log.info("Checking if group_rekey time has been changed to 30s")
-        self.check_rekey_time(expected_time=30)
+        log.info(f"Changing group rekey time to {self.rekey_time}s")
+        self.change_rekey_time(time_rekey=self.rekey_time)
+        log.info(f"Checking if group_rekey time has been changed to {self.rekey_time}s")
+        self.check_rekey_time(expected_time=self.rekey_time)
 
     @allure.title("Check gtk rekeying occurs in logs")
     def test_05_check_gtk_rekeying_occurs(self):
-        log.info("Checking if gtk rekey-ing occurs in logs on the client every 30 sec")
-        rekey_cmd = (
-            'expect -c \'spawn wpa_cli -i %s; set timeout 60; expect "Group rekeying" {exit 0} default'
-            " {exit 1}'" % self.wifi_iface
+        log.info(f"Checking if gtk rekey-ing occurs in logs on the client every {self.rekey_time} sec")
+        events_count = self.rekey_intervals + 1
+        with WpaEventCollector(self.client.wifi, self.wifi_iface) as collector:
+            events = collector.wait_for_events(events_count, timeout=self.rekey_time * (events_count + 1))
+        assert len(events) >= events_count, f"Caught {len(events)} of {events_count} group rekey events from wpa_cli"
+        stats = interval_stats(collector.intervals())
+        log.info(
+            f"GTK rekey intervals: {[round(interval, 2) for interval in collector.intervals()]},"
+            f" mean: {stats['mean']:.2f} sec, jitter: {stats['jitter']:.2f} sec"
         )
+        assert self.rekey_time - 5 < stats["mean"] < self.rekey_time + 10, (
+            f"GTK rekey-ing occurred every {stats['mean']:.2f} sec, expected ~{self.rekey_time} sec"
+        )
+        assert stats["jitter"] < 5, f"GTK rekey interval jitter too high: {stats['jitter']:.2f} sec"
+        log.info(f"Successful wpa rekey every ~{self.rekey_time} sec")
 
-        out = self.client.wifi.run_raw(rekey_cmd, timeout=65)
-        assert out[0] == 0, f"Not able to get rekey log from wpa_cli\n{out}"
-        log.info("Caught first rekey, checking time delta between next rekey")
-        stime = time.time()
-
-        log.info("Waiting for next gtk rekeying occurs")
-        out = self.client.wifi.run_raw(rekey_cmd, timeout=65)
-        assert out[0] == 0, f"Not able to get rekey log from wpa_cli\n{out}"
-        assert 25 < time.time() - stime < 40, f"GTK rekey-ing occurred after: {time.time() - stime}, expected ~30 sec"
-        log.info("Next successful wpa rekey after ~30 sec")
-
-    def check_rekey_time(self, expected_time):
-        timeout = time.time() + 30
-        success = False
-        home_ap = list()
-        while timeout > time.time() and not success:
-            ovsh_table = json.loads(self.pod.gw.get_ovsh_table("Wifi_VIF_State"))
-            success = True
-            for item in ovsh_table:
-                if item["bridge"] == self.br_home:
-                    home_ap.append(item["if_name"])
-                    if item["group_rekey"] == expected_time:
-                        log.info(f'Group rekey for {item["if_name"]} is set correctly: {item["group_rekey"]}')
-                    else:
-                        log.warn(
-                            f'Group rekey for {item["if_name"]} is set incorrectly: {item["group_rekey"]},'
-                            f" expected result: {expected_time}"
-                        )
-                        log.info("Rechecking in 5s...")
-                        time.sleep(5)
-                        home_ap = list()
-                        success = False
-                        break
+    def check_rekey_time(self, expected_time, since=None):
+        rekey_wait = self.vif_monitor.wait_for(
+            lambda home_ap: home_ap and self.rekey_time_is_set(home_ap, expected_time),
+            timeout=30,
+            since=since,
+            name="group_rekey update",
+        )
+        assert rekey_wait, "Group rekey was set incorrectly"
+        log.info(f"Group rekey converged to {expected_time} after {rekey_wait.elapsed:.2f} sec")
+        self.home_ap["homeAp"] = [item["if_name"] for item in rekey_wait.value]
 
-        assert success, "Group rekey was set incorrectly"
-        self.home_ap["homeAp"] = home_ap
+    @staticmethod
+    def rekey_time_is_set(home_ap, expected_time):
+        for item in home_ap:
+            if item["group_rekey"] != expected_time:
+                log.warn(
+                    f'Group rekey for {item["if_name"]} is set incorrectly: {item["group_rekey"]},'
+                    f" expected result: {expected_time}"
+                )
+                return False
+            log.info(f'Group rekey for {item["if_name"]} is set correctly: {item["group_rekey"]}')
+        return True
 
     @classmethod
     def change_rekey_time(cls, time_rekey):
         home_ap = cls.home_ap.get("homeAp")
-        for home_ap in home_ap:
-            cls.pod.gw.run(f"ovsh u Wifi_VIF_Config --where if_name=={home_ap} " f"group_rekey:={time_rekey}")
-            time.sleep(5)
+        start_time = time.time()
+        transact_updates(
+            cls.pod.gw, "Wifi_VIF_Config", [({"if_name": if_name}, {"group_rekey": time_rekey}) for if_name in home_ap]
+        )
+        convergence = cls.vif_monitor.wait_converged(
+            "if_name", {if_name: {"group_rekey": time_rekey} for if_name in home_ap}, timeout=30, since=start_time
+        )
+        for if_name, elapsed in convergence.value.items():
+            log.info(f"Group rekey of {if_name} converged to {time_rekey} in Wifi_VIF_State after {elapsed:.2f} sec")
+        return convergence
@@ -3,6 +3,10 @@ import allure
 from lib_testbed.generic.util.logger import log
 from lib.util.testrail.plugin import pytestrail
 from lib.util.base_case import BaseCase
+from tests.client_connectivity.util.cloud_cache import enable_cloud_cache
+from tests.client_connectivity.util.fan_out import share_work
+from tests.client_connectivity.util.kpi import KpiScope, kpi_recorder, marker_kwarg
+from tests.client_connectivity.util.pmtu import MAX_PAYLOAD, PmtuProber, pmtu_table, record_pmtu_kpi
 
 
 @pytest.mark.opensync_cloud()
@@ -15,31 +19,48 @@ class ClientConnectivityMtuWifi(BaseCase):
     @classmethod
     def setup_class(cls):
         with cls.SafeSetup(__class__, cls):
+            enable_cloud_cache(cls.cloud)
             cls.ssid, cls.password = cls.cloud.user.get_home_network_credentials()
             cls.test_server = cls.tb_config["wifi_check"]["ipaddr"]
             cls.bssids = cls.cloud.admin.get_node_home_ap_bssids(cls.tb_config.get("Nodes")[1]["id"])
+            # Each client probes the next pending BSSID, more wifi clients here shorten the run
+            cls.mtu_clients = [cls.client.test_client]
 
     @classmethod
     def teardown_class(cls):
         with cls.SafeTeardown(__class__, cls):
-            cls.client.test_client.disconnect(cls.cls.client.test_client.ifname, skip_exception=True)
+            cls.client.test_client.disconnect(cls.client.test_client.ifname, skip_exception=True)
 
     @allure.title("Connect wifi client")
     def test_01_prepare_test_client(self):
-        for bssid in self.bssids:
-            self.prepare_test_client(bssid)
-            log.info(f"Checking client ping to {self.test_server}")
-            cmd = f"sudo /bin/ping -c 5 -w 60 -s 1472 -M do {self.test_server}"
-            ping_result = self.client.test_client.run_raw(cmd, skip_exception=True)
-            log.debug(ping_result)
-            assert not ping_result[0], f"Can not ping {self.test_server}. Ping result:\n{ping_result}"
-            log.info(f"Ping results:\n{ping_result[1]}")
-
-    def prepare_test_client(self, bssid):
-        self.client.test_client.connect(ssid=self.ssid, psk=self.password, bssid=bssid[1])
+        results = share_work(
+            self.probe_bssid, self.bssids, self.mtu_clients, name="path MTU probe", key=lambda bssid: bssid[1]
+        )
+        network_mode = marker_kwarg(self.all_markers, "network_mode", "target")
+        kpi = KpiScope(kpi_recorder, type(self).__name__, network_mode)
+        table = {}
+        for band, bssid in self.bssids:
+            result = results[bssid].value
+            table[f"{band} {bssid}"] = result
+            if result:
+                record_pmtu_kpi(kpi, result, band=band, bssid=bssid)
+        log.info(f"Path MTU to {self.test_server} per BSSID:\n{pmtu_table(table)}")
+        failed = {
+            bssid: results[bssid].error or f"path MTU {results[bssid].value.path_mtu}"
+            for _, bssid in self.bssids
+            if not results[bssid].ok or (results[bssid].value.max_payload or 0) < MAX_PAYLOAD
+        }
+        assert not failed, f"Full size DF ping to {self.test_server} failed for: {failed}"
+
+    def probe_bssid(self, client, bssid):
+        self.prepare_test_client(client, bssid)
+        return PmtuProber(client, self.test_server).run()
+
+    def prepare_test_client(self, client, bssid):
+        client.connect(ssid=self.ssid, psk=self.password, bssid=bssid[1])
         log.info(f"Client connected to ssid: {self.ssid}, band: {bssid[0]}, bssid: {bssid[1]}")
         log.info("Check client internet access")
-        assert self.client.test_client.ping_check(), "Client does not have internet access"
+        assert client.ping_check(), "Client does not have internet access"
         log.info("Client has internet access")
 
 
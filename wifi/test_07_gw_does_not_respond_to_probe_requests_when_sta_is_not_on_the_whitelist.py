@@ -3,10 +3,13 @@ import uuid
 import shutil
 import allure
 import pytest
-import pyshark
 from lib.util.base_case import BaseCase
 from lib_testbed.generic.util.logger import log
 from lib.util.testrail.plugin import pytestrail
+from tests.client_connectivity.util.pcap import PROBE_RESPONSE, frame_filter
+from tests.client_connectivity.util.sniffer import LiveCapture, build_bpf_filter
+from tests.client_connectivity.util.cloud_cache import enable_cloud_cache
+from tests.client_connectivity.util.ovsdb import get_json_table_on_pods
 
 LOCAL_SNIFF_PATH = "/tmp/automation/tcp_dump/"
 
@@ -23,14 +26,18 @@ class Test07GwDoesNotRespondToProbeRequestsWhenStaIsNotOnTheWhitelist(BaseCase):
     @classmethod
     def setup_class(cls):
         with cls.SafeSetup(__class__, cls):
+            enable_cloud_cache(cls.cloud)
             cls.sniff_file = f"tcp_dump_{uuid.uuid4().hex}.pcap"
             cls.sniff_path = os.path.join(LOCAL_SNIFF_PATH, cls.sniff_file)
             cls.ssid, cls.psk = cls.get_onboard_credentials()
+            cls.capture = None
 
     @classmethod
     def teardown_class(cls):
         with cls.SafeTeardown(__class__, cls):
             cls.client.w2.disconnect(skip_exception=True)
+            if cls.capture:
+                cls.capture.stop()
             cls.clean_tcpdump_file()
 
     @allure.title("Set topology to 5G channels")
@@ -54,25 +61,19 @@ class Test07GwDoesNotRespondToProbeRequestsWhenStaIsNotOnTheWhitelist(BaseCase):
             f"doesnt appear on the whitelist"
         )
         log.info(f"{self.client.w2.nickname} has not been connected to onboard network as expected")
+        assert self.capture, "Sniffer capture has not been started"
+        assert not self.capture.matched.is_set(), (
+            f"Found probe responses from the onboard network while connecting: {self.capture.first_match}"
+        )
 
     @allure.title("Check sniffer capture to see if AP does not reply STA")
     def test_04_check_sniffer_capture(self):
         log.info("Check sniffer capture to see if AP does not reply STA's")
-        self.client.w1.run("killall tcpdump", skip_exception=True)
-        log.info(f"Download tcpdump from client to local machine: {self.sniff_path}")
-        if not os.path.exists(LOCAL_SNIFF_PATH):
-            os.makedirs(LOCAL_SNIFF_PATH)
-        self.client.w1.get_file(f"/tmp/{self.sniff_file}", LOCAL_SNIFF_PATH, create_dir=False, timeout=120)
-        onboard_mac_addresses = self.get_onboard_mac_addresses()
-        location_onboard_macs = [f"wlan.addr == {mac}" for mac in onboard_mac_addresses]
-        onboard_mac_filter = " || ".join(location_onboard_macs)
-        # Filter for Probe Responses: wlan.fc.type_subtype == 5
-        pyshark_filter = f"wlan.addr == {self.client.w2.mac} && wlan.fc.type_subtype == 5 " f"&& ({onboard_mac_filter})"
-        log.info(f"Pyshark filter:\n{pyshark_filter}")
-        packets = pyshark.FileCapture(self.sniff_path, display_filter=pyshark_filter, only_summaries=False)
-        packets.load_packets()
+        assert self.capture, "Sniffer capture has not been started"
+        probe_responses = self.capture.stop()
+        log.info(f"Capture streamed to local machine: {self.sniff_path}")
         log.info("Check Probe Responses from the onboard network")
-        assert not len(packets), "Found assoc responses from the onboard network"
+        assert not probe_responses, f"Found probe responses from the onboard network: {probe_responses}"
         log.info("Not found any Probe Responses responses from the onboard network")
 
     @classmethod
@@ -87,22 +88,28 @@ class Test07GwDoesNotRespondToProbeRequestsWhenStaIsNotOnTheWhitelist(BaseCase):
         assert security_key, f"Can not get security key from onboard interface: {onboard_interface}"
         return ssid, security_key
 
-    def start_sniffer(self, channel, ht_mode):
-        log.info(f"Running sniffer on the {self.client.w1.nickname} client")
-        self.client.w1.wifi_monitor(channel=channel, ht=ht_mode, ifname=self.client.w1.ifname)
-        self.client.w1.run(
-            f"tcpdump -U -i {self.client.w1.ifname} -w /tmp/{self.sniff_file}" f" > /tmp/tcp_dump_log.txt 2>&1 &"
+    @classmethod
+    def start_sniffer(cls, channel, ht_mode):
+        log.info(f"Running sniffer on the {cls.client.w1.nickname} client")
+        cls.client.w1.wifi_monitor(channel=channel, ht=ht_mode, ifname=cls.client.w1.ifname)
+        onboard_mac_addresses = cls.get_onboard_mac_addresses()
+        log.info(f"Looking for Probe Responses to {cls.client.w2.mac} from onboard networks: {onboard_mac_addresses}")
+        if not os.path.exists(LOCAL_SNIFF_PATH):
+            os.makedirs(LOCAL_SNIFF_PATH)
+        cls.capture = LiveCapture(
+            client=cls.client.w1,
+            ifname=cls.client.w1.ifname,
+            remote_path=f"/tmp/{cls.sniff_file}",
+            bpf_filter=build_bpf_filter(cls.client.w2.mac, [PROBE_RESPONSE]),
+            predicate=frame_filter(type_subtype=PROBE_RESPONSE, addr=cls.client.w2.mac, addr_any=onboard_mac_addresses),
+            local_path=cls.sniff_path,
         )
+        cls.capture.start()
 
-    def get_onboard_mac_addresses(self):
-        mac_addresses = list()
-        for device in self.pods.all.get_devices():
-            table = device.ovsdb.get_json_table(table="Wifi_VIF_State", where=f"ssid=={self.ssid}", skip_exception=True)
-            if not table:
-                continue
-            for onboard_network in table:
-                mac_addresses.append(onboard_network["mac"])
-        return mac_addresses
+    @classmethod
+    def get_onboard_mac_addresses(cls):
+        tables = get_json_table_on_pods(cls.pods.all, "Wifi_VIF_State", where=f"ssid=={cls.ssid}")
+        return [onboard_network["mac"] for table in tables.values() if table for onboard_network in table]
 
     @classmethod
     def get_security_key(cls, onboard_cfg):